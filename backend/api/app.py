@@ -1,16 +1,71 @@
 """
 Main FastAPI application for the STTM application.
 """
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from backend.service import async_service, audit_service, executor, workspace_service
+
+# Seconds between checks for writes made by other workers when the store is shared
+SHARED_STORE_POLL_SECONDS = 0.5
+
+# Seconds between audit log maintenance runs (sealing buffered changes, compaction)
+AUDIT_LOG_MAINTENANCE_SECONDS = 5.0
+
+async def _poll_shared_store():
+    """Pick up other workers' writes even when no requests arrive, so push subscribers see them."""
+    while True:
+        await asyncio.sleep(SHARED_STORE_POLL_SECONDS)
+        await async_service.sync_shared_state(all_workspaces=True)
+
+async def _maintain_audit_log():
+    """Seal aged audit log changes into segments and compact old segments."""
+    while True:
+        await asyncio.sleep(AUDIT_LOG_MAINTENANCE_SECONDS)
+        await async_service.maintain_audit_log()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    poller = asyncio.create_task(_poll_shared_store())
+    audit_maintainer = asyncio.create_task(_maintain_audit_log())
+    yield
+    poller.cancel()
+    audit_maintainer.cancel()
+    executor.shutdown()
+    audit_service.maintain(force=True)
 
 # Create the FastAPI application
 app = FastAPI(
     title="Source-to-Target Mapping API",
     description="API for managing source-to-target mappings",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+@app.middleware("http")
+async def select_workspace(request: Request, call_next):
+    """
+    Serve a request in the workspace named by its X-Workspace header or ?workspace=
+    query parameter, brought up to date with writes made by other workers.
+    """
+    name = request.headers.get("x-workspace") or request.query_params.get("workspace") or workspace_service.DEFAULT_WORKSPACE
+    try:
+        with workspace_service.use_workspace(name):
+            await async_service.sync_shared_state()
+            return await call_next(request)
+    except workspace_service.WorkspaceNotFoundError as e:
+        return JSONResponse(status_code=404, content={"detail": str(e)})
+
+@app.middleware("http")
+async def attribute_user(request: Request, call_next):
+    """Attribute the mapping writes of a request to the user in its X-User header, for the audit log."""
+    with audit_service.use_user(request.headers.get("x-user")):
+        return await call_next(request)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -21,12 +76,17 @@ app.add_middleware(
 )
 
 # Import and include routers
-from backend.api.routers import mappings, tables, columns, releases
+from backend.api.routers import mappings, tables, columns, releases, lineage, catalog, workspaces, admin, audit
 
 app.include_router(mappings.router, prefix="/api/mappings", tags=["mappings"])
 app.include_router(tables.router, prefix="/api/tables", tags=["tables"])
 app.include_router(columns.router, prefix="/api/columns", tags=["columns"])
 app.include_router(releases.router, prefix="/api/releases", tags=["releases"])
+app.include_router(lineage.router, prefix="/api/lineage", tags=["lineage"])
+app.include_router(catalog.router, prefix="/api/catalog", tags=["catalog"])
+app.include_router(workspaces.router, prefix="/api/workspaces", tags=["workspaces"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(audit.router, prefix="/api/audit", tags=["audit"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,98 @@
+"""
+Pre-compressed response cache for the STTM API.
+Hot list endpoints serialize and gzip their body once per data version and
+reuse both encodings until the data changes.
+"""
+import gzip
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from backend.api import single_flight
+from backend.cache.memory import structure_usage
+from backend.service.executor import run_blocking
+
+# Bodies smaller than this are not worth compressing
+GZIP_MINIMUM_SIZE = 500
+
+# Cached bodies: key -> (data version, JSON body, gzipped body or None)
+_entries: Dict[str, Tuple[Hashable, bytes, Optional[bytes]]] = {}
+
+def _accepts_gzip(request: Request) -> bool:
+    """Check whether the client accepts gzip-encoded responses."""
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header already has this entity tag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def _render(adapter: TypeAdapter, load_data: Callable[[], Any]) -> Tuple[bytes, Optional[bytes]]:
+    """Load, serialize and compress a response body."""
+    body = adapter.dump_json(adapter.validate_python(load_data()))
+    gzip_body = gzip.compress(body, mtime=0) if len(body) >= GZIP_MINIMUM_SIZE else None
+    return body, gzip_body
+
+async def _render_entry(
+    key: str, version: Hashable, adapter: TypeAdapter, load_data: Callable[[], Any]
+) -> Tuple[Hashable, bytes, Optional[bytes]]:
+    """Render a body on the executor and cache it."""
+    body, gzip_body = await run_blocking(_render, adapter, load_data)
+    entry = (version, body, gzip_body)
+    _entries[key] = entry
+    return entry
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    version: Hashable,
+    adapter: TypeAdapter,
+    load_data: Callable[[], Any],
+    etag: Optional[str] = None,
+    cache_control: Optional[str] = None,
+) -> Response:
+    """
+    Return a JSON response whose body is cached (raw and gzipped) per data version.
+
+    Args:
+        request (Request): The incoming request, used for content negotiation.
+        key (str): The cache key of the endpoint.
+        version (Hashable): The data version the body was built from.
+        adapter (TypeAdapter): Validates and serializes the response data.
+        load_data (Callable[[], Any]): Loads the response data on a cache miss.
+            Runs on the blocking-call executor together with serialization and
+            compression, so a miss on a large list does not stall other requests.
+            Concurrent misses on the same key and version share one run.
+        etag (Optional[str]): Entity tag of this version. A request whose
+            If-None-Match has it gets an empty 304 response.
+        cache_control (Optional[str]): Cache-Control header value.
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None:
+        headers["ETag"] = etag
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    if etag is not None and etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    entry = _entries.get(key)
+    if entry is None or entry[0] != version:
+        entry = await single_flight.run(
+            ("response", key, version), lambda: _render_entry(key, version, adapter, load_data)
+        )
+
+    _, body, gzip_body = entry
+    if gzip_body is not None and _accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=gzip_body, media_type="application/json", headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def get_memory_usage() -> Dict[str, int]:
+    """Estimate the memory held by the cached bodies, as the number of entries and approximate bytes."""
+    return structure_usage(_entries, len(_entries))
+
+def clear() -> None:
+    """Drop all cached bodies."""
+    _entries.clear()
@@ -0,0 +1,52 @@
+"""
+Admin router for the STTM API.
+"""
+from fastapi import APIRouter, HTTPException, Query
+from backend.service import async_service
+from backend.api import response_cache
+from backend.api.schemas.admin import MemoryReport, TracemallocReport, TracemallocSettings
+from backend.api.schemas.audit import AuditLogStats
+
+router = APIRouter()
+
+@router.get("/memory", response_model=MemoryReport)
+async def get_memory_report(
+    top: int = Query(0, ge=0, le=1000, description="Number of top tracemalloc allocation sites to list")
+):
+    """
+    Get the approximate memory held by the mapping store, the reference data,
+    the indexes and the derived caches of this worker process.
+    """
+    try:
+        report = await async_service.get_memory_report(top)
+        report["caches"]["response_cache"] = response_cache.get_memory_usage()
+        report["total_bytes"] += report["caches"]["response_cache"]["bytes"]
+        return report
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tracemalloc", response_model=TracemallocReport)
+async def set_tracemalloc(settings: TracemallocSettings):
+    """
+    Start or stop tracing allocations, for the top allocation sites of the
+    memory report. Tracing slows every allocation, so stop it when done.
+    """
+    try:
+        return await async_service.set_tracemalloc(settings.enabled, settings.frames)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/audit-log/maintenance", response_model=AuditLogStats)
+async def maintain_audit_log(
+    force: bool = Query(False, description="Seal all buffered changes, not only those older than the flush interval")
+):
+    """
+    Seal buffered audit log changes into a segment and merge old segments.
+    This also runs periodically in the background.
+    """
+    try:
+        return await async_service.maintain_audit_log(force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
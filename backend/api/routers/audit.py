@@ -0,0 +1,31 @@
+"""
+Audit router for the STTM API.
+"""
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from backend.service import async_service
+from backend.api.schemas.audit import AuditEntry
+
+router = APIRouter()
+
+@router.get("/", response_model=List[AuditEntry])
+async def get_audit_entries(
+    start: Optional[datetime] = Query(None, description="Only changes at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only changes at or before this time"),
+    mapping_id: Optional[int] = Query(None, description="Only changes to this mapping"),
+    user: Optional[str] = Query(None, description="Only changes by this user"),
+    release_id: Optional[int] = Query(None, description="Only changes to mappings of this release"),
+    limit: int = Query(100, ge=1, le=10000, description="Maximum number of changes to return")
+):
+    """
+    Get the newest mapping changes of the workspace, optionally filtered by
+    time range, mapping, user and release, e.g. all changes by one user in a
+    release.
+    """
+    try:
+        return await async_service.get_audit_entries(
+            start=start, end=end, mapping_id=mapping_id, user=user, release_id=release_id, limit=limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,90 @@
+"""
+Catalog router for the STTM API.
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from backend.service import async_service, catalog_service, mapping_service
+from backend.api import response_cache
+from backend.api.schemas.catalog import Catalog, CatalogIngestRequest, CatalogIngestResult
+
+router = APIRouter()
+
+# Lifetime of responses pinned to a catalog version, which never change
+PINNED_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+catalog_adapter = TypeAdapter(Catalog)
+
+@router.get("/", response_model=Catalog)
+async def get_catalog(
+    request: Request,
+    version: Optional[int] = Query(None, description="Pin the current catalog version to allow long-term caching")
+):
+    """
+    Get all reference data (tables, columns and releases) in one payload.
+
+    Unpinned responses must be revalidated with their ETag. Responses pinned to
+    the current version with ?version= may be cached for a year.
+    """
+    try:
+        current = (await async_service.get_data_versions())["catalog"]
+        if version is not None and version != current:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Catalog version {version} is not current (current version is {current})",
+            )
+        if version is None:
+            cache_control = "no-cache"
+        else:
+            cache_control = f"public, max-age={PINNED_MAX_AGE_SECONDS}, immutable"
+        return await response_cache.cached_json_response(
+            request,
+            "catalog",
+            current,
+            catalog_adapter,
+            mapping_service.get_catalog,
+            etag=f'"catalog-{current}"',
+            cache_control=cache_control,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/changes", response_model=Catalog)
+async def get_catalog_changes(
+    request: Request,
+    response: Response,
+    since: int = Query(..., ge=0, description="Catalog version the client already has")
+):
+    """
+    Get the catalog sections changed since a catalog version; unchanged sections are null.
+    """
+    try:
+        current = (await async_service.get_data_versions())["catalog"]
+        etag = f'"catalog-{since}-{current}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if response_cache.etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return await async_service.get_catalog(since)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ingest", response_model=CatalogIngestResult)
+async def ingest_catalog(request: CatalogIngestRequest):
+    """
+    Align one side of the catalog with the structure of a SQLite database.
+    
+    Only tables whose structure changed are updated, so re-running it against
+    an unchanged database is cheap and changes nothing.
+    """
+    try:
+        path = catalog_service.resolve_catalog_database(request.database)
+        return await async_service.ingest_sqlite_catalog(request.side, path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,32 +2,123 @@
 Columns router for the STTM API.
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
-from backend.service import mapping_service
-from backend.api.schemas.column import Column
+from fastapi import APIRouter, HTTPException, Query, Path, Request
+from pydantic import TypeAdapter
+from backend.service import async_service, mapping_service
+from backend.api import response_cache
+from backend.api.schemas.column import Column, ColumnImpact, ColumnImpactRequest, ColumnImpactBatch
+from backend.api.schemas.projection import parse_fields, projected_response
 
 router = APIRouter()
 
+column_list_adapter = TypeAdapter(List[Column])
+
 @router.get("/source", response_model=List[Column])
 async def get_source_columns(
-    table_id: Optional[int] = Query(None, description="Filter by table ID")
+    request: Request,
+    table_id: Optional[int] = Query(None, description="Filter by table ID"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
 ):
     """
     Get source columns, optionally filtered by table ID.
     """
     try:
-        return mapping_service.get_source_columns(table_id)
+        selected = parse_fields(fields, Column)
+        if selected is not None:
+            columns = await async_service.get_source_columns(table_id)
+            return projected_response(mapping_service.select_fields(columns, selected), Column, selected)
+        if table_id is not None:
+            return await async_service.get_source_columns(table_id)
+        return await response_cache.cached_json_response(
+            request,
+            "columns/source",
+            (await async_service.get_data_versions())["catalog"],
+            column_list_adapter,
+            mapping_service.get_source_columns,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/target", response_model=List[Column])
 async def get_target_columns(
-    table_id: Optional[int] = Query(None, description="Filter by table ID")
+    request: Request,
+    table_id: Optional[int] = Query(None, description="Filter by table ID"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
 ):
     """
     Get target columns, optionally filtered by table ID.
     """
     try:
-        return mapping_service.get_target_columns(table_id)
+        selected = parse_fields(fields, Column)
+        if selected is not None:
+            columns = await async_service.get_target_columns(table_id)
+            return projected_response(mapping_service.select_fields(columns, selected), Column, selected)
+        if table_id is not None:
+            return await async_service.get_target_columns(table_id)
+        return await response_cache.cached_json_response(
+            request,
+            "columns/target",
+            (await async_service.get_data_versions())["catalog"],
+            column_list_adapter,
+            mapping_service.get_target_columns,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/source/{column_id}/impact", response_model=ColumnImpact)
+async def get_source_column_impact(
+    column_id: int = Path(..., description="The ID of the source column")
+):
+    """
+    Get the mappings, target columns, releases and JIRA tickets affected by a source column.
+    """
+    try:
+        result = await async_service.get_column_impact("source", [column_id])
+        if not result["impacts"]:
+            raise HTTPException(status_code=404, detail=f"Source column with ID {column_id} not found")
+        return result["impacts"][0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/source/impact", response_model=ColumnImpactBatch)
+async def get_source_columns_impact(request: ColumnImpactRequest):
+    """
+    Get the impact of many source columns in one request.
+    """
+    try:
+        return await async_service.get_column_impact("source", request.column_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/target/{column_id}/impact", response_model=ColumnImpact)
+async def get_target_column_impact(
+    column_id: int = Path(..., description="The ID of the target column")
+):
+    """
+    Get the mappings, source columns, releases and JIRA tickets affected by a target column.
+    """
+    try:
+        result = await async_service.get_column_impact("target", [column_id])
+        if not result["impacts"]:
+            raise HTTPException(status_code=404, detail=f"Target column with ID {column_id} not found")
+        return result["impacts"][0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/target/impact", response_model=ColumnImpactBatch)
+async def get_target_columns_impact(request: ColumnImpactRequest):
+    """
+    Get the impact of many target columns in one request.
+    """
+    try:
+        return await async_service.get_column_impact("target", request.column_ids)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
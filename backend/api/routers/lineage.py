@@ -0,0 +1,30 @@
+"""
+Lineage router for the STTM API.
+"""
+from fastapi import APIRouter, HTTPException, Query, Path
+from backend.service import async_service
+from backend.api.schemas.lineage import Lineage
+
+router = APIRouter()
+
+@router.get("/columns/{side}/{column_id}/{direction}", response_model=Lineage)
+async def get_column_lineage(
+    side: str = Path(..., description="Catalog side of the column (source or target)"),
+    column_id: int = Path(..., description="The ID of the column"),
+    direction: str = Path(..., description="Traversal direction (upstream or downstream)"),
+    depth: int = Query(5, ge=1, le=100, description="Maximum number of mapping hops to follow")
+):
+    """
+    Get the multi-hop upstream or downstream lineage of a column.
+    """
+    try:
+        lineage = await async_service.get_lineage(side, column_id, direction, depth)
+        if lineage is None:
+            raise HTTPException(status_code=404, detail=f"{side.capitalize()} column with ID {column_id} not found")
+        return lineage
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,51 +1,201 @@
 """
 Mappings router for the STTM API.
 """
+import json
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path
-from backend.service import mapping_service
-from backend.api.schemas.mapping import Mapping, MappingCreate, MappingUpdate, EnrichedMapping
+from fastapi import APIRouter, Header, HTTPException, Query, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from backend.service import async_service, mapping_service, event_service
+from backend.api import response_cache, single_flight
+from backend.api.schemas.mapping import (
+    Mapping, MappingCreate, MappingBulkCreate, MappingUpdate, EnrichedMapping, MappingChanges,
+    TypeCompatibilityReport, MappingStats, MappingBatchGet, MappingBatch,
+    MappingRangePatch, MappingRangePatchResult
+)
+from backend.api.schemas.projection import parse_fields, projected_response
 
 router = APIRouter()
 
+# Seconds between keep-alive comments on idle event streams
+EVENT_HEARTBEAT_SECONDS = 15.0
+
+enriched_list_adapter = TypeAdapter(List[EnrichedMapping])
+
+async def _cached_enriched_response(request: Request):
+    """Serve the full enriched mapping list of the current workspace from the pre-compressed response cache."""
+    versions = await async_service.get_data_versions()
+    return await response_cache.cached_json_response(
+        request,
+        f"{mapping_service.current_workspace()}/mappings/enriched",
+        (versions["mappings"], versions["catalog"]),
+        enriched_list_adapter,
+        mapping_service.get_enriched_mappings,
+    )
+
 @router.get("/", response_model=List[EnrichedMapping])
 async def get_mappings(
+    request: Request,
     release_id: Optional[int] = Query(None, description="Filter by release ID"),
-    status: Optional[str] = Query(None, description="Filter by status")
+    status: Optional[str] = Query(None, description="Filter by status"),
+    sort: Optional[str] = Query(None, description="Field to sort by, prefix with '-' for descending order"),
+    offset: int = Query(0, ge=0, description="Number of mappings to skip"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of mappings to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
 ):
     """
-    Get all mappings, optionally filtered by release ID or status.
+    Get all mappings, optionally filtered by release ID or status, sorted and paginated.
     """
     try:
-        if release_id is not None:
-            mappings = mapping_service.get_mappings_by_release(release_id)
-        elif status is not None:
-            mappings = mapping_service.get_mappings_by_status(status)
-        else:
-            mappings = mapping_service.get_enriched_mappings()
+        selected = parse_fields(fields, EnrichedMapping)
+        if release_id is None and status is None and sort is None and offset == 0 and limit is None and selected is None:
+            return await _cached_enriched_response(request)
+        mappings = await async_service.get_mappings_page(release_id, status, sort, offset, limit, selected)
+        if selected is not None:
+            return projected_response(mappings, EnrichedMapping, selected)
         return mappings
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/enriched", response_model=List[EnrichedMapping])
-async def get_enriched_mappings():
+async def get_enriched_mappings(
+    request: Request,
+    sort: Optional[str] = Query(None, description="Field to sort by, prefix with '-' for descending order"),
+    offset: int = Query(0, ge=0, description="Number of mappings to skip"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of mappings to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
+):
     """
     Get all mappings with enriched information (table and column names).
     """
     try:
-        return mapping_service.get_enriched_mappings()
+        selected = parse_fields(fields, EnrichedMapping)
+        if selected is not None:
+            mappings = await async_service.get_mappings_page(sort=sort, offset=offset, limit=limit, fields=selected)
+            return projected_response(mappings, EnrichedMapping, selected)
+        if sort is None and offset == 0 and limit is None:
+            return await _cached_enriched_response(request)
+        return await async_service.get_mappings_page(sort=sort, offset=offset, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/changes", response_model=MappingChanges)
+async def get_mapping_changes(
+    since: int = Query(0, ge=0, description="Mappings version the client last synced to")
+):
+    """
+    Get the mappings created, updated or deleted since a mappings version.
+    """
+    try:
+        return await async_service.get_mapping_changes(since)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stats", response_model=MappingStats)
+async def get_mapping_stats(
+    release_id: Optional[int] = Query(None, description="Report the totals and tables for this release only")
+):
+    """
+    Get the percentage of target columns mapped and the mapping counts by status, per target table and release.
+    """
+    try:
+        return await async_service.get_mapping_stats(release_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/compatibility", response_model=TypeCompatibilityReport)
+async def get_type_compatibility_report(
+    release_id: Optional[int] = Query(None, description="Only check the mappings in this release"),
+    limit: int = Query(1000, ge=0, description="Maximum number of flagged mapping IDs to list")
+):
+    """
+    Check the data types of every mapping's source and target columns against the compatibility matrix.
+    """
+    try:
+        versions = await async_service.get_data_versions()
+        return await single_flight.run(
+            (
+                "mappings/compatibility", mapping_service.current_workspace(),
+                versions["mappings"], versions["catalog"], release_id, limit,
+            ),
+            lambda: async_service.get_type_compatibility_report(release_id, limit),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/events")
+async def stream_mapping_events(
+    request: Request,
+    release_id: Optional[int] = Query(None, description="Only push mappings in this release"),
+    source_table_id: Optional[int] = Query(None, description="Only push mappings from this source table"),
+    target_table_id: Optional[int] = Query(None, description="Only push mappings to this target table")
+):
+    """
+    Stream mapping create/update/delete events as server-sent events.
+    
+    Bursts of changes are coalesced into one "changes" event. A "resync" event
+    means the client fell too far behind and should call /changes with its last version.
+    """
+    subscription = event_service.subscribe(release_id, source_table_id, target_table_id)
+    
+    async def event_stream():
+        try:
+            yield f"event: ready\ndata: {json.dumps({'version': mapping_service.get_data_versions()['mappings']})}\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(EVENT_HEARTBEAT_SECONDS)
+                if batch is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event_type = batch.pop("type")
+                data = MappingChanges(**batch).model_dump_json() if event_type == "changes" else json.dumps(batch)
+                yield f"event: {event_type}\ndata: {data}\n\n"
+        finally:
+            event_service.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _row_etag(mapping: dict) -> str:
+    """Get the entity tag of a mapping, its version."""
+    return f'"{mapping.get("version", 1)}"'
+
+def _expected_version(if_match: Optional[str], body_version: Optional[int]) -> Optional[int]:
+    """
+    Get the mapping version an update is based on, from If-Match or the body.
+
+    Raises:
+        ValueError: If If-Match is not a mapping version or disagrees with the body.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return body_version
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise ValueError(f"If-Match must be the ETag of a mapping, not {if_match}")
+    if body_version is not None and body_version != int(tag):
+        raise ValueError("If-Match and version disagree")
+    return int(tag)
+
 @router.get("/{mapping_id}", response_model=Mapping)
-async def get_mapping(mapping_id: int = Path(..., description="The ID of the mapping to retrieve")):
+async def get_mapping(
+    response: Response,
+    mapping_id: int = Path(..., description="The ID of the mapping to retrieve")
+):
     """
-    Get a mapping by ID.
+    Get a mapping by ID. The ETag is the version of the mapping, to pass as
+    If-Match on the next update.
     """
     try:
-        mapping = mapping_service.get_mapping(mapping_id)
+        mapping = await async_service.get_mapping(mapping_id)
         if mapping is None:
             raise HTTPException(status_code=404, detail=f"Mapping with ID {mapping_id} not found")
+        response.headers["ETag"] = _row_etag(mapping)
         return mapping
     except HTTPException:
         raise
@@ -58,7 +208,58 @@ async def create_mapping(mapping: MappingCreate):
     Create a new mapping.
     """
     try:
-        return mapping_service.create_mapping(mapping.model_dump())
+        return await async_service.create_mapping(mapping.model_dump())
+    except mapping_service.MappingConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch-get", response_model=MappingBatch)
+async def get_mappings_by_ids(request: MappingBatchGet):
+    """
+    Get enriched mappings by ID in one request, e.g. the rows named by an event
+    or a saved selection. IDs with no mapping are listed in missing_ids.
+    """
+    try:
+        return await async_service.get_mappings_by_ids(request.ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/bulk", response_model=List[Mapping], status_code=201)
+async def create_mappings(request: MappingBulkCreate):
+    """
+    Create many mappings at once. Nothing is created if any row is invalid,
+    and the error detail lists the problems of each row by index.
+    """
+    try:
+        return await async_service.create_mappings([m.model_dump() for m in request.mappings])
+    except mapping_service.MappingValidationError as e:
+        raise HTTPException(status_code=400, detail=e.errors)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.patch("/range", response_model=MappingRangePatchResult)
+async def patch_mappings(request: MappingRangePatch):
+    """
+    Set the same fields on many mappings at once, e.g. for a drag fill across a
+    grid. The mappings are given by ID or by filter. Nothing is updated if any
+    mapping would become invalid, and the error detail lists the problems of
+    each mapping by mapping_id. If versions are given and any of those mappings
+    has changed since, nothing is updated and the 409 detail has their current rows.
+    """
+    try:
+        return await async_service.patch_mappings(
+            request.fields.model_dump(exclude_unset=True),
+            mapping_ids=request.ids,
+            filters=request.filter.model_dump() if request.filter is not None else None,
+            expected_versions=request.versions,
+        )
+    except mapping_service.MappingConflictError as e:
+        raise HTTPException(status_code=409, detail=e.errors)
+    except mapping_service.MappingValidationError as e:
+        raise HTTPException(status_code=400, detail=e.errors)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -67,18 +268,38 @@ async def create_mapping(mapping: MappingCreate):
 @router.put("/{mapping_id}", response_model=Mapping)
 async def update_mapping(
     mapping: MappingUpdate,
-    mapping_id: int = Path(..., description="The ID of the mapping to update")
+    response: Response,
+    mapping_id: int = Path(..., description="The ID of the mapping to update"),
+    if_match: Optional[str] = Header(None, description="ETag of the mapping the update is based on")
 ):
     """
     Update a mapping.
+
+    The update must name the version it is based on, in If-Match or version;
+    without either it fails with 428. If the mapping has changed since, it fails
+    with 409 and the current mapping in the detail, so the client can merge
+    without reloading. If-Match: * overwrites whatever the current version is.
     """
     try:
-        updated_mapping = mapping_service.update_mapping(mapping_id, mapping.model_dump(exclude_unset=True))
+        mapping_data = mapping.model_dump(exclude_unset=True)
+        if if_match is None and mapping_data.get("version") is None:
+            raise HTTPException(
+                status_code=428, detail="Send the version the update is based on in If-Match or version"
+            )
+        expected_version = _expected_version(if_match, mapping_data.pop("version", None))
+        updated_mapping = await async_service.update_mapping(mapping_id, mapping_data, expected_version)
         if updated_mapping is None:
             raise HTTPException(status_code=404, detail=f"Mapping with ID {mapping_id} not found")
+        response.headers["ETag"] = _row_etag(updated_mapping)
         return updated_mapping
     except HTTPException:
         raise
+    except mapping_service.MappingVersionConflictError as e:
+        raise HTTPException(status_code=409, detail=e.errors)
+    except mapping_service.MappingConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -88,7 +309,7 @@ async def delete_mapping(mapping_id: int = Path(..., description="The ID of the
     Delete a mapping.
     """
     try:
-        result = mapping_service.delete_mapping(mapping_id)
+        result = await async_service.delete_mapping(mapping_id)
         if not result:
             raise HTTPException(status_code=404, detail=f"Mapping with ID {mapping_id} not found")
         return None
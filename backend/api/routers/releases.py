@@ -1,19 +1,48 @@
 """
 Releases router for the STTM API.
 """
-from typing import List
-from fastapi import APIRouter, HTTPException
-from backend.service import mapping_service
-from backend.api.schemas.release import Release
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Path, Request
+from pydantic import TypeAdapter
+from backend.service import async_service, mapping_service
+from backend.api import response_cache
+from backend.api.schemas.release import Release, ReleasePromotion, ReleasePromotionResult
 
 router = APIRouter()
 
+release_list_adapter = TypeAdapter(List[Release])
+
 @router.get("/", response_model=List[Release])
-async def get_releases():
+async def get_releases(request: Request):
     """
     Get all releases.
     """
     try:
-        return mapping_service.get_releases()
+        return await response_cache.cached_json_response(
+            request,
+            "releases",
+            (await async_service.get_data_versions())["catalog"],
+            release_list_adapter,
+            mapping_service.get_releases,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{release_id}/promote", response_model=ReleasePromotionResult)
+async def promote_release(
+    promotion: Optional[ReleasePromotion] = None,
+    release_id: int = Path(..., description="The ID of the release to promote")
+):
+    """
+    Move every pre-release mapping of a release to released status in one atomic step.
+    """
+    try:
+        promotion = promotion or ReleasePromotion()
+        result = await async_service.promote_release(release_id, promotion.from_statuses, promotion.to_status)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Release with ID {release_id} not found")
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
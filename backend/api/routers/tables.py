@@ -1,29 +1,64 @@
 """
 Tables router for the STTM API.
 """
-from typing import List
-from fastapi import APIRouter, HTTPException, Query
-from backend.service import mapping_service
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from backend.service import async_service, mapping_service
+from backend.api import response_cache
 from backend.api.schemas.table import Table
+from backend.api.schemas.projection import parse_fields, projected_response
 
 router = APIRouter()
 
+table_list_adapter = TypeAdapter(List[Table])
+
 @router.get("/source", response_model=List[Table])
-async def get_source_tables():
+async def get_source_tables(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
+):
     """
     Get all source tables.
     """
     try:
-        return mapping_service.get_source_tables()
+        selected = parse_fields(fields, Table)
+        if selected is not None:
+            tables = await async_service.get_source_tables()
+            return projected_response(mapping_service.select_fields(tables, selected), Table, selected)
+        return await response_cache.cached_json_response(
+            request,
+            "tables/source",
+            (await async_service.get_data_versions())["catalog"],
+            table_list_adapter,
+            mapping_service.get_source_tables,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/target", response_model=List[Table])
-async def get_target_tables():
+async def get_target_tables(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
+):
     """
     Get all target tables.
     """
     try:
-        return mapping_service.get_target_tables()
+        selected = parse_fields(fields, Table)
+        if selected is not None:
+            tables = await async_service.get_target_tables()
+            return projected_response(mapping_service.select_fields(tables, selected), Table, selected)
+        return await response_cache.cached_json_response(
+            request,
+            "tables/target",
+            (await async_service.get_data_versions())["catalog"],
+            table_list_adapter,
+            mapping_service.get_target_tables,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
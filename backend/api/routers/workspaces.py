@@ -0,0 +1,34 @@
+"""
+Workspaces router for the STTM API.
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException
+from backend.service import async_service, workspace_service
+from backend.api.schemas.workspace import Workspace, WorkspaceCreate
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Workspace])
+async def get_workspaces():
+    """
+    Get all workspaces.
+    """
+    try:
+        return await async_service.get_workspaces()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/", response_model=Workspace, status_code=201)
+async def create_workspace(workspace: WorkspaceCreate):
+    """
+    Create an empty workspace. Requests select it with the X-Workspace header
+    or the ?workspace= query parameter.
+    """
+    try:
+        return await async_service.create_workspace(workspace.name)
+    except workspace_service.WorkspaceExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
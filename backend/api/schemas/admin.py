@@ -0,0 +1,56 @@
+"""
+Admin schemas for the STTM API.
+"""
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class StructureMemory(BaseModel):
+    """Schema for the memory of one cached structure."""
+    entries: int = Field(..., description="Number of rows, entries or keys")
+    bytes: int = Field(..., description="Approximate bytes held")
+
+class WorkspaceMemory(BaseModel):
+    """Schema for the memory of a workspace's mappings and the structures derived from them."""
+    name: str = Field(..., description="Name of the workspace")
+    total_bytes: int = Field(..., description="Approximate bytes held by the workspace")
+    mappings: StructureMemory = Field(..., description="Mapping rows")
+    snapshot: StructureMemory = Field(..., description="Snapshot of the rows handed to readers, beyond the rows")
+    change_log: StructureMemory = Field(..., description="Change log for delta sync")
+    mapping_stats: StructureMemory = Field(..., description="Coverage and status counters")
+    sort_indexes: Dict[str, StructureMemory] = Field(..., description="Sort indexes by field")
+    hash_indexes: Dict[str, StructureMemory] = Field(..., description="Hash indexes by field")
+
+class CatalogMemory(BaseModel):
+    """Schema for the memory of the reference data."""
+    total_bytes: int = Field(..., description="Approximate bytes held by the reference data")
+    sections: Dict[str, StructureMemory] = Field(..., description="Reference rows by section")
+    lookups: StructureMemory = Field(..., description="ID lookups, beyond the rows")
+    snapshots: StructureMemory = Field(..., description="Snapshots handed to readers, beyond the rows")
+    change_detection: StructureMemory = Field(..., description="Copies of the sections kept to detect changes")
+
+class TracemallocSite(BaseModel):
+    """Schema for an allocation site traced by tracemalloc."""
+    location: str = Field(..., description="Source file and line")
+    bytes: int = Field(..., description="Bytes allocated there and still alive")
+    blocks: int = Field(..., description="Number of live memory blocks")
+
+class TracemallocReport(BaseModel):
+    """Schema for the state of tracemalloc and its top allocation sites."""
+    tracing: bool = Field(..., description="Whether allocations are traced")
+    current_bytes: int = Field(..., description="Traced bytes currently allocated")
+    peak_bytes: int = Field(..., description="Peak traced bytes since tracing started")
+    top: List[TracemallocSite] = Field(..., description="Allocation sites with the most bytes")
+
+class TracemallocSettings(BaseModel):
+    """Schema for starting or stopping tracemalloc."""
+    enabled: bool = Field(..., description="Whether allocations are traced")
+    frames: int = Field(1, description="Number of frames stored per allocation")
+
+class MemoryReport(BaseModel):
+    """Schema for the approximate memory held by the caches and indexes."""
+    total_bytes: int = Field(..., description="Approximate bytes held by all the structures listed")
+    max_rss_bytes: Optional[int] = Field(None, description="Peak resident set size of the process, if reported by the platform")
+    catalog: CatalogMemory = Field(..., description="Reference data")
+    workspaces: List[WorkspaceMemory] = Field(..., description="Workspaces open in this process")
+    caches: Dict[str, StructureMemory] = Field(..., description="Derived caches by name")
+    tracemalloc: Optional[TracemallocReport] = Field(None, description="Top allocation sites, if requested")
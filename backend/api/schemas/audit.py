@@ -0,0 +1,23 @@
+"""
+Audit schemas for the STTM API.
+"""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class AuditEntry(BaseModel):
+    """Schema for a logged mapping change."""
+    timestamp: str = Field(..., description="Time of the change")
+    workspace: str = Field(..., description="Workspace of the mapping")
+    mapping_id: int = Field(..., description="ID of the mapping")
+    version: int = Field(..., description="Mappings version of the write")
+    action: str = Field(..., description="Kind of change (create, update or delete)")
+    user: Optional[str] = Field(None, description="User who made the change, from the X-User header")
+    release_id: Optional[int] = Field(None, description="Release of the mapping after the change")
+    changes: Dict[str, List[Any]] = Field(..., description="Changed fields as [old value, new value]")
+
+class AuditLogStats(BaseModel):
+    """Schema for the storage of the audit log."""
+    segments: int = Field(..., description="Number of sealed segments")
+    entries: int = Field(..., description="Number of changes in sealed segments")
+    buffered_entries: int = Field(..., description="Number of changes not yet sealed into a segment")
+    bytes: int = Field(..., description="Bytes held by the sealed segments")
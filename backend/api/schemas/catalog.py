@@ -0,0 +1,40 @@
+"""
+Catalog schemas for the STTM API.
+"""
+from typing import Optional, List
+from pydantic import BaseModel, Field
+from backend.api.schemas.table import Table
+from backend.api.schemas.column import Column
+from backend.api.schemas.release import Release
+
+class CatalogSections(BaseModel):
+    """Schema for the reference data sections of the catalog. Unchanged sections of a delta are null."""
+    source_tables: Optional[List[Table]] = Field(None, description="All source tables")
+    source_columns: Optional[List[Column]] = Field(None, description="All source columns")
+    target_tables: Optional[List[Table]] = Field(None, description="All target tables")
+    target_columns: Optional[List[Column]] = Field(None, description="All target columns")
+    releases: Optional[List[Release]] = Field(None, description="All releases")
+
+class Catalog(BaseModel):
+    """Schema for all reference data, or the sections changed since a catalog version."""
+    version: int = Field(..., description="Current catalog version")
+    since: Optional[int] = Field(None, description="Catalog version the sections are relative to, or null for the full catalog")
+    sections: CatalogSections = Field(..., description="Reference data by section")
+
+class CatalogIngestRequest(BaseModel):
+    """Schema for aligning one side of the catalog with a database."""
+    side: str = Field(..., description="Catalog side to align (source or target)")
+    database: str = Field(..., description="File name of the SQLite database in the catalog database directory")
+
+class CatalogIngestResult(BaseModel):
+    """Schema for the result of a catalog ingestion."""
+    side: str = Field(..., description="Catalog side that was aligned")
+    tables_scanned: int = Field(..., description="Number of tables in the database")
+    tables_added: int = Field(..., description="Number of tables added to the catalog")
+    tables_dropped: int = Field(..., description="Number of tables removed from the catalog")
+    tables_changed: int = Field(..., description="Number of existing tables whose structure changed")
+    columns_added: int = Field(..., description="Number of columns added")
+    columns_dropped: int = Field(..., description="Number of columns removed")
+    columns_retyped: int = Field(..., description="Number of columns whose data type changed")
+    orphaned_mapping_ids: List[int] = Field(..., description="IDs of mappings that use a removed column")
+    catalog_version: int = Field(..., description="Catalog version after the ingestion")
@@ -17,4 +17,38 @@ class Column(ColumnBase):
 
     class Config:
         """Pydantic configuration."""
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class RelatedColumn(BaseModel):
+    """Schema for a column on the other side of a column's mappings."""
+    side: str = Field(..., description="Catalog side of the column (source or target)")
+    column_id: int = Field(..., description="ID of the column")
+    table_id: Optional[int] = Field(None, description="ID of the column's table")
+    table_name: Optional[str] = Field(None, description="Name of the column's table")
+    column_name: Optional[str] = Field(None, description="Name of the column")
+
+class ImpactedRelease(BaseModel):
+    """Schema for a release affected by a column change."""
+    id: int = Field(..., description="ID of the release")
+    name: Optional[str] = Field(None, description="Name of the release")
+
+class ColumnImpact(BaseModel):
+    """Schema for the impact of changing or dropping a column."""
+    side: str = Field(..., description="Catalog side of the column (source or target)")
+    column_id: int = Field(..., description="ID of the column")
+    table_id: int = Field(..., description="ID of the column's table")
+    table_name: Optional[str] = Field(None, description="Name of the column's table")
+    column_name: str = Field(..., description="Name of the column")
+    mapping_ids: List[int] = Field(..., description="IDs of the mappings using the column")
+    related_columns: List[RelatedColumn] = Field(..., description="Columns on the other side of those mappings")
+    releases: List[ImpactedRelease] = Field(..., description="Releases containing those mappings")
+    jira_tickets: List[str] = Field(..., description="JIRA tickets referenced by those mappings")
+
+class ColumnImpactRequest(BaseModel):
+    """Schema for a batch impact lookup."""
+    column_ids: List[int] = Field(..., min_length=1, max_length=5000, description="IDs of the columns to analyse")
+
+class ColumnImpactBatch(BaseModel):
+    """Schema for the result of a batch impact lookup."""
+    impacts: List[ColumnImpact] = Field(..., description="Impact of each column found")
+    not_found_ids: List[int] = Field(..., description="Requested column IDs that do not exist")
@@ -0,0 +1,30 @@
+"""
+Lineage schemas for the STTM API.
+"""
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+class LineageNode(BaseModel):
+    """Schema for a column in a lineage graph."""
+    side: str = Field(..., description="Catalog side of the column (source or target)")
+    column_id: int = Field(..., description="ID of the column")
+    table_name: Optional[str] = Field(None, description="Name of the column's table")
+    column_name: Optional[str] = Field(None, description="Name of the column")
+    depth: int = Field(..., description="Number of mapping hops from the starting column")
+
+class LineageEdge(BaseModel):
+    """Schema for an edge in a lineage graph."""
+    from_side: str = Field(..., description="Catalog side of the edge's start column")
+    from_column_id: int = Field(..., description="ID of the edge's start column")
+    to_side: str = Field(..., description="Catalog side of the edge's end column")
+    to_column_id: int = Field(..., description="ID of the edge's end column")
+    kind: str = Field(..., description="'mapping' for mapped columns, 'same_column' for a column carried into the next layer")
+    mapping_count: int = Field(..., description="Number of mappings producing the edge")
+
+class Lineage(BaseModel):
+    """Schema for the lineage of a column."""
+    direction: str = Field(..., description="Traversal direction (upstream or downstream)")
+    max_depth: int = Field(..., description="Maximum number of mapping hops followed")
+    nodes: List[LineageNode] = Field(..., description="Columns reached, including the starting column")
+    edges: List[LineageEdge] = Field(..., description="Edges traversed")
+    truncated: bool = Field(..., description="Whether the depth or node limit cut the traversal short")
@@ -1,7 +1,7 @@
 """
 Mapping schemas for the STTM API.
 """
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -20,6 +20,10 @@ class MappingCreate(MappingBase):
     """Schema for creating a new mapping."""
     pass
 
+class MappingBulkCreate(BaseModel):
+    """Schema for creating many mappings at once."""
+    mappings: List[MappingCreate] = Field(..., min_length=1, max_length=10000, description="Mappings to create")
+
 class MappingUpdate(BaseModel):
     """Schema for updating a mapping."""
     source_table_id: Optional[int] = Field(None, description="ID of the source table")
@@ -30,10 +34,14 @@ class MappingUpdate(BaseModel):
     jira_ticket: Optional[str] = Field(None, description="JIRA ticket reference")
     status: Optional[str] = Field(None, description="Status of the mapping")
     description: Optional[str] = Field(None, description="Description of the mapping")
+    version: Optional[int] = Field(
+        None, description="Version of the mapping the update is based on, instead of an If-Match header"
+    )
 
 class Mapping(MappingBase):
     """Schema for a mapping."""
     id: int = Field(..., description="ID of the mapping")
+    version: int = Field(1, description="Version of the mapping, incremented on every update")
     created_at: str = Field(..., description="Creation timestamp")
     updated_at: str = Field(..., description="Last update timestamp")
 
@@ -47,4 +55,86 @@ class EnrichedMapping(Mapping):
     source_column_name: Optional[str] = Field(None, description="Name of the source column")
     target_table_name: Optional[str] = Field(None, description="Name of the target table")
     target_column_name: Optional[str] = Field(None, description="Name of the target column")
-    release_name: Optional[str] = Field(None, description="Name of the release") 
\ No newline at end of file
+    release_name: Optional[str] = Field(None, description="Name of the release")
+
+class MappingBatchGet(BaseModel):
+    """Schema for getting many mappings by ID at once."""
+    ids: List[int] = Field(..., min_length=1, max_length=10000, description="IDs of the mappings to get")
+
+class MappingBatch(BaseModel):
+    """Schema for mappings got by ID."""
+    mappings: List[EnrichedMapping] = Field(..., description="Mappings found, in the order requested")
+    missing_ids: List[int] = Field(..., description="Requested IDs with no mapping")
+
+class MappingRangeFilter(BaseModel):
+    """Schema for selecting the mappings of a range patch by field values."""
+    release_id: Optional[int] = Field(None, description="Only mappings of this release")
+    status: Optional[str] = Field(None, description="Only mappings with this status")
+    source_table_id: Optional[int] = Field(None, description="Only mappings from this source table")
+    target_table_id: Optional[int] = Field(None, description="Only mappings to this target table")
+
+class MappingRangePatch(BaseModel):
+    """Schema for setting the same fields on many mappings at once."""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=100000, description="IDs of the mappings to update")
+    filter: Optional[MappingRangeFilter] = Field(None, description="Instead of IDs, update the mappings matching this filter")
+    fields: MappingUpdate = Field(..., description="Field values to set on every mapping")
+    versions: Optional[Dict[int, int]] = Field(
+        None, description="Versions of the mappings the patch is based on, by ID; listed mappings must not have changed"
+    )
+
+class MappingRangePatchResult(BaseModel):
+    """Schema for the result of a range patch."""
+    version: int = Field(..., description="Mappings version after the patch")
+    updated_ids: List[int] = Field(..., description="IDs of the mappings updated")
+    unchanged_ids: List[int] = Field(..., description="IDs of the mappings that already had the values")
+    missing_ids: List[int] = Field(..., description="Requested IDs with no mapping")
+
+class MappingChanges(BaseModel):
+    """Schema for the mappings changed since a given version."""
+    version: int = Field(..., description="Current mappings version to pass as 'since' on the next sync")
+    since: Optional[int] = Field(None, description="Mappings version the changes are relative to, or null if the upserts are all mappings")
+    upserts: List[EnrichedMapping] = Field(..., description="Mappings created or updated since the given version")
+    deleted_ids: List[int] = Field(..., description="IDs of mappings deleted since the given version")
+
+class TypeCompatibilityPair(BaseModel):
+    """Schema for the mappings of one source -> target type pair."""
+    source_type: str = Field(..., description="Canonical type of the source columns")
+    target_type: str = Field(..., description="Canonical type of the target columns")
+    level: str = Field(..., description="Compatibility level (exact, safe, lossy, incompatible or unknown)")
+    count: int = Field(..., description="Number of mappings with this type pair")
+
+class TypeCompatibilityReport(BaseModel):
+    """Schema for the data type compatibility of mapped columns."""
+    release_id: Optional[int] = Field(None, description="Release the report is limited to")
+    total: int = Field(..., description="Number of mappings checked")
+    levels: Dict[str, int] = Field(..., description="Number of mappings per compatibility level")
+    compatible_ratio: float = Field(..., description="Share of mappings whose types are an exact or safe match")
+    pairs: List[TypeCompatibilityPair] = Field(..., description="Type pairs found, worst level first")
+    flagged_total: int = Field(..., description="Number of mappings with a lossy, incompatible or unknown type pair")
+    flagged_mapping_ids: List[int] = Field(..., description="IDs of flagged mappings, in ID order, up to the limit")
+
+class CoverageStats(BaseModel):
+    """Schema for the target column coverage and mapping counts of a group of mappings."""
+    total_columns: int = Field(..., description="Number of target columns in the catalog")
+    mapped_columns: int = Field(..., description="Number of target columns with at least one mapping")
+    coverage: float = Field(..., description="Percentage of target columns mapped")
+    mapping_count: int = Field(..., description="Number of mappings")
+    status_counts: Dict[str, int] = Field(..., description="Number of mappings by status")
+
+class TableCoverageStats(CoverageStats):
+    """Schema for the coverage of a target table."""
+    target_table_id: int = Field(..., description="ID of the target table")
+    target_table_name: str = Field(..., description="Name of the target table")
+
+class ReleaseCoverageStats(CoverageStats):
+    """Schema for the coverage of a release."""
+    release_id: int = Field(..., description="ID of the release")
+    release_name: str = Field(..., description="Name of the release")
+
+class MappingStats(CoverageStats):
+    """Schema for mapping coverage and status statistics."""
+    mappings_version: int = Field(..., description="Mappings version the statistics are current to")
+    catalog_version: int = Field(..., description="Catalog version the statistics are current to")
+    release_id: Optional[int] = Field(None, description="Release the totals and tables are limited to")
+    tables: List[TableCoverageStats] = Field(..., description="Coverage of every target table")
+    releases: List[ReleaseCoverageStats] = Field(..., description="Coverage of every release")
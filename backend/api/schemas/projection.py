@@ -0,0 +1,40 @@
+"""
+Sparse fieldset support for the STTM API.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter, create_model
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ?fields= parameter against a schema.
+
+    Raises:
+        ValueError: If a requested field is not part of the schema.
+    """
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    if not requested:
+        raise ValueError("At least one field must be requested")
+    unknown = [f for f in requested if f not in model.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+@lru_cache(maxsize=256)
+def _projection_adapter(model: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    """Build (once per field set) a list adapter for a model restricted to some fields."""
+    field_definitions = {
+        name: (model.model_fields[name].annotation, model.model_fields[name])
+        for name in fields
+    }
+    projected = create_model(f"{model.__name__}Fields", **field_definitions)
+    return TypeAdapter(List[projected])
+
+def projected_response(rows: List[Dict], model: Type[BaseModel], fields: List[str]) -> Response:
+    """Validate and serialize rows using only the requested fields of a schema."""
+    adapter = _projection_adapter(model, tuple(fields))
+    body = adapter.dump_json(adapter.validate_python(rows))
+    return Response(content=body, media_type="application/json")
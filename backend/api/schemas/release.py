@@ -16,4 +16,15 @@ class Release(ReleaseBase):
 
     class Config:
         """Pydantic configuration."""
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class ReleasePromotion(BaseModel):
+    """Schema for promoting the mappings of a release."""
+    from_statuses: List[str] = Field(["Draft", "In Progress"], description="Mapping statuses to promote")
+    to_status: str = Field("Released", description="Status to set on the promoted mappings and the release")
+
+class ReleasePromotionResult(BaseModel):
+    """Schema for the result of a release promotion."""
+    release: Release = Field(..., description="The promoted release")
+    promoted_ids: List[int] = Field(..., description="IDs of the mappings whose status changed")
+    version: int = Field(..., description="Mappings version after the promotion")
@@ -0,0 +1,14 @@
+"""
+Workspace schemas for the STTM API.
+"""
+from pydantic import BaseModel, Field
+
+class WorkspaceCreate(BaseModel):
+    """Schema for creating a workspace."""
+    name: str = Field(..., description="Name of the workspace: letters, digits, '-' and '_'")
+
+class Workspace(BaseModel):
+    """Schema for a workspace."""
+    name: str = Field(..., description="Name of the workspace")
+    mapping_count: int = Field(..., description="Number of mappings in the workspace")
+    mappings_version: int = Field(..., description="Mappings version of the workspace")
@@ -0,0 +1,52 @@
+"""
+Request coalescing for the STTM API.
+Concurrent identical calls share one execution: the first caller runs it and
+later callers await the same result instead of repeating the work.
+"""
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Calls in flight per event loop: loop -> key -> task
+_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Number of calls executed, and of calls that joined one already in flight
+stats = {"executed": 0, "joined": 0}
+
+async def run(key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run a call, or wait for the identical call already in flight.
+
+    The key must identify everything the result depends on, including the data
+    version, so that a call is never joined by a caller expecting newer data.
+    A caller that is cancelled (e.g. its client disconnected) stops waiting
+    without cancelling the call for the others. Results are not kept once the
+    call completes; an exception is raised to every caller.
+
+    Args:
+        key (Hashable): Identifies the call and the data it reads.
+        call (Callable[[], Awaitable[Any]]): Starts the call.
+
+    Returns:
+        Any: The result of the call.
+    """
+    calls = _calls.setdefault(asyncio.get_running_loop(), {})
+    task = calls.get(key)
+    if task is None:
+        task = asyncio.ensure_future(call())
+        calls[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if calls.get(key) is done:
+                del calls[key]
+            # Mark an exception as retrieved even if every caller stopped waiting
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(forget)
+        stats["executed"] += 1
+    else:
+        stats["joined"] += 1
+    return await asyncio.shield(task)
@@ -0,0 +1,34 @@
+"""
+Unit tests for the admin router.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.app import app
+
+client = TestClient(app)
+
+def test_get_memory_report():
+    """Test getting the memory report."""
+    client.get("/api/mappings/enriched")
+    response = client.get("/api/admin/memory")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["total_bytes"] > 0
+    assert report["tracemalloc"] is None
+    assert "default" in [workspace["name"] for workspace in report["workspaces"]]
+    assert report["caches"]["response_cache"]["entries"] >= 1
+    
+    assert client.get("/api/admin/memory?top=-1").status_code == 422
+
+def test_set_tracemalloc():
+    """Test starting and stopping tracemalloc."""
+    response = client.post("/api/admin/tracemalloc", json={"enabled": True})
+    assert response.status_code == 200
+    assert response.json()["tracing"] is True
+    
+    response = client.get("/api/admin/memory?top=3")
+    assert response.json()["tracemalloc"]["tracing"] is True
+    
+    response = client.post("/api/admin/tracemalloc", json={"enabled": False})
+    assert response.json()["tracing"] is False
+    assert client.post("/api/admin/tracemalloc", json={"enabled": True, "frames": 0}).status_code == 400
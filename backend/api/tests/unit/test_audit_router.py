@@ -0,0 +1,47 @@
+"""
+Unit tests for the audit router.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.app import app
+from backend.service import audit_service
+
+client = TestClient(app)
+
+@pytest.fixture
+def audit_workspace(tmp_path):
+    """Log to a temporary directory and send requests to a workspace of the test's own."""
+    audit_service.configure_audit_log(str(tmp_path))
+    name = f"audit-api-{tmp_path.name}"[:64]
+    client.post("/api/workspaces", json={"name": name})
+    try:
+        yield {"X-Workspace": name}
+    finally:
+        audit_service.configure_audit_log(None)
+
+def test_get_audit_entries(audit_workspace):
+    """Test that changes are attributed to the X-User header and can be filtered."""
+    mapping = {"source_table_id": 1, "source_column_id": 1, "target_table_id": 1, "target_column_id": 1, "release_id": 3}
+    created = client.post("/api/mappings/", json=mapping, headers={**audit_workspace, "X-User": "erin"}).json()
+    client.put(
+        f"/api/mappings/{created['id']}", json={"status": "Approved", "version": created["version"]}, headers={**audit_workspace, "X-User": "frank"}
+    )
+    
+    response = client.get("/api/audit/?user=frank&release_id=3", headers=audit_workspace)
+    assert response.status_code == 200
+    entries = response.json()
+    assert [(e["mapping_id"], e["action"]) for e in entries] == [(created["id"], "update")]
+    assert entries[0]["changes"] == {"status": ["Draft", "Approved"]}
+    
+    response = client.get(f"/api/audit/?mapping_id={created['id']}", headers=audit_workspace)
+    assert [e["user"] for e in response.json()] == ["frank", "erin"]
+    
+    # Other workspaces do not see these changes
+    assert client.get(f"/api/audit/?mapping_id={created['id']}&user=erin").json() == []
+    
+    response = client.post("/api/admin/audit-log/maintenance?force=true")
+    assert response.status_code == 200
+    assert response.json()["buffered_entries"] == 0
+    assert len(client.get(f"/api/audit/?mapping_id={created['id']}", headers=audit_workspace).json()) == 2
+    
+    assert client.get("/api/audit/?limit=0").status_code == 422
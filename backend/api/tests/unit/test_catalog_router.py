@@ -0,0 +1,71 @@
+"""
+Unit tests for the catalog router.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.app import app
+from backend.cache import dummy_data
+
+client = TestClient(app)
+
+def test_get_catalog():
+    """Test getting all reference data in one versioned payload."""
+    response = client.get("/api/catalog/")
+    assert response.status_code == 200
+    catalog = response.json()
+    assert catalog["since"] is None
+    for section in ["source_tables", "source_columns", "target_tables", "target_columns", "releases"]:
+        assert len(catalog["sections"][section]) > 0
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    
+    # Revalidation with the ETag is answered without a body
+    response = client.get("/api/catalog/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    # Pinning the current version makes the response cacheable for a long time
+    response = client.get(f"/api/catalog/?version={catalog['version']}")
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    assert client.get(f"/api/catalog/?version={catalog['version'] + 1}").status_code == 404
+
+def test_get_catalog_changes():
+    """Test getting only the catalog sections changed since a version."""
+    version = client.get("/api/catalog/").json()["version"]
+    
+    response = client.get(f"/api/catalog/changes?since={version}")
+    assert response.status_code == 200
+    assert all(rows is None for rows in response.json()["sections"].values())
+    
+    table = {"id": 60, "name": "catalog_test", "description": "Catalog delta test"}
+    dummy_data.target_tables_cache.append(table)
+    dummy_data.mark_catalog_changed()
+    try:
+        response = client.get(f"/api/catalog/changes?since={version}")
+        changes = response.json()
+        assert changes["version"] == version + 1
+        assert changes["since"] == version
+        assert table in changes["sections"]["target_tables"]
+        assert {name for name, rows in changes["sections"].items() if rows is not None} == {"target_tables"}
+        assert client.get(
+            f"/api/catalog/changes?since={version}", headers={"If-None-Match": response.headers["etag"]}
+        ).status_code == 304
+        
+        # The full payload follows the new version
+        assert table in client.get("/api/catalog/").json()["sections"]["target_tables"]
+    finally:
+        dummy_data.target_tables_cache.remove(table)
+        dummy_data.mark_catalog_changed()
+    
+    # A version from the future (e.g. before a restart) gets the full catalog
+    response = client.get("/api/catalog/changes?since=100000")
+    assert response.json()["since"] is None
+    assert response.json()["sections"]["releases"] is not None
+
+def test_ingest_catalog_errors():
+    """Test that ingestion rejects unknown databases and invalid sides."""
+    response = client.post("/api/catalog/ingest", json={"side": "source", "database": "missing.db"})
+    assert response.status_code == 404
+    response = client.post("/api/catalog/ingest", json={"side": "source", "database": "../sttm.db"})
+    assert response.status_code == 400
@@ -59,4 +59,53 @@ def test_get_target_columns_by_table():
     
     # Check that all columns have the expected table ID
     for column in columns:
-        assert column["table_id"] == 1 
\ No newline at end of file
+        assert column["table_id"] == 1
+
+def test_get_columns_sparse_fields():
+    """Test getting columns with a sparse fieldset."""
+    response = client.get("/api/columns/source?table_id=1&fields=id,name,table_id")
+    assert response.status_code == 200
+    columns = response.json()
+    assert len(columns) > 0
+    for column in columns:
+        assert set(column.keys()) == {"id", "name", "table_id"}
+        assert column["table_id"] == 1
+
+def test_get_columns_compressed():
+    """Test that the full column list is served gzipped."""
+    response = client.get("/api/columns/target", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) > 0
+
+def test_get_source_column_impact():
+    """Test getting the impact of a source column."""
+    response = client.get("/api/columns/source/1/impact")
+    assert response.status_code == 200
+    impact = response.json()
+    assert impact["column_id"] == 1
+    assert impact["table_name"] == "customer"
+    assert len(impact["mapping_ids"]) > 0
+    assert {"side": "target", "column_id": 1, "table_id": 1, "table_name": "dim_customer",
+            "column_name": "customer_key"} in impact["related_columns"]
+    assert {"id": 1, "name": "R1.0"} in impact["releases"]
+    assert "STTM-101" in impact["jira_tickets"]
+    
+    # Test a non-existent column
+    response = client.get("/api/columns/source/9999/impact")
+    assert response.status_code == 404
+
+def test_get_target_columns_impact_batch():
+    """Test getting the impact of many target columns in one request."""
+    response = client.post("/api/columns/target/impact", json={"column_ids": [1, 8, 9999]})
+    assert response.status_code == 200
+    result = response.json()
+    assert [i["column_id"] for i in result["impacts"]] == [1, 8]
+    assert result["not_found_ids"] == [9999]
+    
+    fact_order = result["impacts"][1]
+    assert any(c["side"] == "source" and c["column_id"] == 8 for c in fact_order["related_columns"])
+    
+    # Test an empty batch
+    response = client.post("/api/columns/target/impact", json={"column_ids": []})
+    assert response.status_code == 422
@@ -0,0 +1,36 @@
+"""
+Unit tests for the lineage router.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.app import app
+
+client = TestClient(app)
+
+def test_get_column_lineage():
+    """Test getting the downstream lineage of a source column."""
+    response = client.get("/api/lineage/columns/source/1/downstream?depth=3")
+    assert response.status_code == 200
+    lineage = response.json()
+    assert lineage["direction"] == "downstream"
+    
+    # The starting column is at depth 0
+    root = [n for n in lineage["nodes"] if n["depth"] == 0]
+    assert root == [{
+        "side": "source",
+        "column_id": 1,
+        "table_name": "customer",
+        "column_name": "customer_id",
+        "depth": 0,
+    }]
+
+def test_get_column_lineage_errors():
+    """Test lineage requests with invalid parameters."""
+    response = client.get("/api/lineage/columns/source/9999/downstream")
+    assert response.status_code == 404
+    
+    response = client.get("/api/lineage/columns/middle/1/downstream")
+    assert response.status_code == 400
+    
+    response = client.get("/api/lineage/columns/source/1/downstream?depth=0")
+    assert response.status_code == 422
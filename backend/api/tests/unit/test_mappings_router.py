@@ -150,7 +150,9 @@ def test_update_mapping():
         "description": "Updated description",
     }
     
-    response = client.put(f"/api/mappings/{first_mapping['id']}", json=updated_data)
+    response = client.put(
+        f"/api/mappings/{first_mapping['id']}", json=updated_data, headers={"If-Match": f'"{first_mapping["version"]}"'}
+    )
     assert response.status_code == 200
     updated_mapping = response.json()
     
@@ -166,7 +168,7 @@ def test_update_mapping():
     assert updated_mapping["target_column_id"] == first_mapping["target_column_id"]
     
     # Test updating a non-existent mapping
-    response = client.put("/api/mappings/9999", json=updated_data)
+    response = client.put("/api/mappings/9999", json={**updated_data, "version": 1})
     assert response.status_code == 404
 
 def test_delete_mapping():
@@ -205,4 +207,242 @@ def test_delete_mapping():
     
     # Test deleting a non-existent mapping
     response = client.delete("/api/mappings/9999")
-    assert response.status_code == 404 
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_get_mappings_sorted():
+    """Test getting mappings sorted and paginated."""
+    response = client.get("/api/mappings/?sort=source_table_name")
+    assert response.status_code == 200
+    mappings = response.json()
+    names = [m["source_table_name"] for m in mappings]
+    assert names == sorted(names)
+    
+    # Check that limit and offset select a slice of the sorted order
+    response = client.get("/api/mappings/enriched?sort=source_table_name&offset=1&limit=2")
+    assert response.status_code == 200
+    assert [m["id"] for m in response.json()] == [m["id"] for m in mappings[1:3]]
+    
+    # Test sorting by an unsupported field
+    response = client.get("/api/mappings/?sort=unknown")
+    assert response.status_code == 400
+
+def test_get_mappings_sparse_fields():
+    """Test getting mappings with a sparse fieldset."""
+    response = client.get("/api/mappings/?fields=id,target_column_name&sort=id&limit=2")
+    assert response.status_code == 200
+    mappings = response.json()
+    assert len(mappings) == 2
+    for mapping in mappings:
+        assert set(mapping.keys()) == {"id", "target_column_name"}
+    
+    response = client.get("/api/mappings/enriched?fields=id,release_name")
+    assert response.status_code == 200
+    assert all(set(m.keys()) == {"id", "release_name"} for m in response.json())
+    
+    # Test requesting an unknown field
+    response = client.get("/api/mappings/?fields=id,password")
+    assert response.status_code == 400
+
+def test_enriched_mappings_compressed_cache():
+    """Test that the enriched list is served gzipped from the response cache."""
+    response = client.get("/api/mappings/enriched", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    first_body = response.json()
+    
+    # A second request for the same data version reuses the cached body
+    response = client.get("/api/mappings/", headers={"Accept-Encoding": "gzip"})
+    assert response.json() == first_body
+    
+    # Clients that do not accept gzip get the plain body
+    response = client.get("/api/mappings/enriched", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == first_body
+    
+    # A write invalidates the cached body
+    first_mapping = first_body[0]
+    client.put(f"/api/mappings/{first_mapping['id']}", json={"description": "Cache invalidated"}, headers={"If-Match": "*"})
+    response = client.get("/api/mappings/enriched")
+    assert response.json()[0]["description"] == "Cache invalidated"
+
+def test_get_mapping_changes():
+    """Test syncing mapping changes since a version."""
+    response = client.get("/api/mappings/changes")
+    assert response.status_code == 200
+    version = response.json()["version"]
+    
+    # Create, update and delete mappings after the version
+    created = client.post("/api/mappings/", json={
+        "source_table_id": 2,
+        "source_column_id": 6,
+        "target_table_id": 2,
+        "target_column_id": 6,
+        "status": "Draft",
+    }).json()
+    deleted = client.post("/api/mappings/", json={
+        "source_table_id": 3,
+        "source_column_id": 9,
+        "target_table_id": 3,
+        "target_column_id": 9,
+    }).json()
+    client.put(f"/api/mappings/{created['id']}", json={"status": "Approved", "version": created["version"]})
+    client.delete(f"/api/mappings/{deleted['id']}")
+    
+    response = client.get(f"/api/mappings/changes?since={version}")
+    assert response.status_code == 200
+    changes = response.json()
+    assert changes["version"] > version
+    assert [m["id"] for m in changes["upserts"]] == [created["id"]]
+    assert changes["upserts"][0]["status"] == "Approved"
+    assert changes["upserts"][0]["target_column_name"] == "price"
+    assert changes["deleted_ids"] == [deleted["id"]]
+    
+    # Nothing has changed since the latest version
+    response = client.get(f"/api/mappings/changes?since={changes['version']}")
+    assert response.json()["since"] == changes["version"]
+    assert response.json()["upserts"] == []
+    assert response.json()["deleted_ids"] == []
+    
+    # A version the server has not reached yet (e.g. from before a restart) gets all mappings
+    response = client.get(f"/api/mappings/changes?since={changes['version'] + 1000}")
+    snapshot = response.json()
+    assert snapshot["since"] is None
+    assert created["id"] in [m["id"] for m in snapshot["upserts"]]
+    assert deleted["id"] not in [m["id"] for m in snapshot["upserts"]]
+    assert snapshot["deleted_ids"] == []
+
+def test_create_mapping_conflict():
+    """Test that duplicate mappings are rejected with 409."""
+    new_mapping = {
+        "source_table_id": 2,
+        "source_column_id": 4,
+        "target_table_id": 2,
+        "target_column_id": 4,
+        "release_id": 2,
+    }
+    response = client.post("/api/mappings/", json=new_mapping)
+    assert response.status_code == 409
+
+def test_create_mappings_bulk():
+    """Test creating mappings in bulk."""
+    rows = [
+        {"source_table_id": 1, "source_column_id": 3, "target_table_id": 1, "target_column_id": 3, "release_id": 1},
+        {"source_table_id": 2, "source_column_id": 5, "target_table_id": 2, "target_column_id": 5, "release_id": 1},
+    ]
+    response = client.post("/api/mappings/bulk", json={"mappings": rows + [rows[1]]})
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["index"] == 2
+    
+    response = client.post("/api/mappings/bulk", json={"mappings": rows})
+    assert response.status_code == 201
+    created = response.json()
+    assert len(created) == 2
+    
+    for mapping in created:
+        client.delete(f"/api/mappings/{mapping['id']}")
+
+def test_mapping_invalid_references():
+    """Test that invalid foreign keys are rejected with 400."""
+    response = client.post("/api/mappings/", json={
+        "source_table_id": 1,
+        "source_column_id": 1,
+        "target_table_id": 1,
+        "target_column_id": 1,
+        "release_id": 99,
+    })
+    assert response.status_code == 400
+    assert "Release 99 does not exist" in response.json()["detail"]
+    
+    first_mapping = client.get("/api/mappings/").json()[0]
+    response = client.put(f"/api/mappings/{first_mapping['id']}", json={"target_column_id": 999}, headers={"If-Match": "*"})
+    assert response.status_code == 400
+
+def test_get_type_compatibility_report():
+    """Test getting the data type compatibility report."""
+    response = client.get("/api/mappings/compatibility?release_id=1")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["release_id"] == 1
+    assert report["total"] == sum(report["levels"].values())
+    assert report["total"] == sum(pair["count"] for pair in report["pairs"])
+
+def test_get_mapping_stats():
+    """Test getting the mapping coverage and status statistics."""
+    response = client.get("/api/mappings/stats?release_id=1")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["release_id"] == 1
+    assert stats["mapping_count"] == sum(table["mapping_count"] for table in stats["tables"])
+    assert {release["release_id"] for release in stats["releases"]} >= {1}
+    assert all(0 <= table["coverage"] <= 100 for table in stats["tables"])
+
+def test_get_mappings_by_ids():
+    """Test getting many mappings by ID in one request."""
+    response = client.post("/api/mappings/batch-get", json={"ids": [2, 1, 99999]})
+    assert response.status_code == 200
+    batch = response.json()
+    assert [m["id"] for m in batch["mappings"]] == [2, 1]
+    assert "source_table_name" in batch["mappings"][0]
+    assert batch["missing_ids"] == [99999]
+    
+    assert client.post("/api/mappings/batch-get", json={"ids": []}).status_code == 422
+
+def test_patch_mappings_range():
+    """Test setting a field on a range of mappings in one request."""
+    rows = [
+        {"source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 7, "release_id": 1},
+        {"source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 9, "release_id": 1},
+    ]
+    ids = [m["id"] for m in client.post("/api/mappings/bulk", json={"mappings": rows}).json()]
+    
+    response = client.patch("/api/mappings/range", json={"ids": ids, "fields": {"status": "In Review"}})
+    assert response.status_code == 200
+    assert response.json()["updated_ids"] == ids
+    assert all(client.get(f"/api/mappings/{i}").json()["status"] == "In Review" for i in ids)
+    
+    response = client.patch("/api/mappings/range", json={"ids": ids, "fields": {"target_column_id": 9}})
+    assert response.status_code == 409
+    assert response.json()["detail"][0]["mapping_id"] == ids[0]
+    
+    assert client.patch("/api/mappings/range", json={"fields": {"status": "Draft"}}).status_code == 400
+    for range_filter in ({}, {"release_id": None}):
+        response = client.patch("/api/mappings/range", json={"filter": range_filter, "fields": {"status": "Draft"}})
+        assert response.status_code == 400
+    
+    for mapping_id in ids:
+        client.delete(f"/api/mappings/{mapping_id}")
+
+def test_update_mapping_if_match():
+    """Test optimistic concurrency on mapping updates with If-Match."""
+    mapping = client.post("/api/mappings/", json={
+        "source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 7, "release_id": 1,
+    }).json()
+    etag = client.get(f"/api/mappings/{mapping['id']}").headers["etag"]
+    assert etag == '"1"'
+    
+    response = client.put(f"/api/mappings/{mapping['id']}", json={"status": "In Progress"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["etag"] == '"2"'
+    
+    # A stale write gets 409 with the current row, whether the version is in If-Match or the body
+    response = client.put(f"/api/mappings/{mapping['id']}", json={"status": "Draft"}, headers={"If-Match": etag})
+    assert response.status_code == 409
+    assert response.json()["detail"][0]["mapping"]["status"] == "In Progress"
+    response = client.put(f"/api/mappings/{mapping['id']}", json={"status": "Draft", "version": 1})
+    assert response.status_code == 409
+    
+    response = client.patch("/api/mappings/range", json={
+        "ids": [mapping["id"]], "fields": {"status": "Approved"}, "versions": {str(mapping["id"]): 1},
+    })
+    assert response.status_code == 409
+    
+    assert client.put(f"/api/mappings/{mapping['id']}", json={}, headers={"If-Match": "abc"}).status_code == 400
+    
+    # An update that names no version is refused rather than applied blindly
+    response = client.put(f"/api/mappings/{mapping['id']}", json={"status": "Draft"})
+    assert response.status_code == 428
+    assert client.get(f"/api/mappings/{mapping['id']}").json()["status"] == "In Progress"
+    assert client.put(f"/api/mappings/{mapping['id']}", json={"status": "Draft"}, headers={"If-Match": "*"}).status_code == 200
+    
+    client.delete(f"/api/mappings/{mapping['id']}")
@@ -20,4 +20,18 @@ def test_get_releases():
         assert "id" in release
         assert "name" in release
         assert "description" in release
-        assert "status" in release 
\ No newline at end of file
+        assert "status" in release
+
+def test_promote_release():
+    """Test promoting a release."""
+    # Promote nothing but check the response shape using a status no mapping has
+    response = client.post("/api/releases/2/promote", json={"from_statuses": ["Nonexistent"], "to_status": "Released"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["release"]["id"] == 2
+    assert result["release"]["status"] == "Released"
+    assert result["promoted_ids"] == []
+    
+    # Test promoting a non-existent release
+    response = client.post("/api/releases/9999/promote")
+    assert response.status_code == 404
@@ -0,0 +1,99 @@
+"""
+Unit tests for request coalescing.
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+from backend.api import single_flight
+from backend.api.app import app
+from backend.service import mapping_service
+
+def test_concurrent_calls_share_one_execution():
+    """Test that identical concurrent calls run once and different keys run separately."""
+    runs = []
+
+    async def compute(value):
+        runs.append(value)
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    async def scenario():
+        return await asyncio.gather(
+            *(single_flight.run(("double", 1), lambda: compute(1)) for _ in range(5)),
+            single_flight.run(("double", 2), lambda: compute(2)),
+        )
+
+    assert asyncio.run(scenario()) == [2, 2, 2, 2, 2, 4]
+    assert sorted(runs) == [1, 2]
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    """Test that a failed call raises to all waiters and the next call runs again."""
+    runs = []
+
+    async def fail():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(single_flight.run("fail", fail) for _ in range(3)), return_exceptions=True
+        )
+        with pytest.raises(RuntimeError):
+            await single_flight.run("fail", fail)
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(runs) == 2
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    """Test that the call completes for the other callers when one stops waiting."""
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(single_flight.run("slow", compute))
+        second = asyncio.ensure_future(single_flight.run("slow", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+def test_concurrent_cache_misses_render_once(monkeypatch):
+    """Test that concurrent requests after a write load and serialize the enriched list once."""
+    loads = []
+    release = threading.Event()
+    get_enriched_mappings = mapping_service.get_enriched_mappings
+
+    def slow_get_enriched_mappings():
+        loads.append(1)
+        release.wait(5)
+        return get_enriched_mappings()
+
+    monkeypatch.setattr(mapping_service, "get_enriched_mappings", slow_get_enriched_mappings)
+    created = mapping_service.create_mapping({
+        "source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 9,
+        "release_id": 1,
+    })
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            requests = [asyncio.ensure_future(client.get("/api/mappings/enriched")) for _ in range(8)]
+            await asyncio.sleep(0.1)
+            release.set()
+            return await asyncio.gather(*requests)
+
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        mapping_service.delete_mapping(created["id"])
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.content for response in responses}) == 1
+    assert created["id"] in [mapping["id"] for mapping in responses[0].json()]
+    assert len(loads) == 1
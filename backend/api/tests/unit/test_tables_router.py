@@ -33,4 +33,17 @@ def test_get_target_tables():
     for table in tables:
         assert "id" in table
         assert "name" in table
-        assert "description" in table 
\ No newline at end of file
+        assert "description" in table
+
+def test_get_tables_sparse_fields():
+    """Test getting tables with a sparse fieldset."""
+    response = client.get("/api/tables/source?fields=id,name")
+    assert response.status_code == 200
+    tables = response.json()
+    assert len(tables) > 0
+    for table in tables:
+        assert set(table.keys()) == {"id", "name"}
+    
+    # Test requesting an unknown field
+    response = client.get("/api/tables/target?fields=owner")
+    assert response.status_code == 400
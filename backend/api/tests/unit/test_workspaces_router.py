@@ -0,0 +1,47 @@
+"""
+Unit tests for the workspaces router.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.app import app
+
+client = TestClient(app)
+
+def test_create_workspace():
+    """Test creating a workspace."""
+    response = client.post("/api/workspaces/", json={"name": "router-create"})
+    assert response.status_code == 201
+    assert response.json() == {"name": "router-create", "mapping_count": 0, "mappings_version": 0}
+    
+    assert client.post("/api/workspaces/", json={"name": "router-create"}).status_code == 409
+    assert client.post("/api/workspaces/", json={"name": "-invalid"}).status_code == 400
+    
+    response = client.get("/api/workspaces/")
+    assert response.status_code == 200
+    names = [workspace["name"] for workspace in response.json()]
+    assert "default" in names
+    assert "router-create" in names
+
+def test_requests_are_scoped_by_workspace():
+    """Test that mapping endpoints only see the selected workspace."""
+    client.post("/api/workspaces/", json={"name": "router-scoped"})
+    headers = {"X-Workspace": "router-scoped"}
+    default_mappings = client.get("/api/mappings/").json()
+    
+    response = client.post("/api/mappings/", headers=headers, json={
+        "source_table_id": 1,
+        "source_column_id": 1,
+        "target_table_id": 1,
+        "target_column_id": 1,
+        "release_id": 1,
+    })
+    assert response.status_code == 201
+    created = response.json()
+    assert created["id"] == 1
+    
+    assert client.get("/api/mappings/", headers=headers).json()[0]["id"] == created["id"]
+    assert len(client.get("/api/mappings/?workspace=router-scoped").json()) == 1
+    assert client.get("/api/mappings/").json() == default_mappings
+    
+    response = client.get("/api/mappings/", headers={"X-Workspace": "router-missing"})
+    assert response.status_code == 404
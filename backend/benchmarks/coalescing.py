@@ -0,0 +1,103 @@
+"""
+Request coalescing benchmark for release-cut bursts.
+
+Seeds the cache with synthetic mappings, then repeats a burst scenario: one
+mapping write (which invalidates the cached enriched list), followed by many
+concurrent GET /api/mappings/enriched requests, as when analysts all reload
+after a release is cut. It reports the CPU time, the number of times the list
+was built and the burst latency, twice: with concurrent identical requests
+coalesced (the normal mode) and with each request building its own response.
+
+Usage:
+    python -m backend.benchmarks.coalescing [--mappings 20000] [--clients 32] [--bursts 10]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+
+from backend.api import single_flight
+from backend.api.app import app
+from backend.cache import dummy_data
+from backend.service import mapping_service
+
+async def _uncoalesced(key, call):
+    """Run every call, as before request coalescing."""
+    return await call()
+
+def _seed(count: int) -> List[int]:
+    """Add synthetic mappings straight to the cache, bypassing validation."""
+    with dummy_data.write_transaction():
+        return [
+            dummy_data.add_mapping({
+                "source_table_id": 1 + i % 3,
+                "source_column_id": 1 + i % 9,
+                "target_table_id": 1 + i % 3,
+                "target_column_id": 1 + i % 9,
+                "release_id": 1 + i % 3,
+                "jira_ticket": f"BENCH-{i}",
+                "status": "Draft",
+                "description": f"Benchmark mapping {i}",
+            })["id"]
+            for i in range(count)
+        ]
+
+def _count_loads(loads: List[int]) -> None:
+    """Count the builds of the enriched mapping list."""
+    get_enriched_mappings = mapping_service.get_enriched_mappings
+
+    def counted_get_enriched_mappings():
+        loads.append(1)
+        return get_enriched_mappings()
+
+    mapping_service.get_enriched_mappings = counted_get_enriched_mappings
+
+async def run(mapping_id: int, clients: int, bursts: int) -> Dict[str, float]:
+    """Run the bursts and return the CPU time, wall time and requests served."""
+    transport = httpx.ASGITransport(app=app)
+    served = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for burst in range(bursts):
+            dummy_data.update_mapping(mapping_id, {"description": f"Burst {burst}"})
+            responses = await asyncio.gather(*(client.get("/api/mappings/enriched") for _ in range(clients)))
+            for response in responses:
+                response.raise_for_status()
+            served += len(responses)
+        return {
+            "cpu": time.process_time() - cpu_start,
+            "wall": time.perf_counter() - wall_start,
+            "requests": served,
+        }
+
+def _report(mode: str, result: Dict[str, float], loads: int, bursts: int) -> None:
+    print(
+        f"{mode:>12} {result['cpu']:>8.2f} {loads:>7} {result['wall'] / bursts * 1000:>10.0f} "
+        f"{result['requests'] / result['wall']:>8.0f}"
+    )
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mappings", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent requests per burst")
+    parser.add_argument("--bursts", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    mapping_ids = _seed(args.mappings)
+    loads: List[int] = []
+    _count_loads(loads)
+    print(f"{args.mappings} mappings, {args.bursts} bursts of {args.clients} concurrent requests")
+    print(f"{'mode':>12} {'cpu s':>8} {'builds':>7} {'burst ms':>10} {'req/s':>8}")
+
+    coalesced = asyncio.run(run(mapping_ids[0], args.clients, args.bursts))
+    _report("coalesced", coalesced, len(loads), args.bursts)
+
+    loads.clear()
+    single_flight.run = _uncoalesced
+    uncoalesced = asyncio.run(run(mapping_ids[0], args.clients, args.bursts))
+    _report("uncoalesced", uncoalesced, len(loads), args.bursts)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Interleaved read and write latency benchmark for the copy-on-write cache.
+
+Seeds a workspace with synthetic mappings, then alternates a reader (the
+first page of the mappings sorted by updated_at, newest first, which takes a
+snapshot of the mappings and the sort index) with a single-mapping update, as
+when analysts page through the list while others edit. It reports the latency
+of each kind twice: with the mappings and sort indexes copied per chunk on the
+first write after a read (the normal mode), and with each copied whole, as
+before chunked copy-on-write.
+
+Usage:
+    python -m backend.benchmarks.interleaved_writes [--mappings 100000] [--rounds 2000] [--page-size 50]
+"""
+import argparse
+import statistics
+import time
+from itertools import islice
+from typing import Dict, List
+
+from backend.cache import chunked_dict, dummy_data, sort_index
+
+def _seed(count: int) -> List[int]:
+    """Add synthetic mappings straight to the cache, bypassing validation."""
+    with dummy_data.write_transaction():
+        return [
+            mapping["id"]
+            for mapping in dummy_data.add_mappings([
+                {
+                    "source_table_id": 1 + i % 3,
+                    "source_column_id": 1 + i % 9,
+                    "target_table_id": 1 + i % 3,
+                    "target_column_id": 1 + i % 9,
+                    "release_id": 1 + i % 3,
+                    "jira_ticket": f"BENCH-{i}",
+                    "status": "Draft",
+                    "description": f"Benchmark mapping {i}",
+                }
+                for i in range(count)
+            ])
+        ]
+
+def run(workspace_name: str, mappings: int, rounds: int, page_size: int) -> Dict[str, List[float]]:
+    """Seed a new workspace, run the rounds in it and return the latencies of each operation kind."""
+    dummy_data.create_workspace(workspace_name)
+    latencies: Dict[str, List[float]] = {"read": [], "write": []}
+    with dummy_data.use_workspace(workspace_name):
+        mapping_ids = _seed(mappings)
+        workspace = dummy_data.workspace()
+        for round_number in range(rounds):
+            start = time.perf_counter()
+            page = list(islice(workspace.iter_sorted_mappings("updated_at", descending=True), page_size))
+            latencies["read"].append(time.perf_counter() - start)
+            assert len(page) == page_size
+
+            mapping_id = mapping_ids[round_number * 7919 % len(mapping_ids)]
+            start = time.perf_counter()
+            dummy_data.update_mapping(mapping_id, {"description": f"Round {round_number}"})
+            latencies["write"].append(time.perf_counter() - start)
+    return latencies
+
+def _report(mode: str, latencies: Dict[str, List[float]]) -> None:
+    for kind, values in latencies.items():
+        values = sorted(values)
+        quantiles = statistics.quantiles(values, n=100)
+        print(
+            f"{mode:>10} {kind:>6} {quantiles[49] * 1000:>8.3f} {quantiles[94] * 1000:>8.3f} "
+            f"{quantiles[98] * 1000:>8.3f} {values[-1] * 1000:>8.3f}"
+        )
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mappings", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=2000, help="Read-then-write rounds per mode")
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{args.mappings} mappings, {args.rounds} rounds of a {args.page_size}-row page read then one update")
+    print(f"{'mode':>10} {'op':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    _report("chunked", run("bench-chunked", args.mappings, args.rounds, args.page_size))
+
+    # One chunk and one block holding everything: every write after a read copies it all
+    chunked_dict.CHUNK_BITS = 62
+    sort_index.BLOCK_SIZE = 2 ** 62
+    _report("whole copy", run("bench-whole-copy", args.mappings, args.rounds, args.page_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+Concurrent load test against a local server.
+
+Starts the API with uvicorn, loads a synthetic catalog through the catalog
+ingest endpoint and seeds a fresh workspace with mappings, so every run starts
+from the same state. It then runs a mix of concurrent async clients for a fixed
+time:
+
+    browse  grid browsing: sorted pages, single rows, batch lookups, statistics
+            and the occasional full list
+    import  bulk imports of new mappings
+    edit    bursts of concurrent edits to mappings the client owns
+
+It reports throughput, latency percentiles and error rates per operation, then
+checks data invariants through the API: unique IDs, every imported mapping
+present with its last edit, the uniqueness rules, and the sort indexes, hash
+indexes, counters and change log agreeing with the mapping list. The exit
+status is 1 if any request failed or any invariant does not hold.
+
+Usage:
+    python -m backend.benchmarks.load_test [--browse 8] [--import 1] [--edit 2] [--seconds 10]
+
+The server runs as a single worker: the catalog lives in each worker's memory,
+so the synthetic catalog cannot be loaded into every worker of a multi-worker
+server. Use backend.benchmarks.worker_scaling to measure scaling across workers.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+
+from backend.benchmarks.worker_scaling import PROJECT_ROOT, _free_port, _wait_until_healthy
+
+WORKSPACE = "load-test"
+CATALOG_DATABASE = "load_test_catalog.db"
+COLUMN_TYPES = ["VARCHAR(100)", "INTEGER", "DECIMAL(10,2)", "DATE", "TIMESTAMP"]
+EDIT_STATUSES = ["Draft", "In Progress", "Review"]
+
+# Sort fields the grid pages through; every sort index is checked afterwards
+SORT_FIELDS = [
+    "id", "source_table_name", "source_column_name", "target_table_name", "target_column_name",
+    "release_name", "status", "created_at", "updated_at",
+]
+
+class Recorder:
+    """Latencies and failed requests per operation."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.rows_imported = 0
+
+    async def call(self, operation: str, request) -> Optional[httpx.Response]:
+        """
+        Time a request.
+
+        Returns:
+            Optional[httpx.Response]: The response, or None if the request failed.
+        """
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        self.latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        if response is None or response.status_code >= 400:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+            return None
+        return response
+
+class LoadState:
+    """What the clients have written, to check the server's data against."""
+
+    def __init__(self, source_columns: List[Tuple[int, int]], target_slots: List[Tuple]):
+        # (table ID, column ID) of every source column
+        self.source_columns = source_columns
+        # (release ID, table ID, column ID) target slots not mapped yet; each can take one mapping
+        self.target_slots = target_slots
+        self.mapping_ids: List[int] = []
+        self.created: Set[int] = set()
+        # Fields of the last successful edit of each edited mapping
+        self.expected: Dict[int, Dict] = {}
+
+    def take_mappings(self, count: int, rng: random.Random) -> List[Dict]:
+        """Build up to count new mappings on unmapped target slots."""
+        rows = []
+        for _ in range(min(count, len(self.target_slots))):
+            release_id, target_table_id, target_column_id = self.target_slots.pop()
+            source_table_id, source_column_id = rng.choice(self.source_columns)
+            rows.append({
+                "source_table_id": source_table_id,
+                "source_column_id": source_column_id,
+                "target_table_id": target_table_id,
+                "target_column_id": target_column_id,
+                "release_id": release_id,
+                "status": "Draft",
+                "description": "Load test mapping",
+            })
+        return rows
+
+    def add_created(self, mappings: List[Dict]) -> List[int]:
+        mapping_ids = [mapping["id"] for mapping in mappings]
+        self.mapping_ids.extend(mapping_ids)
+        self.created.update(mapping_ids)
+        return mapping_ids
+
+def _write_catalog_database(path: str, tables: int, columns: int) -> None:
+    """Create a SQLite database whose structure is the synthetic catalog."""
+    connection = sqlite3.connect(path)
+    try:
+        for table in range(tables):
+            definitions = ", ".join(
+                f"col_{column} {COLUMN_TYPES[(table + column) % len(COLUMN_TYPES)]}" for column in range(columns)
+            )
+            connection.execute(f"CREATE TABLE load_table_{table} ({definitions})")
+        connection.commit()
+    finally:
+        connection.close()
+
+@contextmanager
+def local_server(directory: str) -> Iterator[str]:
+    """Run the API on a free port with its catalog database and audit log in a directory, and yield its base URL."""
+    port = _free_port()
+    env = {**os.environ, "STTM_CATALOG_DIR": directory, "STTM_AUDIT_DIR": os.path.join(directory, "audit")}
+    env.pop("STTM_SHARED_DB", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.api.app:app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=PROJECT_ROOT, env=env,
+    )
+    try:
+        _wait_until_healthy(port)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait()
+
+async def prepare(client: httpx.AsyncClient, args, rng: random.Random) -> LoadState:
+    """Load the synthetic catalog, create the workspace and seed it with mappings."""
+    # The client's requests name the workspace, which does not exist yet
+    response = await client.post("/api/workspaces/", json={"name": WORKSPACE}, headers={"X-Workspace": "default"})
+    response.raise_for_status()
+    for side in ("source", "target"):
+        response = await client.post("/api/catalog/ingest", json={"side": side, "database": CATALOG_DATABASE})
+        response.raise_for_status()
+
+    sections = (await client.get("/api/catalog/")).json()["sections"]
+    source_columns = [(column["table_id"], column["id"]) for column in sections["source_columns"]]
+    release_ids = [None] + [release["id"] for release in sections["releases"]]
+    target_slots = [
+        (release_id, column["table_id"], column["id"])
+        for release_id in release_ids
+        for column in sections["target_columns"]
+    ]
+    rng.shuffle(target_slots)
+    state = LoadState(source_columns, target_slots)
+
+    while len(state.mapping_ids) < args.seed:
+        rows = state.take_mappings(min(args.import_batch, args.seed - len(state.mapping_ids)), rng)
+        if not rows:
+            break
+        response = await client.post("/api/mappings/bulk", json={"mappings": rows})
+        response.raise_for_status()
+        state.add_created(response.json())
+    return state
+
+async def browse_client(client, recorder: Recorder, state: LoadState, deadline: float, rng: random.Random, args) -> None:
+    while time.perf_counter() < deadline:
+        action = rng.random()
+        if action < 0.5:
+            sort = rng.choice(SORT_FIELDS)
+            params = {
+                "sort": f"-{sort}" if rng.random() < 0.5 else sort,
+                "offset": rng.randrange(max(1, len(state.mapping_ids) - args.page_size)),
+                "limit": args.page_size,
+            }
+            await recorder.call("browse: page", client.get("/api/mappings/", params=params))
+        elif action < 0.75:
+            await recorder.call("browse: row", client.get(f"/api/mappings/{rng.choice(state.mapping_ids)}"))
+        elif action < 0.95:
+            mapping_ids = rng.sample(state.mapping_ids, min(args.page_size, len(state.mapping_ids)))
+            await recorder.call("browse: batch-get", client.post("/api/mappings/batch-get", json={"ids": mapping_ids}))
+        elif action < 0.99:
+            await recorder.call("browse: stats", client.get("/api/mappings/stats"))
+        else:
+            await recorder.call("browse: full list", client.get("/api/mappings/"))
+        await asyncio.sleep(args.think)
+
+async def import_client(client, recorder: Recorder, state: LoadState, deadline: float, rng: random.Random, args) -> None:
+    while time.perf_counter() < deadline:
+        rows = state.take_mappings(args.import_batch, rng)
+        if not rows:
+            # Every target slot is mapped
+            return
+        response = await recorder.call("import: bulk", client.post("/api/mappings/bulk", json={"mappings": rows}))
+        if response is not None:
+            recorder.rows_imported += len(state.add_created(response.json()))
+        await asyncio.sleep(args.think)
+
+async def edit_client(
+    client, recorder: Recorder, state: LoadState, owned: List[int], deadline: float, rng: random.Random, args
+) -> None:
+    async def edit(mapping_id: int, fields: Dict) -> None:
+        # Each edit client owns its mappings, so it overwrites without tracking their versions
+        response = await recorder.call(
+            "edit: update", client.put(f"/api/mappings/{mapping_id}", json=fields, headers={"If-Match": "*"})
+        )
+        if response is not None:
+            state.expected[mapping_id] = fields
+
+    burst = 0
+    while owned and time.perf_counter() < deadline:
+        burst += 1
+        await asyncio.gather(*(
+            edit(mapping_id, {"status": rng.choice(EDIT_STATUSES), "description": f"Edit burst {burst}"})
+            for mapping_id in rng.sample(owned, min(args.edit_burst, len(owned)))
+        ))
+        await asyncio.sleep(args.think)
+
+async def run_load(client: httpx.AsyncClient, state: LoadState, args) -> Tuple[Recorder, float]:
+    """Run the client mix until the deadline and return the recordings and the elapsed time."""
+    recorder = Recorder()
+    rng = random.Random(args.random_seed)
+    # Each edit client owns a share of the seeded mappings, so edits never race each other
+    owned = [state.mapping_ids[i::args.edit] for i in range(args.edit)]
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(
+        *(browse_client(client, recorder, state, deadline, random.Random(rng.random()), args) for _ in range(args.browse)),
+        *(import_client(client, recorder, state, deadline, random.Random(rng.random()), args) for _ in range(args.imports)),
+        *(edit_client(client, recorder, state, owned[i], deadline, random.Random(rng.random()), args) for i in range(args.edit)),
+    )
+    return recorder, time.perf_counter() - start
+
+async def check_invariants(client: httpx.AsyncClient, state: LoadState) -> List[Tuple[str, bool, str]]:
+    """
+    Check the server's data against what the clients wrote and against itself.
+
+    Returns:
+        List[Tuple[str, bool, str]]: (invariant, holds, detail) for each invariant.
+    """
+    checks = []
+    mappings = (await client.get("/api/mappings/")).json()
+    mapping_ids = [mapping["id"] for mapping in mappings]
+    by_id = {mapping["id"]: mapping for mapping in mappings}
+    checks.append(("unique ids", len(by_id) == len(mapping_ids), f"{len(mapping_ids)} mappings"))
+
+    missing = state.created - by_id.keys()
+    unexpected = by_id.keys() - state.created
+    checks.append((
+        "imported mappings present", not missing and not unexpected,
+        f"{len(missing)} missing, {len(unexpected)} unexpected",
+    ))
+    stale = [
+        mapping_id for mapping_id, fields in state.expected.items()
+        if any(by_id.get(mapping_id, {}).get(name) != value for name, value in fields.items())
+    ]
+    checks.append(("last edits applied", not stale, f"{len(state.expected)} edited, {len(stale)} stale"))
+
+    sources_by_target: Dict[Tuple, Set[int]] = {}
+    pairs = set()
+    for mapping in mappings:
+        sources_by_target.setdefault((mapping["release_id"], mapping["target_column_id"]), set()).add(
+            mapping["source_column_id"]
+        )
+        pairs.add((mapping["release_id"], mapping["source_column_id"], mapping["target_column_id"]))
+    conflicts = sum(1 for sources in sources_by_target.values() if len(sources) > 1)
+    checks.append((
+        "uniqueness rules", conflicts == 0 and len(pairs) == len(mappings),
+        f"{len(mappings) - len(pairs)} duplicates, {conflicts} conflicting targets",
+    ))
+
+    for field in SORT_FIELDS:
+        page = (await client.get("/api/mappings/", params={"sort": field})).json()
+        entries = [(mapping[field] is None, mapping[field], mapping["id"]) for mapping in page]
+        ordered = all(a < b for a, b in zip(entries, entries[1:]))
+        same = sorted(mapping["id"] for mapping in page) == sorted(mapping_ids)
+        checks.append((f"sort index {field}", ordered and same, f"{len(page)} rows, ordered: {ordered}"))
+
+    status_counts: Dict[str, int] = {}
+    for mapping in mappings:
+        status_counts[mapping["status"]] = status_counts.get(mapping["status"], 0) + 1
+    stats = (await client.get("/api/mappings/stats")).json()
+    checks.append((
+        "status counters", stats["mapping_count"] == len(mappings) and stats["status_counts"] == status_counts,
+        f"{stats['mapping_count']} counted",
+    ))
+    compatibility = (await client.get("/api/mappings/compatibility", params={"limit": 0})).json()
+    checks.append(("column hash indexes", compatibility["total"] == len(mappings), f"{compatibility['total']} indexed"))
+    release_counts = {release["release_id"]: release["mapping_count"] for release in stats["releases"]}
+    expected_counts = {release_id: 0 for release_id in release_counts}
+    for mapping in mappings:
+        if mapping["release_id"] in expected_counts:
+            expected_counts[mapping["release_id"]] += 1
+    checks.append(("release counters", release_counts == expected_counts, f"{len(release_counts)} releases"))
+
+    changes = (await client.get("/api/mappings/changes", params={"since": 0})).json()
+    logged = sorted(mapping["id"] for mapping in changes["upserts"])
+    checks.append((
+        "change log", logged == sorted(mapping_ids) and changes["version"] == stats["mappings_version"],
+        f"{len(logged)} upserts, {len(changes['deleted_ids'])} deletes, version {changes['version']}",
+    ))
+    return checks
+
+def _percentile(latencies: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted latencies."""
+    return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+def report(recorder: Recorder, elapsed: float) -> int:
+    """Print throughput, latency percentiles and error rates per operation, and return the number of errors."""
+    print(f"{'operation':<20} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    total_requests = total_errors = 0
+    for operation in sorted(recorder.latencies):
+        latencies = sorted(recorder.latencies[operation])
+        errors = recorder.errors.get(operation, 0)
+        total_requests += len(latencies)
+        total_errors += errors
+        print(
+            f"{operation:<20} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+            f"{_percentile(latencies, 50) * 1000:>8.1f} {_percentile(latencies, 95) * 1000:>8.1f} "
+            f"{_percentile(latencies, 99) * 1000:>8.1f} {latencies[-1] * 1000:>8.1f} {errors / len(latencies):>7.1%}"
+        )
+    print(
+        f"{'total':<20} {total_requests:>9} {total_requests / elapsed:>8.1f} "
+        f"{'':>35} {total_errors / max(1, total_requests):>7.1%}"
+    )
+    print(f"rows imported: {recorder.rows_imported} ({recorder.rows_imported / elapsed:.0f}/s)")
+    return total_errors
+
+async def main_async(base_url: str, args) -> bool:
+    limits = httpx.Limits(max_connections=args.browse + args.imports + args.edit * args.edit_burst)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"X-Workspace": WORKSPACE}, limits=limits, timeout=args.timeout
+    ) as client:
+        state = await prepare(client, args, random.Random(args.random_seed))
+        print(
+            f"{len(state.mapping_ids)} seeded mappings, {len(state.target_slots)} free target slots, "
+            f"{args.browse} browse / {args.imports} import / {args.edit} edit clients, {args.seconds:g}s"
+        )
+        recorder, elapsed = await run_load(client, state, args)
+        errors = report(recorder, elapsed)
+
+        print("invariants:")
+        checks = await check_invariants(client, state)
+        for name, holds, detail in checks:
+            print(f"  {'ok' if holds else 'FAILED':<7} {name}: {detail}")
+    return errors == 0 and all(holds for _, holds, _ in checks)
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--browse", type=int, default=8, help="Grid browsing clients")
+    parser.add_argument("--import", dest="imports", type=int, default=1, help="Bulk import clients")
+    parser.add_argument("--edit", type=int, default=2, help="Edit burst clients")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=5000, help="Mappings created before the run")
+    parser.add_argument("--catalog-tables", type=int, default=200, help="Tables on each side of the catalog")
+    parser.add_argument("--catalog-columns", type=int, default=25, help="Columns per table")
+    parser.add_argument("--import-batch", type=int, default=200, help="Mappings per bulk import")
+    parser.add_argument("--edit-burst", type=int, default=10, help="Concurrent edits per burst")
+    parser.add_argument("--page-size", type=int, default=50, help="Rows per grid page and batch lookup")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds each client waits between operations")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a request counts as failed")
+    parser.add_argument("--random-seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        _write_catalog_database(os.path.join(directory, CATALOG_DATABASE), args.catalog_tables, args.catalog_columns)
+        with local_server(directory) as base_url:
+            passed = asyncio.run(main_async(base_url, args))
+    sys.exit(0 if passed else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Tail latency benchmark for mixed slow and fast requests.
+
+Simulates a blocking backend by adding a sleep to the delta sync query, then
+drives the API in-process with concurrent slow clients (GET /api/mappings/changes)
+and fast clients (GET /api/mappings/{id}). It reports the latency of the fast
+requests twice: with blocking service calls offloaded to the executor (the
+normal mode), and with them run inline on the event loop, as all service
+calls were before the async service layer.
+
+Usage:
+    python -m backend.benchmarks.mixed_latency [--slow-clients 4] [--fast-clients 4] [--seconds 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+from backend.api.app import app
+from backend.cache import dummy_data
+from backend.service import async_service
+
+async def _inline(func, *args, **kwargs):
+    """Run a blocking call directly on the event loop."""
+    return func(*args, **kwargs)
+
+def _add_backend_latency(seconds: float) -> None:
+    """Make the delta sync query block like a slow database query."""
+    get_changes_since = dummy_data.get_changes_since
+
+    def slow_get_changes_since(version):
+        time.sleep(seconds)
+        return get_changes_since(version)
+
+    dummy_data.get_changes_since = slow_get_changes_since
+
+async def _client(client: httpx.AsyncClient, path: str, deadline: float, latencies: List[float]) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+async def run(slow_clients: int, fast_clients: int, seconds: float) -> Dict[str, List[float]]:
+    """Run one load phase and return the latencies of each request kind."""
+    latencies: Dict[str, List[float]] = {"slow": [], "fast": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(_client(client, "/api/mappings/changes?since=0", deadline, latencies["slow"]) for _ in range(slow_clients)),
+            *(_client(client, "/api/mappings/1", deadline, latencies["fast"]) for _ in range(fast_clients)),
+        )
+    return latencies
+
+def _report(mode: str, latencies: Dict[str, List[float]], seconds: float) -> None:
+    fast = sorted(latencies["fast"])
+    quantiles = statistics.quantiles(fast, n=100)
+    print(
+        f"{mode:>10} {len(fast) / seconds:>9.0f} {len(latencies['slow']) / seconds:>9.1f} "
+        f"{quantiles[49] * 1000:>8.2f} {quantiles[94] * 1000:>8.2f} {quantiles[98] * 1000:>8.2f} {fast[-1] * 1000:>8.2f}"
+    )
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--slow-clients", type=int, default=4)
+    parser.add_argument("--fast-clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--backend-latency", type=float, default=0.05, help="Seconds each slow query blocks")
+    args = parser.parse_args(argv)
+
+    _add_backend_latency(args.backend_latency)
+    print(
+        f"{args.slow_clients} slow clients ({args.backend_latency * 1000:g} ms blocking query), "
+        f"{args.fast_clients} fast clients, {args.seconds:g}s per mode"
+    )
+    print(f"{'mode':>10} {'fast/s':>9} {'slow/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    offloaded = asyncio.run(run(args.slow_clients, args.fast_clients, args.seconds))
+    _report("offloaded", offloaded, args.seconds)
+
+    async_service.run_blocking = _inline
+    inline = asyncio.run(run(args.slow_clients, args.fast_clients, args.seconds))
+    _report("inline", inline, args.seconds)
+
+if __name__ == "__main__":
+    main()
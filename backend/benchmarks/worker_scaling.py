@@ -0,0 +1,117 @@
+"""
+Read throughput benchmark for multi-worker deployments.
+
+Starts the API with 1, 2, 4, ... uvicorn workers sharing one SQLite store,
+drives it with keep-alive HTTP clients from several processes and reports
+requests per second for each worker count.
+
+Usage:
+    python -m backend.benchmarks.worker_scaling [--workers 1 2 4] [--clients 8] [--seconds 10]
+
+Run it on a machine with spare cores for the clients (roughly twice as many
+cores as the largest worker count); otherwise the clients and the workers
+compete for the same CPUs and the numbers flatten out.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_healthy(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become healthy")
+
+def _client(port: int, path: str, seconds: float, start_at: float, results) -> None:
+    """Send requests over one keep-alive connection and report how many completed."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    while time.time() < start_at:
+        time.sleep(0.001)
+    count = 0
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"GET {path} returned {response.status}")
+        count += 1
+    results.put(count)
+
+def measure(workers: int, clients: int, seconds: float, path: str) -> float:
+    """
+    Measure read throughput for one worker count.
+
+    Returns:
+        float: Completed requests per second across all clients.
+    """
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "STTM_SHARED_DB": os.path.join(directory, "shared.db"),
+            "STTM_AUDIT_DIR": os.path.join(directory, "audit"),
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.api.app:app",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            cwd=PROJECT_ROOT, env=env,
+        )
+        try:
+            _wait_until_healthy(port)
+            results = multiprocessing.Queue()
+            start_at = time.time() + 1.0
+            processes = [
+                multiprocessing.Process(target=_client, args=(port, path, seconds, start_at, results))
+                for _ in range(clients)
+            ]
+            for process in processes:
+                process.start()
+            total = sum(results.get() for _ in processes)
+            for process in processes:
+                process.join()
+        finally:
+            server.terminate()
+            server.wait()
+    return total / seconds
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="Client processes, each with one connection")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--path", default="/api/mappings/1", help="Endpoint to read")
+    args = parser.parse_args(argv)
+
+    print(f"CPUs: {os.cpu_count()}, clients: {args.clients}, {args.seconds:g}s per run, GET {args.path}")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    for workers in args.workers:
+        throughput = measure(workers, args.clients, args.seconds, args.path)
+        baseline = baseline or throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:>8} {throughput:>10.0f} {speedup:>7.2f}x {speedup / workers:>9.0%}")
+
+if __name__ == "__main__":
+    main()
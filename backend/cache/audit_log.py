@@ -0,0 +1,731 @@
+"""
+Append-only audit log of mapping changes for the STTM application.
+This module stores who changed which mapping, when and how, in compact binary
+segments on local disk.
+
+New entries are buffered in memory and sealed into an immutable segment file
+when the buffer fills up or ages (see AuditLog.flush). A full buffer is sealed
+on a background thread, so that appending never waits for the disk. Segments are columnar:
+each column (timestamps, mapping IDs, users, ...) is packed into a typed array
+and compressed on its own, users and workspaces are dictionary-encoded, and an
+update keeps only the fields it changed. The header of a segment holds its
+time range and the users, releases and workspaces it contains, so a query
+skips every segment that cannot match without decompressing it. Within a
+segment, posting lists (the positions of the entries of each mapping, user
+and release) lead a query straight to the entries it asks for.
+
+Compaction merges runs of small segments into larger ones, so that the number
+of files, and the per-segment cost of queries, stays bounded after years of
+edits. A merged segment lists the segments it replaces, so readers that list
+the directory during a compaction never count an entry twice. Several
+processes may share a directory: each writes its own segment files, and a
+lock file lets only one of them compact at a time.
+"""
+import heapq
+import itertools
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.cache.memory import structure_usage
+
+# File signature and format version of a segment
+SEGMENT_MAGIC = b"STTMAUD1"
+
+# Entries buffered in memory before they are sealed into a segment
+FLUSH_ENTRIES = 10000
+
+# Seconds an entry may stay buffered before flush(force=False) seals it
+FLUSH_SECONDS = 5.0
+
+# Entries per segment that compaction merges small segments up to
+COMPACTED_SEGMENT_ENTRIES = 200000
+
+# Consecutive small segments needed before compaction merges them, so that
+# every entry is rewritten only a few times on its way into a full segment
+COMPACTION_MIN_SEGMENTS = 4
+
+# Seconds after which the compaction lock of a crashed process is broken
+COMPACTION_LOCK_TIMEOUT = 600.0
+
+# Decoded segments kept in memory for repeated queries
+SEGMENT_CACHE_SIZE = 8
+
+ACTIONS = ["create", "update", "delete"]
+
+# Bookkeeping fields left out of the recorded changes
+_UNRECORDED_FIELDS = {"id", "version", "created_at", "updated_at"}
+
+# Columns of a segment: name -> array typecode
+_COLUMNS = {
+    "timestamp": "q",      # microseconds since the epoch, delta-encoded
+    "mapping_id": "q",
+    "version": "q",        # mappings version of the write
+    "action": "b",         # index into ACTIONS
+    "user": "i",           # index into the segment's strings, -1 for none
+    "workspace": "i",      # index into the segment's strings
+    "release_id": "q",     # -1 for none
+    "changes_end": "q",    # end offset of each entry's changes in the changes blob
+}
+
+# Columns with posting lists: for each distinct value, in value order, the
+# positions of its entries ("<column>_keys", "<column>_offsets" of the end of
+# each value's positions, and "<column>_positions", delta-encoded per value)
+_INDEXED_COLUMNS = ["mapping_id", "user", "release_id"]
+
+_POSTING_TYPECODES = {"keys": "q", "offsets": "q", "positions": "i"}
+
+# An entry as buffered: (timestamp, mapping ID, version, action, user, workspace, release ID, changes JSON)
+Entry = Tuple[int, int, int, int, Optional[str], str, Optional[int], bytes]
+
+def _diff(old: Optional[Dict], new: Optional[Dict]) -> Dict[str, list]:
+    """Get the changed fields of a mapping as {field: [old value, new value]}."""
+    old = old or {}
+    new = new or {}
+    return {
+        field: [old.get(field), new.get(field)]
+        for field in dict.fromkeys([*old, *new])
+        if field not in _UNRECORDED_FIELDS and old.get(field) != new.get(field)
+    }
+
+def make_entry(
+    timestamp: float,
+    workspace: str,
+    version: int,
+    old: Optional[Dict],
+    new: Optional[Dict],
+    user: Optional[str] = None,
+) -> Entry:
+    """
+    Build the audit entry of one mapping change.
+
+    Args:
+        timestamp (float): Seconds since the epoch.
+        workspace (str): The workspace of the mapping.
+        version (int): The mappings version of the write.
+        old (Optional[Dict]): The mapping before the change, None for creates.
+        new (Optional[Dict]): The mapping after the change, None for deletes.
+        user (Optional[str]): Who made the change, if known.
+
+    Returns:
+        Entry: The entry. Its release is the mapping's release after the change
+        (before it, for deletes).
+    """
+    row = new if new is not None else old
+    action = 0 if old is None else 2 if new is None else 1
+    changes = json.dumps(_diff(old, new), separators=(",", ":"), default=str).encode()
+    return (int(timestamp * 1_000_000), row["id"], version, action, user, workspace, row.get("release_id"), changes)
+
+def _pack(typecode: str, values: Iterable[int]) -> bytes:
+    return zlib.compress(array(typecode, values).tobytes())
+
+def _unpack(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(zlib.decompress(data))
+    return values
+
+def _typecode(column: str) -> str:
+    if column in _COLUMNS:
+        return _COLUMNS[column]
+    return _POSTING_TYPECODES[column.rsplit("_", 1)[1]]
+
+def _postings(values: List[int]) -> Tuple[List[int], List[int], List[int]]:
+    """Build the posting lists of a column as (keys, offsets, delta-encoded positions)."""
+    groups: Dict[int, List[int]] = {}
+    for i, value in enumerate(values):
+        groups.setdefault(value, []).append(i)
+    keys = sorted(groups)
+    offsets = []
+    positions = []
+    for key in keys:
+        group = groups[key]
+        positions.append(group[0])
+        positions.extend(b - a for a, b in zip(group, group[1:]))
+        offsets.append(len(positions))
+    return keys, offsets, positions
+
+def encode_segment(entries: List[Entry], sources: Optional[List[str]] = None) -> bytes:
+    """
+    Encode entries, sorted by timestamp, as a segment.
+
+    Args:
+        entries (List[Entry]): The entries, oldest first.
+        sources (Optional[List[str]]): Names of the segments this one replaces.
+
+    Returns:
+        bytes: The segment: signature, header length, JSON header, column blobs.
+    """
+    strings: Dict[str, int] = {}
+    for entry in entries:
+        for value in (entry[4], entry[5]):
+            if value is not None:
+                strings.setdefault(value, len(strings))
+
+    timestamps = [entry[0] for entry in entries]
+    changes_end = []
+    offset = 0
+    for entry in entries:
+        offset += len(entry[7])
+        changes_end.append(offset)
+    columns = {
+        "timestamp": [t - p for t, p in zip(timestamps, [0] + timestamps[:-1])],
+        "mapping_id": [entry[1] for entry in entries],
+        "version": [entry[2] for entry in entries],
+        "action": [entry[3] for entry in entries],
+        "user": [strings[entry[4]] if entry[4] is not None else -1 for entry in entries],
+        "workspace": [strings[entry[5]] for entry in entries],
+        "release_id": [entry[6] if entry[6] is not None else -1 for entry in entries],
+        "changes_end": changes_end,
+    }
+    blobs = {name: _pack(_COLUMNS[name], values) for name, values in columns.items()}
+    blobs["changes"] = zlib.compress(b"".join(entry[7] for entry in entries))
+    for name in _INDEXED_COLUMNS:
+        for part, values in zip(("keys", "offsets", "positions"), _postings(columns[name])):
+            blobs[f"{name}_{part}"] = _pack(_POSTING_TYPECODES[part], values)
+
+    layout = {}
+    offset = 0
+    for name, blob in blobs.items():
+        layout[name] = [offset, len(blob)]
+        offset += len(blob)
+    header = json.dumps({
+        "count": len(entries),
+        "min_ts": timestamps[0] if timestamps else 0,
+        "max_ts": timestamps[-1] if timestamps else 0,
+        "strings": list(strings),
+        "users": sorted({entry[4] for entry in entries if entry[4] is not None}),
+        "workspaces": sorted({entry[5] for entry in entries}),
+        "releases": sorted({entry[6] for entry in entries if entry[6] is not None}),
+        "sources": sources or [],
+        "layout": layout,
+    }).encode()
+    return SEGMENT_MAGIC + struct.pack("<I", len(header)) + header + b"".join(blobs.values())
+
+def decode_header(data: bytes) -> Tuple[Dict, int]:
+    """
+    Decode the header at the start of a segment.
+
+    Returns:
+        Tuple[Dict, int]: The header and the offset of the column blobs.
+
+    Raises:
+        ValueError: If the data is not a segment.
+    """
+    if data[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+        raise ValueError("Not an audit log segment")
+    start = len(SEGMENT_MAGIC) + 4
+    (length,) = struct.unpack("<I", data[len(SEGMENT_MAGIC):start])
+    return json.loads(data[start:start + length]), start + length
+
+class Segment:
+    """A sealed segment, decoded lazily one column at a time."""
+
+    def __init__(self, name: str, header: Dict, body_offset: int, read):
+        """
+        Args:
+            name (str): The segment name.
+            header (Dict): The decoded header.
+            body_offset (int): Offset of the column blobs in the segment.
+            read (Callable[[str, int, int], bytes]): Reads (name, offset, length).
+        """
+        self.name = name
+        self.header = header
+        self._body_offset = body_offset
+        self._read = read
+        self._columns: Dict[str, array] = {}
+
+    def _blob(self, column: str) -> bytes:
+        offset, length = self.header["layout"][column]
+        return self._read(self.name, self._body_offset + offset, length)
+
+    def column(self, name: str) -> array:
+        """Get a decoded column."""
+        values = self._columns.get(name)
+        if values is None:
+            if name == "changes":
+                values = zlib.decompress(self._blob(name))
+            else:
+                values = _unpack(_typecode(name), self._blob(name))
+                if name == "timestamp":
+                    values = array("q", itertools.accumulate(values))
+            self._columns[name] = values
+        return values
+
+    def _posting_range(self, column: str, key: int) -> Tuple[int, int]:
+        """Get the range of a value's positions in a column's posting list, empty if it has none."""
+        keys = self.column(f"{column}_keys")
+        k = bisect_left(keys, key)
+        if k == len(keys) or keys[k] != key:
+            return 0, 0
+        offsets = self.column(f"{column}_offsets")
+        return (offsets[k - 1] if k else 0), offsets[k]
+
+    def postings(self, column: str, key: int) -> List[int]:
+        """Get the positions of the entries with a value in an indexed column, in ascending order."""
+        start, end = self._posting_range(column, key)
+        return list(itertools.accumulate(self.column(f"{column}_positions")[start:end]))
+
+    def entries(self) -> List[Entry]:
+        """Decode all entries, oldest first."""
+        strings = self.header["strings"]
+        columns = [self.column(name) for name in _COLUMNS]
+        changes = self.column("changes")
+        entries = []
+        start = 0
+        for ts, mapping_id, version, action, user, workspace, release_id, end in zip(*columns):
+            entries.append((
+                ts, mapping_id, version, action, strings[user] if user >= 0 else None,
+                strings[workspace], release_id if release_id >= 0 else None, changes[start:end],
+            ))
+            start = end
+        return entries
+
+    def match(
+        self,
+        start: Optional[int],
+        end: Optional[int],
+        mapping_id: Optional[int],
+        user: Optional[str],
+        release_id: Optional[int],
+        workspace: Optional[str],
+    ) -> Iterable[int]:
+        """Get the positions of the matching entries, newest first."""
+        header = self.header
+        if user is not None and user not in header["users"]:
+            return []
+        if release_id is not None and release_id not in header["releases"]:
+            return []
+        if workspace is not None and workspace not in header["workspaces"]:
+            return []
+
+        timestamps = self.column("timestamp")
+        lo = bisect_left(timestamps, start) if start is not None else 0
+        hi = bisect_right(timestamps, end) if end is not None else len(timestamps)
+        strings = header["strings"]
+        conditions = []
+        if mapping_id is not None:
+            conditions.append(("mapping_id", mapping_id))
+        if user is not None:
+            conditions.append(("user", strings.index(user)))
+        if release_id is not None:
+            conditions.append(("release_id", release_id))
+        if workspace is not None:
+            conditions.append(("workspace", strings.index(workspace)))
+
+        indexed = [condition for condition in conditions if condition[0] in _INDEXED_COLUMNS]
+        if not indexed:
+            positions = range(lo, hi)
+        else:
+            # Walk the shortest posting list and check the other conditions on the columns
+            def posting_length(condition):
+                start, end = self._posting_range(*condition)
+                return end - start
+            shortest = min(indexed, key=posting_length)
+            conditions.remove(shortest)
+            positions = self.postings(*shortest)
+            positions = positions[bisect_left(positions, lo):bisect_left(positions, hi)]
+        checks = [(self.column(column), wanted) for column, wanted in conditions]
+        return (
+            i for i in reversed(positions)
+            if all(values[i] == wanted for values, wanted in checks)
+        )
+
+    def entry(self, i: int) -> Dict:
+        """Decode the entry at a position."""
+        strings = self.header["strings"]
+        ends = self.column("changes_end")
+        user = self.column("user")[i]
+        release_id = self.column("release_id")[i]
+        return {
+            "timestamp": self.column("timestamp")[i],
+            "workspace": strings[self.column("workspace")[i]],
+            "mapping_id": self.column("mapping_id")[i],
+            "version": self.column("version")[i],
+            "action": ACTIONS[self.column("action")[i]],
+            "user": strings[user] if user >= 0 else None,
+            "release_id": release_id if release_id >= 0 else None,
+            "changes": json.loads(self.column("changes")[ends[i - 1] if i else 0:ends[i]]),
+        }
+
+def _buffered_entry(entry: Entry) -> Dict:
+    ts, mapping_id, version, action, user, workspace, release_id, changes = entry
+    return {
+        "timestamp": ts,
+        "workspace": workspace,
+        "mapping_id": mapping_id,
+        "version": version,
+        "action": ACTIONS[action],
+        "user": user,
+        "release_id": release_id,
+        "changes": json.loads(changes),
+    }
+
+class AuditLog:
+    """An append-only audit log in a directory of segment files, or in memory."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory (Optional[str]): The directory of the segment files, created
+                on the first flush, or None to keep the segments in memory.
+        """
+        self.directory = directory
+        # Writer ID in the names of this log's segments, unique among processes sharing the directory
+        self.writer_id = uuid.uuid4().hex[:12]
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._buffer: List[Entry] = []
+        self._buffered_since: Optional[float] = None
+        # (segment name, entries) of full buffers waiting to be sealed, oldest first
+        self._pending: List[Tuple[str, List[Entry]]] = []
+        # Held while sealing, so that pending buffers are written one at a time and in order
+        self._seal_lock = threading.Lock()
+        self._sequence = 0
+        # Segments held in memory when there is no directory
+        self._blobs: Dict[str, bytes] = {}
+        # Headers of the segments seen so far; segments never change once written
+        self._segments: Dict[str, Segment] = {}
+        self._decoded: "OrderedDict[str, Segment]" = OrderedDict()
+
+    # Storage
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _list_names(self) -> List[str]:
+        if self.directory is None:
+            return list(self._blobs)
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith(".seg")]
+        except FileNotFoundError:
+            return []
+
+    def _read(self, name: str, offset: int, length: int) -> bytes:
+        if self.directory is None:
+            return self._blobs[name][offset:offset + length]
+        with open(self._path(name), "rb") as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def _write(self, name: str, data: bytes) -> None:
+        """Write a segment so that readers never see it half written."""
+        if self.directory is None:
+            self._blobs[name] = data
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = self._path(name + ".tmp")
+        with open(temporary, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._path(name))
+
+    def _delete(self, name: str) -> None:
+        if self.directory is None:
+            self._blobs.pop(name, None)
+            return
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _new_name(self, min_ts: int) -> str:
+        self._sequence += 1
+        return f"{min_ts:016x}-{self.writer_id}-{self._sequence:06d}.seg"
+
+    def _load_segment(self, name: str) -> Optional[Segment]:
+        """Read the header of a segment, or None if it was compacted away meanwhile."""
+        try:
+            if self.directory is None:
+                data = self._blobs[name]
+            else:
+                with open(self._path(name), "rb") as file:
+                    data = file.read(len(SEGMENT_MAGIC) + 4)
+                    (length,) = struct.unpack("<I", data[len(SEGMENT_MAGIC):])
+                    data += file.read(length)
+        except (FileNotFoundError, KeyError):
+            return None
+        header, body_offset = decode_header(data)
+        return Segment(name, header, body_offset, self._read)
+
+    def segments(self) -> List[Segment]:
+        """Get the current segments, oldest first, leaving out those replaced by a merged segment."""
+        names = self._list_names()
+        with self._lock:
+            for name in names:
+                if name not in self._segments:
+                    segment = self._load_segment(name)
+                    if segment is not None:
+                        self._segments[name] = segment
+            listed = set(names)
+            for name in [name for name in self._segments if name not in listed]:
+                del self._segments[name]
+                self._decoded.pop(name, None)
+            segments = list(self._segments.values())
+        replaced = {source for segment in segments for source in segment.header["sources"]}
+        current = [segment for segment in segments if segment.name not in replaced]
+        return sorted(current, key=lambda segment: (segment.header["min_ts"], segment.name))
+
+    def _decoded_segment(self, segment: Segment) -> Segment:
+        """Keep a segment's decoded columns for repeated queries, evicting the least recently used."""
+        with self._lock:
+            self._decoded[segment.name] = segment
+            self._decoded.move_to_end(segment.name)
+            while len(self._decoded) > SEGMENT_CACHE_SIZE:
+                _, evicted = self._decoded.popitem(last=False)
+                evicted._columns.clear()
+        return segment
+
+    # Writes
+    def append(self, entries: List[Entry]) -> None:
+        """Buffer entries, sealing them into a segment on a background thread once the buffer is full."""
+        if not entries:
+            return
+        with self._lock:
+            if not self._buffer:
+                self._buffered_since = time.monotonic()
+            self._buffer.extend(entries)
+            if len(self._buffer) < FLUSH_ENTRIES:
+                return
+            self._detach_buffer()
+        threading.Thread(target=self._seal_pending, name="audit-seal", daemon=True).start()
+
+    def _detach_buffer(self) -> None:
+        """Queue the buffered entries for sealing; the caller holds self._lock."""
+        self._pending.append((self._new_name(min(entry[0] for entry in self._buffer)), self._buffer))
+        self._buffer = []
+        self._buffered_since = None
+
+    def _seal_pending(self) -> Optional[str]:
+        """Seal the pending buffers into segments, without holding self._lock while writing."""
+        name = None
+        with self._seal_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return name
+                    name, entries = self._pending[0]
+                self._write(name, encode_segment(sorted(entries, key=lambda entry: entry[0])))
+                with self._lock:
+                    self._pending.pop(0)
+
+    def flush(self, force: bool = True) -> Optional[str]:
+        """
+        Seal the buffered entries into a segment.
+
+        Args:
+            force (bool): Seal even a buffer younger than FLUSH_SECONDS.
+
+        Returns:
+            Optional[str]: The name of the newest segment written, if any.
+        """
+        with self._lock:
+            if self._buffer and (force or time.monotonic() - self._buffered_since >= FLUSH_SECONDS):
+                self._detach_buffer()
+        return self._seal_pending()
+
+    def _acquire_directory_lock(self) -> bool:
+        """Take the compaction lock shared with other processes, breaking a stale one."""
+        if self.directory is None:
+            return True
+        path = self._path("compact.lock")
+        os.makedirs(self.directory, exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) < COMPACTION_LOCK_TIMEOUT:
+                        return False
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def _release_directory_lock(self) -> None:
+        if self.directory is not None:
+            try:
+                os.remove(self._path("compact.lock"))
+            except FileNotFoundError:
+                pass
+
+    def compact(self) -> int:
+        """
+        Merge runs of consecutive small segments into larger ones.
+
+        Segments are grouped in time order up to COMPACTED_SEGMENT_ENTRIES entries,
+        and a group is merged once it has COMPACTION_MIN_SEGMENTS segments. Does
+        nothing if another thread or process is compacting.
+
+        Returns:
+            int: The number of segments merged away.
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return 0
+        try:
+            if not self._acquire_directory_lock():
+                return 0
+            try:
+                groups: List[List[Segment]] = []
+                group: List[Segment] = []
+                total = 0
+                for segment in self.segments():
+                    count = segment.header["count"]
+                    if count >= COMPACTED_SEGMENT_ENTRIES or total + count > COMPACTED_SEGMENT_ENTRIES:
+                        groups.append(group)
+                        group, total = [], 0
+                    if count < COMPACTED_SEGMENT_ENTRIES:
+                        group.append(segment)
+                        total += count
+                groups.append(group)
+
+                merged = 0
+                for group in groups:
+                    if len(group) < COMPACTION_MIN_SEGMENTS:
+                        continue
+                    entries = heapq.merge(*(segment.entries() for segment in group), key=lambda entry: entry[0])
+                    entries = list(entries)
+                    sources = [segment.name for segment in group]
+                    with self._lock:
+                        name = self._new_name(entries[0][0])
+                    self._write(name, encode_segment(entries, sources))
+                    for segment in group:
+                        segment._columns.clear()
+                    for source in sources:
+                        self._delete(source)
+                    merged += len(group) - 1
+                return merged
+            finally:
+                self._release_directory_lock()
+        finally:
+            self._compact_lock.release()
+
+    # Reads
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        mapping_id: Optional[int] = None,
+        user: Optional[str] = None,
+        release_id: Optional[int] = None,
+        workspace: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict]:
+        """
+        Get the newest entries matching all given filters.
+
+        Args:
+            start (Optional[datetime]): Only entries at or after this time.
+            end (Optional[datetime]): Only entries at or before this time.
+            mapping_id (Optional[int]): Only changes to this mapping.
+            user (Optional[str]): Only changes by this user.
+            release_id (Optional[int]): Only changes to mappings of this release.
+            workspace (Optional[str]): Only changes in this workspace.
+            limit (int): The maximum number of entries.
+
+        Returns:
+            List[Dict]: The entries, newest first, with the "timestamp" in
+            microseconds since the epoch.
+        """
+        start_ts = int(start.timestamp() * 1_000_000) if start is not None else None
+        end_ts = int(end.timestamp() * 1_000_000) if end is not None else None
+        try:
+            return self._query(start_ts, end_ts, mapping_id, user, release_id, workspace, limit)
+        except FileNotFoundError:
+            # A segment was compacted away while it was read; the merged one replaces it
+            return self._query(start_ts, end_ts, mapping_id, user, release_id, workspace, limit)
+
+    def _query(
+        self,
+        start_ts: Optional[int],
+        end_ts: Optional[int],
+        mapping_id: Optional[int],
+        user: Optional[str],
+        release_id: Optional[int],
+        workspace: Optional[str],
+        limit: int,
+    ) -> List[Dict]:
+        # (timestamp, tie-breaker, entry) of the newest matches found so far
+        newest: List[Tuple[int, int, Dict]] = []
+        tie_breakers = itertools.count()
+
+        def offer(ts: int, load) -> bool:
+            """Keep an entry if it is among the newest; False once older ones cannot be."""
+            if len(newest) < limit:
+                heapq.heappush(newest, (ts, next(tie_breakers), load()))
+                return True
+            if ts <= newest[0][0]:
+                return False
+            heapq.heapreplace(newest, (ts, next(tie_breakers), load()))
+            return True
+
+        with self._lock:
+            pending = list(self._pending)
+            buffered = list(self._buffer)
+        segments = self.segments()
+        # A pending buffer sealed since it was copied is read from its segment instead
+        sealed = {segment.name for segment in segments}
+        sealed.update(source for segment in segments for source in segment.header["sources"])
+        buffered += [entry for name, entries in pending if name not in sealed for entry in entries]
+        for entry in buffered:
+            ts, entry_mapping_id, _, _, entry_user, entry_workspace, entry_release_id, _ = entry
+            if (
+                (start_ts is None or ts >= start_ts) and (end_ts is None or ts <= end_ts)
+                and (mapping_id is None or entry_mapping_id == mapping_id)
+                and (user is None or entry_user == user)
+                and (release_id is None or entry_release_id == release_id)
+                and (workspace is None or entry_workspace == workspace)
+            ):
+                offer(ts, lambda entry=entry: _buffered_entry(entry))
+
+        segments = [
+            segment for segment in segments
+            if (start_ts is None or segment.header["max_ts"] >= start_ts)
+            and (end_ts is None or segment.header["min_ts"] <= end_ts)
+        ]
+        for segment in sorted(segments, key=lambda segment: segment.header["max_ts"], reverse=True):
+            if limit <= 0 or (len(newest) >= limit and segment.header["max_ts"] <= newest[0][0]):
+                continue
+            segment = self._decoded_segment(segment)
+            timestamps = segment.column("timestamp")
+            for i in segment.match(start_ts, end_ts, mapping_id, user, release_id, workspace):
+                if not offer(timestamps[i], lambda i=i: segment.entry(i)):
+                    break
+        return [entry for _, _, entry in sorted(newest, key=lambda item: item[0], reverse=True)]
+
+    def _size(self, name: str) -> int:
+        if self.directory is None:
+            return len(self._blobs.get(name, b""))
+        try:
+            return os.path.getsize(self._path(name))
+        except FileNotFoundError:
+            return 0
+
+    def stats(self) -> Dict:
+        """Get the number of segments, of sealed and buffered entries, and of segment bytes."""
+        segments = self.segments()
+        with self._lock:
+            buffered = len(self._buffer) + sum(len(entries) for _, entries in self._pending)
+        return {
+            "segments": len(segments),
+            "entries": sum(segment.header["count"] for segment in segments),
+            "buffered_entries": buffered,
+            "bytes": sum(self._size(segment.name) for segment in segments),
+        }
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Estimate the memory held by buffered entries and decoded segments."""
+        with self._lock:
+            return structure_usage(
+                [self._buffer, self._pending, [segment._columns for segment in self._decoded.values()], self._blobs],
+                len(self._buffer) + sum(len(entries) for _, entries in self._pending),
+            )
@@ -0,0 +1,140 @@
+"""
+Chunked copy-on-write dicts for the STTM in-memory cache.
+This module provides the mapping rows by ID, shared between versions instead of copied.
+"""
+import sys
+from collections.abc import Mapping
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, NoReturn, Optional, Tuple
+
+from backend.cache.memory import SAMPLE_SIZE, approximate_size
+
+# Keys per chunk, as a power of two; mapping IDs are dense, so chunks stay full
+CHUNK_BITS = 8
+
+class ChunkedDict(Mapping):
+    """
+    A dict with int keys, split into chunks by key, with cheap snapshots.
+
+    snapshot() hands out a read-only copy that shares every chunk. The next
+    write copies only the chunk table and the one chunk it changes, so a write
+    after a read costs O(n / chunk size + chunk size) instead of a copy of the
+    whole dict, and versions share all the chunks neither of them changed.
+    Iteration follows chunk creation order, then insertion order within a chunk.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, Any]] = ()):
+        self._bits = CHUNK_BITS
+        self._chunks: Dict[int, Dict[int, Any]] = {}
+        # Chunks, and whether the chunk table itself, are not shared with a snapshot
+        self._owned_chunks: set = set()
+        self._owns_table = True
+        self._frozen = False
+        self._len = 0
+        for key, value in items:
+            self[key] = value
+
+    # Reads
+    def __getitem__(self, key: int) -> Any:
+        chunk = self._chunks.get(key >> self._bits)
+        if chunk is None:
+            raise KeyError(key)
+        return chunk[key]
+
+    def get(self, key: int, default: Any = None) -> Any:
+        chunk = self._chunks.get(key >> self._bits)
+        return default if chunk is None else chunk.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, int):
+            return False
+        chunk = self._chunks.get(key >> self._bits)
+        return chunk is not None and key in chunk
+
+    def __iter__(self) -> Iterator[int]:
+        return chain.from_iterable(list(self._chunks.values()))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def values(self) -> Iterator[Any]:
+        """Iterate over the values; faster than the generic Mapping view."""
+        return chain.from_iterable(chunk.values() for chunk in list(self._chunks.values()))
+
+    def items(self) -> Iterator[Tuple[int, Any]]:
+        """Iterate over the (key, value) pairs; faster than the generic Mapping view."""
+        return chain.from_iterable(chunk.items() for chunk in list(self._chunks.values()))
+
+    def snapshot(self) -> "ChunkedDict":
+        """
+        Get a read-only copy in O(1). Later writes leave it untouched.
+
+        Must not be called concurrently with writes.
+        """
+        frozen = ChunkedDict.__new__(ChunkedDict)
+        frozen._bits = self._bits
+        frozen._chunks = self._chunks
+        frozen._owned_chunks = set()
+        frozen._owns_table = False
+        frozen._frozen = True
+        frozen._len = self._len
+        self._owned_chunks = set()
+        self._owns_table = False
+        return frozen
+
+    def approximate_bytes(self) -> int:
+        """Estimate the bytes held by the dict, its keys and values, measuring a sample of the items."""
+        size = sys.getsizeof(self._chunks) + sum(sys.getsizeof(chunk) for chunk in self._chunks.values())
+        if not self._len:
+            return size
+        sample = list(islice(self.items(), 0, None, max(1, self._len // SAMPLE_SIZE)))
+        seen: set = set()
+        sampled = sum(approximate_size(key, seen) + approximate_size(value, seen) for key, value in sample)
+        return size + sampled * self._len // len(sample)
+
+    # Writes
+    def _readonly(self, *args, **kwargs) -> NoReturn:
+        raise TypeError("Snapshots are read-only")
+
+    def _writable_chunk(self, chunk_key: int, create: bool = False) -> Optional[Dict[int, Any]]:
+        """Get a chunk for modification, copying it and the chunk table first if a snapshot holds them."""
+        if self._frozen:
+            self._readonly()
+        if not self._owns_table:
+            self._chunks = dict(self._chunks)
+            self._owns_table = True
+        chunk = self._chunks.get(chunk_key)
+        if chunk is None:
+            if not create:
+                return None
+            chunk = self._chunks[chunk_key] = {}
+        elif chunk_key not in self._owned_chunks:
+            chunk = self._chunks[chunk_key] = dict(chunk)
+        self._owned_chunks.add(chunk_key)
+        return chunk
+
+    def __setitem__(self, key: int, value: Any) -> None:
+        chunk = self._writable_chunk(key >> self._bits, create=True)
+        if key not in chunk:
+            self._len += 1
+        chunk[key] = value
+
+    def pop(self, key: int, *default: Any) -> Any:
+        """Remove a key and return its value, or the default if given and the key is missing."""
+        if self._frozen:
+            self._readonly()
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        chunk_key = key >> self._bits
+        chunk = self._writable_chunk(chunk_key)
+        value = chunk.pop(key)
+        self._len -= 1
+        if not chunk:
+            del self._chunks[chunk_key]
+            self._owned_chunks.discard(chunk_key)
+        return value
+
+    def __delitem__(self, key: int) -> None:
+        self.pop(key)
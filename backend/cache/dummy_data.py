@@ -1,13 +1,39 @@
 """
 Dummy data cache for the STTM application.
 This module provides in-memory storage for testing and development.
+
+Mappings are partitioned into workspaces (see backend.cache.workspace), one per
+team or project, each with its own indexes, ID space and data version. The
+module-level mapping functions and attributes act on the current workspace,
+which is set per request with use_workspace(). The reference data (tables,
+columns and releases) is shared by all workspaces and, with a shared store, by
+all worker processes.
 """
-from datetime import datetime
-from typing import Dict, List, Optional
+import glob
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from backend.cache.hash_index import HashIndex
+from backend.cache.memory import structure_usage
+from backend.cache.shared_store import SharedStore
+from backend.cache.snapshot import FrozenList
+from backend.cache.sort_index import SortIndex
+from backend.cache.workspace import ChangeListener, Workspace
+
+# Catalog version, bumped on every change to the reference data so derived caches know when they are stale
+catalog_version = 0
 
-# In-memory storage for mappings
-mappings_cache: List[Dict] = []
-mapping_id_counter = 1
+# Serializes changes to the reference data. Taken after, never before, a workspace's write lock
+_catalog_lock = threading.RLock()
+
+# Store sharing the reference data with other worker processes, if configured (see configure_shared_store)
+_catalog_store: Optional[SharedStore] = None
+_catalog_transaction_depth = 0
 
 # In-memory storage for source tables and columns
 source_tables_cache: List[Dict] = [
@@ -60,51 +86,552 @@ users_cache: List[Dict] = [
     {"id": 2, "username": "user1", "email": "user1@example.com", "password_hash": "hashed_password"},
 ]
 
-# Helper functions for mappings
+# Reference data by name. Rows are replaced rather than modified (see replace_reference_row)
+reference_caches: Dict[str, List[Dict]] = {
+    "source_tables": source_tables_cache,
+    "source_columns": source_columns_cache,
+    "target_tables": target_tables_cache,
+    "target_columns": target_columns_cache,
+    "releases": releases_cache,
+}
+
+# Reference data by ID, replaced as a whole when reference data changes
+reference_lookups: Dict[str, Dict[int, Dict]] = {}
+_reference_lookups_version = 0
+
+# Catalog version at which each reference section last changed, and the rows it
+# changed to (copies, so that sections modified in place are detected)
+catalog_section_versions: Dict[str, int] = {name: 0 for name in reference_caches}
+_catalog_section_rows: Dict[str, List[Dict]] = {}
+
+# Immutable snapshots of the reference data handed to readers, built at most once per catalog version
+_reference_snapshots: Dict[str, Tuple[int, FrozenList]] = {}
+
+def bump_catalog_version() -> int:
+    """Mark the reference data (tables, columns, releases) as changed and return the new version."""
+    global catalog_version
+    catalog_version += 1
+    return catalog_version
+
+def rebuild_reference_lookups() -> None:
+    """Rebuild the id -> row lookups for tables, columns and releases."""
+    global reference_lookups, _reference_lookups_version
+    reference_lookups = {
+        name: {row["id"]: row for row in rows} for name, rows in reference_caches.items()
+    }
+    _reference_lookups_version += 1
+
+def _get_reference_lookups_version() -> int:
+    """Get the version of reference_lookups, which the name sort keys read."""
+    return _reference_lookups_version
+
+def get_reference_rows(name: str) -> List[Dict]:
+    """
+    Get an immutable snapshot of one kind of reference data.
+
+    Args:
+        name (str): A reference_caches key, e.g. "source_tables".
+    """
+    version, rows = _reference_snapshots.get(name, (None, None))
+    if version != catalog_version:
+        version = catalog_version
+        rows = FrozenList(reference_caches[name])
+        _reference_snapshots[name] = (version, rows)
+    return rows
+
+@contextmanager
+def catalog_transaction():
+    """
+    Run a read-modify-write sequence on the reference data without interleaving other changes to it.
+
+    With a shared store, also holds an exclusive write transaction on it after
+    catching up with other processes, and reloads the reference data from it
+    if the transaction fails. Re-entrant; only the outermost call opens the
+    shared transaction.
+    """
+    global _catalog_transaction_depth
+    with _catalog_lock:
+        store = _catalog_store
+        outermost = _catalog_transaction_depth == 0
+        _catalog_transaction_depth += 1
+        try:
+            if outermost and store is not None:
+                try:
+                    with store.transaction():
+                        _apply_shared_catalog(*store.read_reference_sections(catalog_version))
+                        yield
+                except BaseException:
+                    # Drop the local changes the rolled back transaction did not persist
+                    _apply_shared_catalog(*store.read_reference_sections())
+                    raise
+            else:
+                yield
+        finally:
+            _catalog_transaction_depth -= 1
+
+def _apply_shared_catalog(version: int, sections: Dict[str, Tuple[int, List[Dict]]]) -> bool:
+    """
+    Replace reference sections with the rows read from the shared store. The caller holds _catalog_lock.
+
+    Returns:
+        bool: True if anything changed.
+    """
+    global catalog_version
+    if version == catalog_version and not sections:
+        return False
+    for name, (section_version, rows) in sections.items():
+        if name in reference_caches:
+            reference_caches[name][:] = rows
+            catalog_section_versions[name] = section_version
+            _catalog_section_rows[name] = [dict(row) for row in rows]
+    if sections:
+        rebuild_reference_lookups()
+    catalog_version = version
+    return True
+
+def sync_catalog(blocking: bool = True) -> bool:
+    """
+    Catch up with reference data changes committed to the shared store by other processes.
+
+    Args:
+        blocking (bool): Wait for a change in progress in this process instead
+            of returning (that change catches up by itself).
+
+    Returns:
+        bool: True if any changes were applied.
+    """
+    store = _catalog_store
+    if store is None or not store.changed_externally():
+        return False
+    if not _catalog_lock.acquire(blocking):
+        store.forget_changes_seen()
+        return False
+    try:
+        if store.catalog_version() == catalog_version:
+            return False
+        return _apply_shared_catalog(*store.read_reference_sections(catalog_version))
+    finally:
+        _catalog_lock.release()
+
+def replace_reference_row(name: str, row: Dict) -> int:
+    """
+    Publish a new version of a reference row, leaving the old row untouched for
+    readers that still hold it.
+
+    Args:
+        name (str): A reference_caches key, e.g. "releases".
+        row (Dict): The new row, replacing the one with the same ID.
+
+    Returns:
+        int: The new catalog version.
+    """
+    with catalog_transaction():
+        rows = reference_caches[name]
+        for position, existing in enumerate(rows):
+            if existing["id"] == row["id"]:
+                rows[position] = row
+                break
+        else:
+            raise ValueError(f"No {name} row with ID {row['id']}")
+        rebuild_reference_lookups()
+        return _bump_catalog_sections()
+
+def apply_reference_changes(name: str, upserts: List[Dict], deleted_ids: Iterable[int] = ()) -> None:
+    """
+    Apply row changes to a reference section in one pass.
+
+    Derived data is not refreshed; call mark_catalog_changed() once after the
+    last section has been changed.
+
+    Args:
+        name (str): A reference_caches key, e.g. "source_columns".
+        upserts (List[Dict]): New rows, and rows replacing those with the same ID.
+        deleted_ids (Iterable[int]): IDs of the rows to remove.
+    """
+    deleted_ids = set(deleted_ids)
+    upserts_by_id = {row["id"]: row for row in upserts}
+    with _catalog_lock:
+        rows = reference_caches[name]
+        kept = [upserts_by_id.pop(row["id"], row) for row in rows if row["id"] not in deleted_ids]
+        rows[:] = kept + list(upserts_by_id.values())
+
+def _bump_catalog_sections() -> int:
+    """
+    Bump the catalog version and record it for every reference section that
+    changed, persisting those sections if a shared store is configured (the
+    caller holds catalog_transaction()).
+    """
+    version = bump_catalog_version()
+    changed = {}
+    for name, rows in reference_caches.items():
+        if rows != _catalog_section_rows.get(name):
+            catalog_section_versions[name] = version
+            _catalog_section_rows[name] = [dict(row) for row in rows]
+            changed[name] = rows
+    if _catalog_store is not None:
+        _catalog_store.write_reference_sections(changed, version)
+    return version
+
+def get_catalog_sections_changed_since(version: int) -> List[str]:
+    """
+    Get the reference sections that changed after a catalog version.
+
+    Args:
+        version (int): The catalog version the caller has.
+    """
+    return [name for name, changed in catalog_section_versions.items() if changed > version]
+
+def rebuild_sort_indexes() -> None:
+    """
+    Refresh the reference lookups, e.g. after reference names change.
+
+    The sort indexes of every workspace are rebuilt before their next use.
+    """
+    with _catalog_lock:
+        rebuild_reference_lookups()
+
+def mark_catalog_changed() -> int:
+    """
+    Refresh derived data after the reference caches were modified in place.
+
+    Returns:
+        int: The new catalog version.
+    """
+    with catalog_transaction():
+        rebuild_sort_indexes()
+        return _bump_catalog_sections()
+
+def _name_key(lookup: str, id_field: str):
+    """Build a sort key function that orders mappings by a referenced name."""
+    def key(mapping: Dict):
+        row = reference_lookups[lookup].get(mapping.get(id_field))
+        return row["name"] if row else None
+    return key
+
+def _field_key(field: str):
+    """Build a sort key function that orders mappings by one of their own fields."""
+    def key(mapping: Dict):
+        return mapping.get(field)
+    return key
+
+def _tuple_key(*fields: str):
+    """Build an index key function over several mapping fields."""
+    def key(mapping: Dict):
+        return tuple(mapping.get(field) for field in fields)
+    return key
+
+def _new_sort_indexes() -> Dict[str, SortIndex]:
+    """Create the sort indexes of a workspace, maintained incrementally on every write."""
+    return {
+        "id": SortIndex(_field_key("id"), ["id"]),
+        "source_table_name": SortIndex(_name_key("source_tables", "source_table_id"), ["source_table_id"]),
+        "source_column_name": SortIndex(_name_key("source_columns", "source_column_id"), ["source_column_id"]),
+        "target_table_name": SortIndex(_name_key("target_tables", "target_table_id"), ["target_table_id"]),
+        "target_column_name": SortIndex(_name_key("target_columns", "target_column_id"), ["target_column_id"]),
+        "release_name": SortIndex(_name_key("releases", "release_id"), ["release_id"]),
+        "status": SortIndex(_field_key("status"), ["status"]),
+        "created_at": SortIndex(_field_key("created_at"), ["created_at"]),
+        "updated_at": SortIndex(_field_key("updated_at"), ["updated_at"]),
+    }
+
+def _new_hash_indexes() -> Dict[str, HashIndex]:
+    """Create the hash indexes (field value -> mapping IDs) of a workspace, maintained incrementally on every write."""
+    return {
+        "source_column_id": HashIndex(_field_key("source_column_id"), ["source_column_id"]),
+        "target_column_id": HashIndex(_field_key("target_column_id"), ["target_column_id"]),
+        "release_id": HashIndex(_field_key("release_id"), ["release_id"]),
+        "status": HashIndex(_field_key("status"), ["status"]),
+        # Uniqueness and conflict checks
+        "release_source_target": HashIndex(
+            _tuple_key("release_id", "source_column_id", "target_column_id"),
+            ["release_id", "source_column_id", "target_column_id"],
+        ),
+        "release_target": HashIndex(
+            _tuple_key("release_id", "target_column_id"),
+            ["release_id", "target_column_id"],
+        ),
+    }
+
+# Workspaces
+DEFAULT_WORKSPACE = "default"
+WORKSPACE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+# Callbacks run after every mapping write in any workspace, see backend.cache.workspace.ChangeListener
+change_listeners: List[ChangeListener] = []
+
+workspaces: Dict[str, Workspace] = {}
+_workspaces_lock = threading.Lock()
+
+# Workspace the module-level mapping functions act on
+_current_workspace: ContextVar[str] = ContextVar("sttm_workspace", default=DEFAULT_WORKSPACE)
+
+# Shared store file of the default workspace, if configured (see configure_shared_store).
+# Other workspaces use files next to it, e.g. sttm_shared.<workspace>.db.
+_shared_store_path: Optional[str] = None
+
+def _workspace_store_path(name: str) -> Optional[str]:
+    """Get the shared store file of a workspace, if sharing is configured."""
+    if _shared_store_path is None or name == DEFAULT_WORKSPACE:
+        return _shared_store_path
+    root, extension = os.path.splitext(_shared_store_path)
+    return f"{root}.{name}{extension}"
+
+def _new_workspace(name: str) -> Workspace:
+    """Create a workspace and open its shared store, if configured. The caller holds _workspaces_lock."""
+    created = Workspace(name, _new_sort_indexes(), _new_hash_indexes(), change_listeners, _get_reference_lookups_version)
+    path = _workspace_store_path(name)
+    if path is not None:
+        created.configure_shared_store(path)
+    workspaces[name] = created
+    return created
+
+def create_workspace(name: str) -> bool:
+    """
+    Create an empty workspace.
+
+    Args:
+        name (str): The workspace name: letters, digits, '-' and '_'.
+
+    Returns:
+        bool: False if the workspace already exists.
+
+    Raises:
+        ValueError: If the name is invalid.
+    """
+    if not WORKSPACE_NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid workspace name: {name}")
+    with _workspaces_lock:
+        path = _workspace_store_path(name)
+        if name in workspaces or (path is not None and os.path.exists(path)):
+            return False
+        _new_workspace(name)
+    return True
+
+def workspace(name: Optional[str] = None) -> Workspace:
+    """
+    Get a workspace; by default the current one.
+
+    With a shared store, a workspace created by another worker process is
+    opened on first use.
+
+    Raises:
+        LookupError: If the workspace does not exist.
+    """
+    if name is None:
+        name = _current_workspace.get()
+    found = workspaces.get(name)
+    if found is not None:
+        return found
+    with _workspaces_lock:
+        if name in workspaces:
+            return workspaces[name]
+        path = _workspace_store_path(name)
+        if WORKSPACE_NAME_PATTERN.match(name) and path is not None and os.path.exists(path):
+            return _new_workspace(name)
+    raise LookupError(f"Workspace {name} not found")
+
+def list_workspace_names() -> List[str]:
+    """Get the names of all workspaces, including those created by other worker processes."""
+    names = set(workspaces)
+    if _shared_store_path is not None:
+        root, extension = os.path.splitext(_shared_store_path)
+        for path in glob.glob(f"{glob.escape(root)}.*{extension}"):
+            name = path[len(root) + 1:len(path) - len(extension)]
+            if WORKSPACE_NAME_PATTERN.match(name):
+                names.add(name)
+    return sorted(names)
+
+def current_workspace_name() -> str:
+    """Get the name of the workspace the module-level mapping functions act on."""
+    return _current_workspace.get()
+
+@contextmanager
+def use_workspace(name: str):
+    """
+    Make a workspace the current one for the calls in this context.
+
+    The setting is a context variable, so it follows the calls of one request
+    (including those run on the blocking-call executor) and no other.
+
+    Raises:
+        LookupError: If the workspace does not exist.
+    """
+    workspace(name)
+    token = _current_workspace.set(name)
+    try:
+        yield
+    finally:
+        _current_workspace.reset(token)
+
+def configure_shared_store(path: Optional[str]) -> None:
+    """
+    Share the mappings of every workspace, and the reference data, with other
+    worker processes through SQLite files.
+
+    The first process to use a file seeds it with its local data; later ones
+    replace their local data with the shared data. The reference data is kept
+    in a file of its own next to the default workspace's, e.g.
+    sttm_shared-catalog.db, so that catalog changes made inside a mapping
+    write never wait for that workspace's file.
+
+    Args:
+        path (Optional[str]): The SQLite database file of the default workspace,
+            created if needed, or None to stop sharing.
+    """
+    global _shared_store_path
+    with _workspaces_lock:
+        _shared_store_path = path
+        for name, existing in workspaces.items():
+            existing.configure_shared_store(_workspace_store_path(name))
+    _configure_catalog_store(path)
+
+def _configure_catalog_store(path: Optional[str]) -> None:
+    """Share the reference data through the catalog store next to a default workspace store file."""
+    global _catalog_store
+    with _catalog_lock:
+        if path is None:
+            _catalog_store = None
+            return
+        root, extension = os.path.splitext(path)
+        store = SharedStore(f"{root}-catalog{extension}")
+        with store.transaction():
+            version, sections = store.read_reference_sections()
+            if not sections:
+                for name, rows in reference_caches.items():
+                    store.write_reference_sections({name: rows}, catalog_section_versions[name])
+                store.write_reference_sections({}, catalog_version)
+                version, sections = store.read_reference_sections()
+        _apply_shared_catalog(version, sections)
+        _catalog_store = store
+        store.changed_externally()
+
+def sync_all(blocking: bool = True) -> bool:
+    """
+    Catch up with the writes other processes committed to any local workspace.
+
+    Returns:
+        bool: True if any writes were applied.
+    """
+    synced = False
+    for existing in list(workspaces.values()):
+        synced = existing.sync(blocking) or synced
+    return synced
+
+# Mapping functions of the current workspace (see backend.cache.workspace.Workspace)
+def write_transaction():
+    """Run a read-validate-write sequence on the current workspace without interleaving writes."""
+    return workspace().write_transaction()
+
+def sync(blocking: bool = True) -> bool:
+    """Catch up with the current workspace's writes committed to the shared store by other processes."""
+    return workspace().sync(blocking)
+
+def bump_mappings_version() -> int:
+    """Mark the current workspace's mappings as changed and return the new version."""
+    return workspace().bump_mappings_version()
+
+def compact_change_log() -> None:
+    """Drop superseded change log entries of the current workspace."""
+    workspace().compact_change_log()
+
+def get_changes_since(version: int) -> Tuple[int, Optional[int], List[Dict], List[int]]:
+    """Get the mappings of the current workspace changed after a mappings version."""
+    return workspace().get_changes_since(version)
+
 def get_next_mapping_id() -> int:
-    """Get the next available mapping ID."""
-    global mapping_id_counter
-    current_id = mapping_id_counter
-    mapping_id_counter += 1
-    return current_id
+    """Get the next available mapping ID of the current workspace."""
+    return workspace().get_next_mapping_id()
 
 def add_mapping(mapping_data: Dict) -> Dict:
-    """Add a new mapping to the cache."""
-    mapping = mapping_data.copy()
-    mapping["id"] = get_next_mapping_id()
-    mapping["created_at"] = datetime.now().isoformat()
-    mapping["updated_at"] = mapping["created_at"]
-    mappings_cache.append(mapping)
-    return mapping
+    """Add a new mapping to the current workspace."""
+    return workspace().add_mapping(mapping_data)
+
+def add_mappings(mappings_data: List[Dict]) -> List[Dict]:
+    """Add many mappings to the current workspace as one change."""
+    return workspace().add_mappings(mappings_data)
 
 def get_mapping(mapping_id: int) -> Optional[Dict]:
-    """Get a mapping by ID."""
-    for mapping in mappings_cache:
-        if mapping["id"] == mapping_id:
-            return mapping
-    return None
+    """Get a mapping of the current workspace by ID."""
+    return workspace().get_mapping(mapping_id)
 
 def update_mapping(mapping_id: int, mapping_data: Dict) -> Optional[Dict]:
-    """Update an existing mapping."""
-    for i, mapping in enumerate(mappings_cache):
-        if mapping["id"] == mapping_id:
-            updated_mapping = {**mapping, **mapping_data}
-            updated_mapping["updated_at"] = datetime.now().isoformat()
-            mappings_cache[i] = updated_mapping
-            return updated_mapping
-    return None
+    """Update an existing mapping of the current workspace."""
+    return workspace().update_mapping(mapping_id, mapping_data)
+
+def update_mappings(updates: Dict[int, Dict]) -> List[Dict]:
+    """Update many mappings of the current workspace as one change."""
+    return workspace().update_mappings(updates)
 
 def delete_mapping(mapping_id: int) -> bool:
-    """Delete a mapping by ID."""
-    for i, mapping in enumerate(mappings_cache):
-        if mapping["id"] == mapping_id:
-            del mappings_cache[i]
-            return True
-    return False
+    """Delete a mapping of the current workspace by ID."""
+    return workspace().delete_mapping(mapping_id)
 
 def get_all_mappings() -> List[Dict]:
-    """Get all mappings."""
-    return mappings_cache
+    """Get an immutable snapshot of all mappings of the current workspace."""
+    return workspace().get_all_mappings()
+
+def get_mappings(mapping_ids: Iterable[int]) -> Tuple[List[Dict], List[int]]:
+    """Get mappings of the current workspace by ID, returning the mappings found and the IDs not found."""
+    return workspace().get_mappings(mapping_ids)
+
+def get_mappings_by_index(index_name: str, key) -> List[Dict]:
+    """Get the mappings of the current workspace with a field value through a hash index, in ID order."""
+    return workspace().get_mappings_by_index(index_name, key)
+
+def group_mapping_ids(
+    groupings: Sequence[Tuple[str, Callable[[Hashable], Hashable]]]
+) -> List[Dict[Hashable, Set[int]]]:
+    """Group the mapping IDs of the current workspace's hash indexes by a function of their keys."""
+    return workspace().group_mapping_ids(groupings)
+
+def get_mapping_stats() -> Tuple[int, Dict]:
+    """Get the coverage and status counters of the current workspace."""
+    return workspace().get_mapping_stats()
+
+def iter_sorted_mappings(sort_field: str, descending: bool = False) -> Iterator[Dict]:
+    """Iterate over the mappings of the current workspace in the order of a maintained sort index."""
+    return workspace().iter_sorted_mappings(sort_field, descending)
+
+def get_memory_usage() -> Dict:
+    """
+    Estimate the memory held by the reference data and by every workspace open in this process.
+
+    Returns:
+        Dict: The "catalog" usage (entries and bytes of each reference section,
+        of the ID lookups, snapshots and change detection copies) and the usage
+        of each workspace (see Workspace.memory_usage).
+    """
+    with _catalog_lock:
+        sections = {name: structure_usage(rows, len(rows)) for name, rows in reference_caches.items()}
+        # The lookups and snapshots reference the rows of the sections, so only their containers count
+        lookups = {
+            "entries": sum(len(lookup) for lookup in reference_lookups.values()),
+            "bytes": sys.getsizeof(reference_lookups) + sum(sys.getsizeof(lookup) for lookup in reference_lookups.values()),
+        }
+        snapshots = {
+            "entries": sum(len(rows) for _, rows in _reference_snapshots.values()),
+            "bytes": sum(sys.getsizeof(rows) for _, rows in _reference_snapshots.values()),
+        }
+        copies = structure_usage(_catalog_section_rows, sum(len(rows) for rows in _catalog_section_rows.values()))
+    catalog = {"sections": sections, "lookups": lookups, "snapshots": snapshots, "change_detection": copies}
+    catalog["total_bytes"] = (
+        sum(section["bytes"] for section in sections.values()) + lookups["bytes"] + snapshots["bytes"] + copies["bytes"]
+    )
+    return {
+        "catalog": catalog,
+        "workspaces": [existing.memory_usage() for existing in list(workspaces.values())],
+    }
+
+# Attributes of the current workspace readable as module attributes, e.g. dummy_data.mappings_version
+_WORKSPACE_ATTRIBUTES = {
+    "mappings_cache", "mapping_id_counter", "mappings_version", "change_log",
+    "shared_store", "sort_indexes", "hash_indexes", "mapping_stats",
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _WORKSPACE_ATTRIBUTES:
+        return getattr(workspace(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Initialize with some sample mappings
 sample_mappings = [
@@ -150,6 +677,14 @@ sample_mappings = [
     },
 ]
 
-# Add sample mappings to cache
+# Add sample mappings to the default workspace
+rebuild_reference_lookups()
+_catalog_section_rows.update({name: [dict(row) for row in rows] for name, rows in reference_caches.items()})
+with _workspaces_lock:
+    _new_workspace(DEFAULT_WORKSPACE)
 for mapping in sample_mappings:
-    add_mapping(mapping) 
\ No newline at end of file
+    workspace(DEFAULT_WORKSPACE).add_mapping(mapping)
+
+# Share the mappings with other worker processes if a shared store is configured
+if os.environ.get("STTM_SHARED_DB"):
+    configure_shared_store(os.environ["STTM_SHARED_DB"])
@@ -0,0 +1,79 @@
+"""
+Hash indexes for the STTM in-memory cache.
+This module provides key -> mapping IDs lookups that are maintained incrementally on writes.
+"""
+import sys
+from typing import Any, Callable, Dict, Hashable, Iterable, Sequence, Set, Tuple
+
+from backend.cache.memory import approximate_size
+
+class HashIndex:
+    """
+    Mapping IDs grouped by a key.
+
+    Mappings whose key is None are not indexed.
+    """
+
+    def __init__(self, key_func: Callable[[Dict], Any], fields: Sequence[str]):
+        self._key_func = key_func
+        # Mapping fields the key depends on; writes that touch none of them skip the index
+        self.fields = frozenset(fields)
+        self._ids_by_key: Dict[Hashable, Set[int]] = {}
+        self._key_by_id: Dict[int, Hashable] = {}
+
+    def add(self, mapping: Dict) -> None:
+        """Insert a mapping into the index."""
+        key = self._key_func(mapping)
+        if key is None:
+            return
+        self._ids_by_key.setdefault(key, set()).add(mapping["id"])
+        self._key_by_id[mapping["id"]] = key
+
+    def remove(self, mapping_id: int) -> None:
+        """Remove a mapping from the index, if present."""
+        key = self._key_by_id.pop(mapping_id, None)
+        if key is None:
+            return
+        ids = self._ids_by_key[key]
+        ids.discard(mapping_id)
+        if not ids:
+            del self._ids_by_key[key]
+
+    def update(self, mapping: Dict) -> None:
+        """Move a mapping whose key may have changed."""
+        if self._key_by_id.get(mapping["id"]) == self._key_func(mapping):
+            return
+        self.remove(mapping["id"])
+        self.add(mapping)
+
+    def update_many(self, mappings: Iterable[Dict]) -> None:
+        """Move many mappings whose keys may have changed."""
+        key_func = self._key_func
+        key_by_id = self._key_by_id
+        for mapping in mappings:
+            if key_by_id.get(mapping["id"]) != key_func(mapping):
+                self.remove(mapping["id"])
+                self.add(mapping)
+
+    def rebuild(self, mappings: Iterable[Dict]) -> None:
+        """Rebuild the index from scratch."""
+        self._ids_by_key = {}
+        self._key_by_id = {}
+        for mapping in mappings:
+            self.add(mapping)
+
+    def items(self) -> Iterable[Tuple[Hashable, Set[int]]]:
+        """Iterate over the keys and their mapping IDs. The sets must not be modified."""
+        return self._ids_by_key.items()
+
+    def get(self, key: Hashable) -> Set[int]:
+        """Get the IDs of the mappings with a key. The returned set must not be modified."""
+        return self._ids_by_key.get(key, set())
+
+    def approximate_bytes(self) -> int:
+        """Estimate the bytes held by the index, not counting the mapping field values it references."""
+        # The keys by ID are the keys of the ID sets, so only the dict itself adds to them
+        return approximate_size(self._ids_by_key, shared_leaves=True) + sys.getsizeof(self._key_by_id)
+
+    def __len__(self) -> int:
+        return len(self._key_by_id)
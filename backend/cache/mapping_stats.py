@@ -0,0 +1,117 @@
+"""
+Mapping statistics for the STTM in-memory cache.
+This module provides coverage and status counters that are maintained incrementally on writes.
+"""
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+# Scope of the counters over the mappings of every release
+ALL_RELEASES = "all"
+
+# (release ID, target table ID, target column ID, status) of a mapping
+StatsKey = Tuple[Optional[int], Optional[int], Optional[int], Optional[str]]
+
+class MappingStats:
+    """
+    Mapping counts by status and mapped target column counts, per target table
+    and release.
+
+    Every mapping is counted in its release's scope and in the ALL_RELEASES
+    scope. A target column is mapped in a scope while at least one mapping of
+    that scope targets it. Maintained through the same interface as the
+    indexes, so that every mapping write keeps it current.
+    """
+
+    def __init__(self):
+        # Mapping fields the counters depend on; writes that touch none of them skip the stats
+        self.fields = frozenset(["release_id", "target_table_id", "target_column_id", "status"])
+        self._key_by_id: Dict[int, StatsKey] = {}
+        # (scope, target table ID, target column ID) -> number of mappings
+        self._column_refs: Dict[Tuple[Hashable, Optional[int], Optional[int]], int] = {}
+        # (scope, target table ID) -> number of mapped target columns
+        self._mapped_columns: Dict[Tuple[Hashable, Optional[int]], int] = {}
+        # (scope, target table ID) -> status -> number of mappings
+        self._status_counts: Dict[Tuple[Hashable, Optional[int]], Dict[Optional[str], int]] = {}
+
+    @staticmethod
+    def _key(mapping: Dict) -> StatsKey:
+        return (
+            mapping.get("release_id"),
+            mapping.get("target_table_id"),
+            mapping.get("target_column_id"),
+            mapping.get("status"),
+        )
+
+    def _count(self, key: StatsKey, delta: int) -> None:
+        """Add delta (1 or -1) mappings with a key to the counters of both of its scopes."""
+        release_id, table_id, column_id, status = key
+        for scope in (release_id, ALL_RELEASES):
+            group = (scope, table_id)
+            statuses = self._status_counts.setdefault(group, {})
+            count = statuses.get(status, 0) + delta
+            if count:
+                statuses[status] = count
+            else:
+                del statuses[status]
+                if not statuses:
+                    del self._status_counts[group]
+
+            column = (scope, table_id, column_id)
+            refs = self._column_refs.get(column, 0) + delta
+            if refs:
+                self._column_refs[column] = refs
+            else:
+                del self._column_refs[column]
+            if refs == 1 and delta == 1:
+                self._mapped_columns[group] = self._mapped_columns.get(group, 0) + 1
+            elif refs == 0:
+                self._mapped_columns[group] -= 1
+                if not self._mapped_columns[group]:
+                    del self._mapped_columns[group]
+
+    def add(self, mapping: Dict) -> None:
+        """Count a mapping."""
+        key = self._key(mapping)
+        self._key_by_id[mapping["id"]] = key
+        self._count(key, 1)
+
+    def remove(self, mapping_id: int) -> None:
+        """Stop counting a mapping, if counted."""
+        key = self._key_by_id.pop(mapping_id, None)
+        if key is not None:
+            self._count(key, -1)
+
+    def update(self, mapping: Dict) -> None:
+        """Recount a mapping whose counted fields may have changed."""
+        if self._key_by_id.get(mapping["id"]) == self._key(mapping):
+            return
+        self.remove(mapping["id"])
+        self.add(mapping)
+
+    def update_many(self, mappings: Iterable[Dict]) -> None:
+        """Recount many mappings whose counted fields may have changed."""
+        for mapping in mappings:
+            self.update(mapping)
+
+    def rebuild(self, mappings: Iterable[Dict]) -> None:
+        """Recount all mappings from scratch."""
+        self._key_by_id = {}
+        self._column_refs = {}
+        self._mapped_columns = {}
+        self._status_counts = {}
+        for mapping in mappings:
+            self.add(mapping)
+
+    def groups(self) -> Dict[Tuple[Hashable, Optional[int]], Tuple[int, Dict[Optional[str], int]]]:
+        """
+        Get a copy of the counters of every (scope, target table ID) group with mappings.
+
+        Returns:
+            Dict: (number of mapped target columns, mapping counts by status) by group.
+        """
+        return {
+            group: (self._mapped_columns.get(group, 0), dict(statuses))
+            for group, statuses in self._status_counts.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._key_by_id)
@@ -0,0 +1,74 @@
+"""
+Memory accounting for the STTM in-memory cache.
+This module estimates the memory held by cached rows, indexes and derived caches.
+"""
+import sys
+from itertools import islice
+from typing import Any, Dict, Optional, Set
+
+# Items of a container measured one by one; larger containers are measured on a
+# sample and extrapolated, so that accounting stays cheap on large caches
+SAMPLE_SIZE = 200
+
+def approximate_size(
+    obj: Any, seen: Optional[Set[int]] = None, shared_leaves: bool = False, sample_size: int = SAMPLE_SIZE
+) -> int:
+    """
+    Estimate the bytes held by an object and everything it references.
+
+    Objects already in seen are not counted again. Code (functions, methods
+    and classes) is not counted. Indexes and counters hold the field values of
+    the rows they are built from, so for them shared_leaves counts only the
+    containers (dicts, lists, tuples, sets) and not the scalar values in them.
+
+    Args:
+        obj (Any): The object to measure.
+        seen (Optional[Set[int]]): IDs of the objects already counted; updated.
+        shared_leaves (bool): Whether scalar values are owned by other structures.
+        sample_size (int): Items measured per container before extrapolating.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or callable(obj):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        # Dicts and sets are sampled from the start, since only lists can be indexed
+        items = islice(obj.items(), sample_size)
+    elif isinstance(obj, (list, tuple)):
+        step = max(1, len(obj) // sample_size)
+        items = ((obj[i],) for i in range(0, len(obj), step))
+    elif isinstance(obj, (set, frozenset)):
+        items = ((item,) for item in islice(obj, sample_size))
+    elif hasattr(obj, "__dict__"):
+        return size + approximate_size(vars(obj), seen, shared_leaves, sample_size)
+    else:
+        return 0 if shared_leaves else size
+
+    count = 0
+    sampled = 0
+    for parts in items:
+        count += 1
+        sampled += sum(approximate_size(part, seen, shared_leaves, sample_size) for part in parts)
+    if count < len(obj):
+        sampled = sampled * len(obj) // count
+    return size + sampled
+
+def structure_usage(obj: Any, entries: int, shared_leaves: bool = False) -> Dict[str, int]:
+    """
+    Describe the memory of one cached structure.
+
+    Args:
+        obj (Any): The structure.
+        entries (int): Its number of rows, entries or keys.
+        shared_leaves (bool): Whether its scalar values are owned by other structures.
+
+    Returns:
+        Dict[str, int]: The "entries" and approximate "bytes".
+    """
+    return {"entries": entries, "bytes": approximate_size(obj, shared_leaves=shared_leaves)}
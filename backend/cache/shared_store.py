@@ -0,0 +1,262 @@
+"""
+Shared SQLite store for the STTM in-memory cache.
+This module lets several API worker processes share one consistent set of mappings.
+
+The SQLite file (in WAL mode) is the source of truth for mappings, the mapping
+ID counter and the mappings version. Each worker keeps its in-memory cache and
+indexes as a replica: writers persist their changes inside a BEGIN IMMEDIATE
+transaction, and readers replay the shared change table whenever
+PRAGMA data_version reports a commit from another process.
+
+The reference data (tables, columns and releases) and the catalog version are
+shared the same way, one row per reference section, in a store of their own
+(see backend.cache.dummy_data.configure_shared_store).
+"""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS mapping_rows (
+        id INTEGER PRIMARY KEY,
+        data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mapping_changes (
+        version INTEGER NOT NULL,
+        mapping_id INTEGER NOT NULL,
+        PRIMARY KEY (version, mapping_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reference_sections (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS store_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+]
+
+class SharedStore:
+    """A mapping store in a SQLite file shared by several processes."""
+
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with self.transaction():
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.execute(
+                "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0), ('next_mapping_id', 1), ('catalog_version', 0)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the store."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def changed_externally(self) -> bool:
+        """
+        Check whether another connection has committed since this thread last checked.
+
+        Uses SQLite's per-connection data version, which changes on commits by
+        other connections (including other processes) and is read without
+        touching the database file.
+        """
+        data_version = self._connection().execute("PRAGMA data_version").fetchone()[0]
+        changed = data_version != getattr(self._local, "data_version", None)
+        self._local.data_version = data_version
+        return changed
+
+    def forget_changes_seen(self) -> None:
+        """Make this thread's next changed_externally() call report a change."""
+        self._local.data_version = None
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run a write transaction that excludes writers in every other process."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _meta(self, key: str) -> int:
+        return self._connection().execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _set_meta(self, key: str, value: int) -> None:
+        self._connection().execute("UPDATE store_meta SET value = ? WHERE key = ?", (value, key))
+
+    def version(self) -> int:
+        """Get the shared mappings version."""
+        return self._meta("version")
+
+    def allocate_mapping_ids(self, count: int) -> int:
+        """Reserve mapping IDs inside a transaction and return the first one."""
+        first_id = self._meta("next_mapping_id")
+        self._set_meta("next_mapping_id", first_id + count)
+        return first_id
+
+    def oldest_change_version(self) -> Optional[int]:
+        """Get the oldest version still in the change table, or None if it is empty."""
+        return self._connection().execute("SELECT MIN(version) FROM mapping_changes").fetchone()[0]
+
+    def write_changes(self, changes: Dict[int, Optional[Dict]], version: int) -> int:
+        """
+        Persist mapping changes inside a transaction under a new version.
+
+        Args:
+            changes (Dict[int, Optional[Dict]]): The new row for each changed
+                mapping ID, or None for deleted mappings.
+            version (int): The new mappings version.
+
+        Returns:
+            int: The new mappings version.
+        """
+        connection = self._connection()
+        upserts = [(mapping_id, json.dumps(row)) for mapping_id, row in changes.items() if row is not None]
+        deletes = [(mapping_id,) for mapping_id, row in changes.items() if row is None]
+        connection.executemany("INSERT OR REPLACE INTO mapping_rows (id, data) VALUES (?, ?)", upserts)
+        connection.executemany("DELETE FROM mapping_rows WHERE id = ?", deletes)
+        connection.executemany(
+            "INSERT INTO mapping_changes (version, mapping_id) VALUES (?, ?)",
+            [(version, mapping_id) for mapping_id in changes],
+        )
+        self._set_meta("version", version)
+        return version
+
+    def read_changes_since(self, version: int) -> List[Tuple[int, Dict[int, Optional[Dict]]]]:
+        """
+        Read the changes committed after a version, grouped by version.
+
+        The rows returned are the current ones, which may be newer than the
+        version they are listed under; replaying every group in order still
+        ends in the current state.
+        """
+        connection = self._connection()
+        entries = connection.execute(
+            "SELECT version, mapping_id FROM mapping_changes WHERE version > ? ORDER BY version, mapping_id",
+            (version,),
+        ).fetchall()
+        if not entries:
+            return []
+        rows = self.read_rows({mapping_id for _, mapping_id in entries})
+
+        grouped: List[Tuple[int, Dict[int, Optional[Dict]]]] = []
+        for entry_version, mapping_id in entries:
+            if not grouped or grouped[-1][0] != entry_version:
+                grouped.append((entry_version, {}))
+            grouped[-1][1][mapping_id] = rows.get(mapping_id)
+        return grouped
+
+    def read_rows(self, mapping_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Read the current rows of some mappings; deleted mappings are left out."""
+        connection = self._connection()
+        rows: Dict[int, Dict] = {}
+        ids = list(mapping_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for mapping_id, data in connection.execute(
+                f"SELECT id, data FROM mapping_rows WHERE id IN ({placeholders})", chunk
+            ):
+                rows[mapping_id] = json.loads(data)
+        return rows
+
+    def load_all(self) -> Tuple[int, int, List[Dict]]:
+        """
+        Read a consistent copy of the whole store.
+
+        Returns:
+            Tuple[int, int, List[Dict]]: The version, the next mapping ID and all mappings.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            version = self.version()
+            next_mapping_id = self._meta("next_mapping_id")
+            rows = [json.loads(data) for (data,) in connection.execute("SELECT data FROM mapping_rows ORDER BY id")]
+        finally:
+            connection.execute("COMMIT")
+        return version, next_mapping_id, rows
+
+    def catalog_version(self) -> int:
+        """Get the shared catalog version."""
+        return self._meta("catalog_version")
+
+    def write_reference_sections(self, sections: Dict[str, List[Dict]], version: int) -> None:
+        """
+        Persist changed reference sections inside a transaction under a new catalog version.
+
+        Args:
+            sections (Dict[str, List[Dict]]): All rows of each changed section, by name.
+            version (int): The new catalog version.
+        """
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO reference_sections (name, version, data) VALUES (?, ?, ?)",
+            [(name, version, json.dumps(rows)) for name, rows in sections.items()],
+        )
+        self._set_meta("catalog_version", version)
+
+    def read_reference_sections(self, since: int = -1) -> Tuple[int, Dict[str, Tuple[int, List[Dict]]]]:
+        """
+        Read a consistent copy of the reference sections changed after a catalog version.
+
+        Runs inside the write transaction of this thread if one is open,
+        otherwise in a read transaction of its own.
+
+        Args:
+            since (int): The catalog version the caller has; by default all sections are read.
+
+        Returns:
+            Tuple[int, Dict[str, Tuple[int, List[Dict]]]]: The catalog version, and
+            the version each section last changed at and its rows, by name.
+        """
+        connection = self._connection()
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+            try:
+                return self.read_reference_sections(since)
+            finally:
+                connection.execute("COMMIT")
+        sections = {
+            name: (section_version, json.loads(data))
+            for name, section_version, data in connection.execute(
+                "SELECT name, version, data FROM reference_sections WHERE version > ?", (since,)
+            )
+        }
+        return self.catalog_version(), sections
+
+    def compact(self, keep_versions: int) -> None:
+        """
+        Drop change entries older than the latest keep_versions versions.
+
+        Runs inside the write transaction of this thread if one is open (e.g.
+        right after write_changes), otherwise in a transaction of its own.
+        """
+        connection = self._connection()
+        if not connection.in_transaction:
+            with self.transaction():
+                self.compact(keep_versions)
+            return
+        connection.execute("DELETE FROM mapping_changes WHERE version <= ?", (self.version() - keep_versions,))
@@ -0,0 +1,20 @@
+"""
+Immutable snapshots for the STTM in-memory cache.
+This module provides the read-only list type handed out to readers of cached data.
+"""
+from typing import NoReturn
+
+class FrozenList(list):
+    """
+    A list that cannot be modified.
+
+    Snapshots are built once per data version and shared by every reader, so
+    handing one out is free and no reader can change what the others see.
+    Use list(snapshot) for a private, modifiable copy.
+    """
+
+    def _readonly(self, *args, **kwargs) -> NoReturn:
+        raise TypeError("Snapshots are read-only; copy with list() to modify")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
@@ -0,0 +1,195 @@
+"""
+Sort indexes for the STTM in-memory cache.
+This module provides sorted views over mappings that are maintained incrementally on writes.
+"""
+import sys
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from backend.cache.memory import approximate_size
+
+# Bulk updates touching more than 1/BULK_RESORT_RATIO of the entries re-sort instead of moving entries one by one
+BULK_RESORT_RATIO = 64
+
+# Entries per block of the sorted entries; a block is split once it holds twice as many
+BLOCK_SIZE = 256
+
+# Blocks measured by approximate_bytes()
+SAMPLED_BLOCKS = 16
+
+class SortedEntries:
+    """
+    A read-only snapshot of the entries of a sort index, in sort order.
+
+    Shares its blocks with the index; the index copies a block before changing it.
+    """
+
+    def __init__(self, blocks: List[List[Tuple]], length: int):
+        self._blocks = blocks
+        self._length = length
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for block in self._blocks:
+            yield from block
+
+    def __reversed__(self) -> Iterator[Tuple]:
+        for block in reversed(self._blocks):
+            yield from reversed(block)
+
+    def __len__(self) -> int:
+        return self._length
+
+class SortIndex:
+    """
+    Mapping IDs kept in order of a sort key.
+
+    Entries are (is_missing, value, id) tuples so that missing values sort last
+    in ascending order and ties are broken by mapping ID.
+
+    The entries are kept in sorted blocks of up to 2 * BLOCK_SIZE entries, and
+    are copy-on-write: once handed out by snapshot(), the next write copies the
+    list of blocks and the block it changes, not every entry, so writes between
+    reads stay cheap and snapshots share all unchanged blocks.
+    """
+
+    def __init__(self, key_func: Callable[[Dict], Any], fields: Sequence[str]):
+        self._key_func = key_func
+        # Mapping fields the key depends on; writes that touch none of them skip the index
+        self.fields = frozenset(fields)
+        self._block_size = BLOCK_SIZE
+        self._entry_by_id: Dict[int, Tuple] = {}
+        self._load([])
+
+    def _load(self, entries: List[Tuple]) -> None:
+        """Replace the entries with sorted ones, in fresh blocks."""
+        self._blocks: List[List[Tuple]] = [
+            entries[start:start + self._block_size] for start in range(0, len(entries), self._block_size)
+        ]
+        # Last entry of each block, to find the block of an entry
+        self._maxes: List[Tuple] = [block[-1] for block in self._blocks]
+        # Whether each block, and the block list itself, are not shared with a snapshot
+        self._owned: List[bool] = [True] * len(self._blocks)
+        self._shared = False
+        self._length = len(entries)
+
+    def _writable_block(self, position: int) -> List[Tuple]:
+        """Get a block for modification, copying it and the block lists first if a reader holds them."""
+        if self._shared:
+            self._blocks = self._blocks.copy()
+            self._maxes = self._maxes.copy()
+            self._owned = [False] * len(self._blocks)
+            self._shared = False
+        if not self._owned[position]:
+            self._blocks[position] = self._blocks[position].copy()
+            self._owned[position] = True
+        return self._blocks[position]
+
+    def _entry(self, mapping: Dict) -> Tuple:
+        value = self._key_func(mapping)
+        return (value is None, value, mapping["id"])
+
+    def _insert(self, entry: Tuple) -> None:
+        if not self._blocks:
+            if self._shared:
+                self._load([])
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            self._owned.append(True)
+            self._length = 1
+            return
+        position = min(bisect_left(self._maxes, entry), len(self._blocks) - 1)
+        block = self._writable_block(position)
+        insort(block, entry)
+        self._maxes[position] = block[-1]
+        self._length += 1
+        if len(block) > 2 * self._block_size:
+            self._blocks[position:position + 1] = [block[:self._block_size], block[self._block_size:]]
+            self._maxes[position:position + 1] = [block[self._block_size - 1], block[-1]]
+            self._owned[position:position + 1] = [True, True]
+
+    def _delete(self, entry: Tuple) -> None:
+        position = bisect_left(self._maxes, entry)
+        block = self._writable_block(position)
+        del block[bisect_left(block, entry)]
+        self._length -= 1
+        if block:
+            self._maxes[position] = block[-1]
+        else:
+            del self._blocks[position], self._maxes[position], self._owned[position]
+
+    def add(self, mapping: Dict) -> None:
+        """Insert a mapping into the index."""
+        entry = self._entry(mapping)
+        self._insert(entry)
+        self._entry_by_id[mapping["id"]] = entry
+
+    def remove(self, mapping_id: int) -> None:
+        """Remove a mapping from the index, if present."""
+        entry = self._entry_by_id.pop(mapping_id, None)
+        if entry is None:
+            return
+        self._delete(entry)
+
+    def update(self, mapping: Dict) -> None:
+        """Reposition a mapping whose sort key may have changed."""
+        if self._entry_by_id.get(mapping["id"]) == self._entry(mapping):
+            return
+        self.remove(mapping["id"])
+        self.add(mapping)
+
+    def update_many(self, mappings: Iterable[Dict]) -> None:
+        """
+        Reposition many mappings at once.
+
+        Large batches re-sort the whole index once (O(n log n), and close to
+        O(n) on the mostly sorted entries) instead of moving entries one by one.
+        """
+        changed = {}
+        for mapping in mappings:
+            entry = self._entry(mapping)
+            if self._entry_by_id.get(mapping["id"]) != entry:
+                changed[mapping["id"]] = entry
+        if len(changed) * BULK_RESORT_RATIO < self._length:
+            for mapping_id, entry in changed.items():
+                self.remove(mapping_id)
+                self._insert(entry)
+                self._entry_by_id[mapping_id] = entry
+            return
+        self._entry_by_id.update(changed)
+        self._load(sorted(self._entry_by_id.values()))
+
+    def rebuild(self, mappings: Iterable[Dict]) -> None:
+        """Rebuild the index from scratch."""
+        self._entry_by_id = {m["id"]: self._entry(m) for m in mappings}
+        self._load(sorted(self._entry_by_id.values()))
+
+    def snapshot(self) -> SortedEntries:
+        """
+        Get the current entries in sort order without copying them.
+
+        Later writes leave the returned entries untouched. Must not be called
+        concurrently with writes.
+        """
+        self._shared = True
+        return SortedEntries(self._blocks, self._length)
+
+    def iter_ids(self, descending: bool = False) -> Iterator[int]:
+        """Iterate over mapping IDs in sort order, as of the start of the iteration."""
+        entries = self.snapshot()
+        for entry in (reversed(entries) if descending else entries):
+            yield entry[2]
+
+    def approximate_bytes(self) -> int:
+        """Estimate the bytes held by the index, not counting the mapping field values it references."""
+        # The entries by ID are the entries of the sorted blocks, so only the dict itself adds to them
+        size = sys.getsizeof(self._blocks) + sys.getsizeof(self._maxes) + sys.getsizeof(self._entry_by_id)
+        if not self._blocks:
+            return size
+        # Blocks are measured on a sample, like the entries within each block
+        sample = self._blocks[::max(1, len(self._blocks) // SAMPLED_BLOCKS)]
+        seen: set = set()
+        sampled = sum(approximate_size(block, seen, shared_leaves=True) for block in sample)
+        return size + sampled * len(self._blocks) // len(sample)
+
+    def __len__(self) -> int:
+        return self._length
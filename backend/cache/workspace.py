@@ -0,0 +1,630 @@
+"""
+Workspace partitions of the STTM in-memory mapping store.
+This module provides the mappings, indexes, ID space, data version and change log of one workspace.
+
+Each team works in its own workspace, so scans, filters and index maintenance
+only pay for that workspace's mappings, and a write (or a bulk import) only
+changes that workspace's version and invalidates the caches derived from it.
+The reference data (tables, columns and releases) is shared by all workspaces.
+"""
+import gc
+import sys
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from backend.cache.chunked_dict import ChunkedDict
+from backend.cache.hash_index import HashIndex
+from backend.cache.mapping_stats import MappingStats
+from backend.cache.memory import structure_usage
+from backend.cache.shared_store import SharedStore
+from backend.cache.snapshot import FrozenList
+from backend.cache.sort_index import SortIndex
+
+# Change log entries allowed beyond twice the compacted size before compacting again
+CHANGE_LOG_SLACK = 1000
+
+# Changes kept in a shared store for replicas that fall behind
+SHARED_CHANGE_RETENTION = 10000
+
+# Callback run after every mapping write with (workspace name, version,
+# [(old mapping, new mapping), ...]); old is None for creates and new is None for deletes
+ChangeListener = Callable[[str, int, List[Tuple[Optional[Dict], Optional[Dict]]]], None]
+
+@contextmanager
+def gc_paused():
+    """
+    Pause the cyclic garbage collector during a bulk write.
+
+    Bulk writes allocate many dicts and tuples, which would otherwise trigger
+    repeated collections that scan the whole (large, long-lived) cache.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def _next_row_version(mapping: Dict) -> int:
+    """Get the version of a mapping after its next update; rows saved before versioning count as version 1."""
+    return mapping.get("version", 1) + 1
+
+class Workspace:
+    """
+    The mappings of one workspace with their indexes, counters and change log.
+
+    Mapping rows are never modified in place; writers replace them. The rows by
+    ID are copy-on-write: once a reader holds them, the next writer copies them
+    first. Mapping IDs and the mappings version are counted per workspace.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sort_indexes: Dict[str, SortIndex],
+        hash_indexes: Dict[str, HashIndex],
+        change_listeners: List[ChangeListener],
+        sort_keys_version: Callable[[], Hashable],
+    ):
+        """
+        Args:
+            name (str): The workspace name.
+            sort_indexes (Dict[str, SortIndex]): Empty sort indexes by field.
+            hash_indexes (Dict[str, HashIndex]): Empty hash indexes by field.
+            change_listeners (List[ChangeListener]): Callbacks to notify of writes.
+            sort_keys_version (Callable[[], Hashable]): Version of the reference
+                data the sort keys read; the sort indexes are rebuilt before their
+                next use when it changes.
+        """
+        self.name = name
+        # Mapping rows by ID (insertion order is ID order), copy-on-write per chunk of IDs
+        self.mappings_cache = ChunkedDict()
+        self.mapping_id_counter = 1
+        # Bumped on every write so derived caches know when they are stale
+        self.mappings_version = 0
+        # (mappings version, mapping ID) per write; compaction keeps only the
+        # latest entry per mapping, so deletes stay as tombstones
+        self.change_log: List[Tuple[int, int]] = []
+        self._compacted_change_log_size = 0
+        self.change_listeners = change_listeners
+        # Store shared with other worker processes, if configured (see configure_shared_store)
+        self.shared_store: Optional[SharedStore] = None
+        # True while change listeners are told of writes replayed from other processes
+        self.replaying = False
+        # Serializes writes (and sync) between threads of this process
+        self.lock = threading.RLock()
+        self._write_depth = 0
+        self.sort_indexes = sort_indexes
+        self.hash_indexes = hash_indexes
+        # Coverage and status counters per target table and release
+        self.mapping_stats = MappingStats()
+        self._sort_keys_version = sort_keys_version
+        self._sorted_at = sort_keys_version()
+        # Immutable snapshot handed to readers, built at most once per mappings version
+        self._mappings_snapshot: Tuple[Optional[int], FrozenList] = (None, FrozenList())
+
+    def bump_mappings_version(self) -> int:
+        """Mark the mappings as changed and return the new version."""
+        self.mappings_version += 1
+        return self.mappings_version
+
+    def _record_change(self, mapping_id: int, old: Optional[Dict], new: Optional[Dict]) -> int:
+        """Bump the mappings version, log the change to a mapping and notify listeners."""
+        return self._record_changes([(mapping_id, old, new)])
+
+    def _record_changes(
+        self, changes: List[Tuple[int, Optional[Dict], Optional[Dict]]], version: Optional[int] = None
+    ) -> int:
+        """
+        Log a batch of (mapping ID, old, new) changes under a single new mappings version.
+
+        Args:
+            version (Optional[int]): The version to record the changes under, for
+                changes replayed from the shared store. Defaults to the next version.
+        """
+        if version is None:
+            version = self.bump_mappings_version()
+        else:
+            self.mappings_version = version
+        self.change_log.extend((version, mapping_id) for mapping_id, _, _ in changes)
+        if len(self.change_log) > 2 * self._compacted_change_log_size + CHANGE_LOG_SLACK:
+            self.compact_change_log()
+        pairs = [(old, new) for _, old, new in changes]
+        for listener in self.change_listeners:
+            listener(self.name, version, pairs)
+        return version
+
+    @contextmanager
+    def write_transaction(self):
+        """
+        Run a read-validate-write sequence without interleaving writes.
+
+        Holds the write lock and, with a shared store, an exclusive write
+        transaction on it after catching up with other processes. Re-entrant;
+        only the outermost call opens the shared transaction.
+        """
+        with self.lock:
+            outermost = self._write_depth == 0
+            self._write_depth += 1
+            try:
+                if outermost:
+                    self._refresh_sort_indexes()
+                if outermost and self.shared_store is not None:
+                    synced_version = None
+                    try:
+                        with self.shared_store.transaction():
+                            self.sync()
+                            synced_version = self.mappings_version
+                            yield
+                    except BaseException:
+                        if synced_version is not None and self.mappings_version != synced_version:
+                            self._undo_rolled_back_writes(synced_version)
+                        raise
+                else:
+                    yield
+            finally:
+                self._write_depth -= 1
+
+    def _writable_mappings(self) -> ChunkedDict:
+        """Get the mappings by ID for modification; a write copies only the chunk it changes if a reader holds it."""
+        return self.mappings_cache
+
+    def _share_mappings(self) -> ChunkedDict:
+        """Get the current mappings by ID without copying them; later writes leave them untouched."""
+        return self.mappings_cache.snapshot()
+
+    def _persist(self, changes: Dict[int, Optional[Dict]]) -> None:
+        """Write changes to the shared store, if any, under the next mappings version."""
+        if self.shared_store is None:
+            return
+        version = self.shared_store.write_changes(changes, self.mappings_version + 1)
+        if version % 1000 == 0:
+            self.shared_store.compact(SHARED_CHANGE_RETENTION)
+
+    def _apply_rows(self, rows: Dict[int, Optional[Dict]], version: int, replayed: bool = True) -> None:
+        """
+        Apply mapping rows read from the shared store (None for deleted) under a version.
+
+        Args:
+            replayed (bool): Whether the rows were written by another process,
+                as opposed to restored after a local write was rolled back.
+        """
+        self._refresh_sort_indexes()
+        changes = []
+        for mapping_id, row in rows.items():
+            old = self.mappings_cache.get(mapping_id)
+            if old == row:
+                continue
+            if row is None:
+                del self._writable_mappings()[mapping_id]
+                for index in self._indexes():
+                    index.remove(mapping_id)
+            else:
+                self._writable_mappings()[mapping_id] = row
+                for index in self._indexes():
+                    if old is None:
+                        index.add(row)
+                    else:
+                        index.update(row)
+            changes.append((mapping_id, old, row))
+        if changes:
+            self.replaying = replayed
+            try:
+                self._record_changes(changes, version)
+            finally:
+                self.replaying = False
+        else:
+            self.mappings_version = version
+
+    def _undo_rolled_back_writes(self, synced_version: int) -> None:
+        """
+        Drop local writes whose shared transaction was rolled back.
+
+        Local versions have already moved past the shared one, so the restored
+        rows are written back under a new version to keep versions increasing
+        for version-keyed caches.
+        """
+        start = bisect_right(self.change_log, (synced_version, float("inf")))
+        mapping_ids = {mapping_id for _, mapping_id in self.change_log[start:]}
+        version = self.mappings_version + 1
+        with self.shared_store.transaction():
+            rows = self.shared_store.read_rows(mapping_ids)
+            restored = {mapping_id: rows.get(mapping_id) for mapping_id in mapping_ids}
+            self.shared_store.write_changes(restored, version)
+        self._apply_rows(restored, version, replayed=False)
+
+    def _reload_from_shared_store(self) -> None:
+        """Replace the local mappings with the shared store's, as one change."""
+        version, self.mapping_id_counter, rows = self.shared_store.load_all()
+        current = {row["id"]: row for row in rows}
+        current.update({mapping_id: None for mapping_id in self.mappings_cache if mapping_id not in current})
+        with gc_paused():
+            self._apply_rows(current, version)
+
+    def sync(self, blocking: bool = True) -> bool:
+        """
+        Catch up with mapping writes committed to the shared store by other processes.
+
+        Checking for new writes is a single PRAGMA on a local connection, so this
+        is cheap enough to call before every request.
+
+        Args:
+            blocking (bool): Wait for a write in progress in this process instead
+                of returning (that write catches up by itself).
+
+        Returns:
+            bool: True if any writes were applied.
+        """
+        if self.shared_store is None or not self.shared_store.changed_externally():
+            return False
+        if not self.lock.acquire(blocking):
+            self.shared_store.forget_changes_seen()
+            return False
+        try:
+            shared_version = self.shared_store.version()
+            if shared_version == self.mappings_version:
+                return False
+            oldest = self.shared_store.oldest_change_version()
+            if oldest is None or oldest > self.mappings_version + 1:
+                # Changes this replica missed have been compacted away
+                self._reload_from_shared_store()
+                return True
+            for version, rows in self.shared_store.read_changes_since(self.mappings_version):
+                self._apply_rows(rows, version)
+            return True
+        finally:
+            self.lock.release()
+
+    def configure_shared_store(self, path: Optional[str]) -> None:
+        """
+        Share the mappings with other worker processes through a SQLite file.
+
+        The first process to use the file seeds it with the local mappings; later
+        ones replace their local mappings with the shared ones.
+
+        Args:
+            path (Optional[str]): The SQLite database file, created if needed, or
+                None to stop sharing.
+        """
+        if path is None:
+            with self.lock:
+                self.shared_store = None
+            return
+        store = SharedStore(path)
+        with self.lock:
+            with store.transaction():
+                if store.version() == 0 and self.mappings_cache:
+                    store.allocate_mapping_ids(self.mapping_id_counter - 1)
+                    store.write_changes(dict(self.mappings_cache), self.mappings_version)
+            self.shared_store = store
+            self._reload_from_shared_store()
+            store.changed_externally()
+
+    def compact_change_log(self) -> None:
+        """Drop superseded change log entries, keeping the latest one per mapping."""
+        latest = {mapping_id: version for version, mapping_id in self.change_log}
+        self.change_log = sorted((version, mapping_id) for mapping_id, version in latest.items())
+        self._compacted_change_log_size = len(self.change_log)
+
+    def get_changes_since(self, version: int) -> Tuple[int, Optional[int], List[Dict], List[int]]:
+        """
+        Get the mappings changed after a mappings version. A version newer than
+        the current one (e.g. from before a restart) gets all mappings instead.
+
+        Returns:
+            Tuple[int, Optional[int], List[Dict], List[int]]: The current version,
+            the version the changes are relative to or None for all mappings,
+            the created or updated mappings, and the IDs of deleted mappings.
+        """
+        with self.lock:
+            current_version, rows_by_id = self.mappings_version, self._share_mappings()
+            if version > current_version:
+                return current_version, None, list(rows_by_id.values()), []
+            start = bisect_right(self.change_log, (version, float("inf")))
+            changed_ids = dict.fromkeys(mapping_id for _, mapping_id in self.change_log[start:])
+        upserts = [rows_by_id[i] for i in changed_ids if i in rows_by_id]
+        deleted_ids = [i for i in changed_ids if i not in rows_by_id]
+        return current_version, version, upserts, deleted_ids
+
+    def _refresh_sort_indexes(self) -> None:
+        """
+        Rebuild the sort indexes if the reference data their keys read has changed.
+
+        Called with the lock held and before, never between, changing the
+        mappings and maintaining the indexes.
+        """
+        version = self._sort_keys_version()
+        if version != self._sorted_at:
+            for index in self.sort_indexes.values():
+                index.rebuild(self.mappings_cache.values())
+            self._sorted_at = version
+
+    def _indexes(self, changed_fields: Optional[set] = None) -> List:
+        """
+        Get the indexes that must be maintained on mapping writes.
+
+        Args:
+            changed_fields (Optional[set]): If given, only indexes whose key
+                depends on one of these fields are returned.
+        """
+        indexes = [*self.sort_indexes.values(), *self.hash_indexes.values(), self.mapping_stats]
+        if changed_fields is None:
+            return indexes
+        return [index for index in indexes if index.fields & changed_fields]
+
+    def get_next_mapping_id(self) -> int:
+        """Get the next available mapping ID."""
+        return self._allocate_mapping_ids(1)
+
+    def _allocate_mapping_ids(self, count: int) -> int:
+        """Reserve a block of consecutive mapping IDs and return the first one."""
+        with self.write_transaction():
+            if self.shared_store is not None:
+                self.mapping_id_counter = self.shared_store.allocate_mapping_ids(count)
+            first_id = self.mapping_id_counter
+            self.mapping_id_counter += count
+        return first_id
+
+    def add_mapping(self, mapping_data: Dict) -> Dict:
+        """Add a new mapping."""
+        with self.write_transaction():
+            mapping = mapping_data.copy()
+            mapping["id"] = self.get_next_mapping_id()
+            mapping["version"] = 1
+            mapping["created_at"] = datetime.now().isoformat()
+            mapping["updated_at"] = mapping["created_at"]
+            self._persist({mapping["id"]: mapping})
+            self._writable_mappings()[mapping["id"]] = mapping
+            for index in self._indexes():
+                index.add(mapping)
+            self._record_change(mapping["id"], None, mapping)
+        return mapping
+
+    def add_mappings(self, mappings_data: List[Dict]) -> List[Dict]:
+        """
+        Add many mappings as one change.
+
+        The mappings get consecutive IDs and share one created_at timestamp,
+        one mappings version and one shared store write, and the indexes are
+        maintained in bulk.
+
+        Args:
+            mappings_data (List[Dict]): The data of each new mapping.
+
+        Returns:
+            List[Dict]: The added mappings, in input order.
+        """
+        if not mappings_data:
+            return []
+        created_at = datetime.now().isoformat()
+        with self.write_transaction(), gc_paused():
+            first_id = self._allocate_mapping_ids(len(mappings_data))
+            mappings = [
+                {**mapping_data, "id": first_id + offset, "version": 1, "created_at": created_at, "updated_at": created_at}
+                for offset, mapping_data in enumerate(mappings_data)
+            ]
+            self._persist({mapping["id"]: mapping for mapping in mappings})
+            rows_by_id = self._writable_mappings()
+            for mapping in mappings:
+                rows_by_id[mapping["id"]] = mapping
+            # update_many adds mappings the indexes do not have yet
+            for index in self._indexes():
+                index.update_many(mappings)
+            self._record_changes([(mapping["id"], None, mapping) for mapping in mappings])
+        return mappings
+
+    def get_mapping(self, mapping_id: int) -> Optional[Dict]:
+        """Get a mapping by ID."""
+        return self.mappings_cache.get(mapping_id)
+
+    def update_mapping(self, mapping_id: int, mapping_data: Dict) -> Optional[Dict]:
+        """Update an existing mapping and increment its version."""
+        with self.write_transaction():
+            mapping = self.mappings_cache.get(mapping_id)
+            if mapping is None:
+                return None
+            updated_mapping = {**mapping, **mapping_data}
+            updated_mapping["version"] = _next_row_version(mapping)
+            updated_mapping["updated_at"] = datetime.now().isoformat()
+            self._persist({mapping_id: updated_mapping})
+            self._writable_mappings()[mapping_id] = updated_mapping
+            for index in self._indexes(set(mapping_data) | {"updated_at"}):
+                index.update(updated_mapping)
+            self._record_change(mapping_id, mapping, updated_mapping)
+        return updated_mapping
+
+    def update_mappings(self, updates: Dict[int, Dict]) -> List[Dict]:
+        """
+        Update many mappings as one change.
+
+        All updates share one updated_at timestamp and one mappings version, and
+        the indexes are maintained in bulk. The version of each updated mapping
+        is incremented. Unknown IDs are ignored.
+
+        Args:
+            updates (Dict[int, Dict]): The fields to set, by mapping ID.
+
+        Returns:
+            List[Dict]: The updated mappings.
+        """
+        updated_at = datetime.now().isoformat()
+        with self.write_transaction(), gc_paused():
+            changes = []
+            for mapping_id, mapping_data in updates.items():
+                mapping = self.mappings_cache.get(mapping_id)
+                if mapping is None:
+                    continue
+                changes.append((mapping_id, mapping, {
+                    **mapping, **mapping_data, "version": _next_row_version(mapping), "updated_at": updated_at,
+                }))
+            if not changes:
+                return []
+
+            self._persist({mapping_id: new for mapping_id, _, new in changes})
+            rows_by_id = self._writable_mappings()
+            for mapping_id, _, new in changes:
+                rows_by_id[mapping_id] = new
+            updated_mappings = [new for _, _, new in changes]
+            changed_fields = {"updated_at"}.union(*(updates[mapping_id] for mapping_id, _, _ in changes))
+            for index in self._indexes(changed_fields):
+                index.update_many(updated_mappings)
+            self._record_changes(changes)
+        return updated_mappings
+
+    def delete_mapping(self, mapping_id: int) -> bool:
+        """Delete a mapping by ID."""
+        with self.write_transaction():
+            if mapping_id not in self.mappings_cache:
+                return False
+            self._persist({mapping_id: None})
+            mapping = self._writable_mappings().pop(mapping_id)
+            for index in self._indexes():
+                index.remove(mapping_id)
+            self._record_change(mapping_id, mapping, None)
+        return True
+
+    def get_all_mappings(self) -> List[Dict]:
+        """
+        Get an immutable snapshot of all mappings.
+
+        The snapshot is built once per mappings version and then shared, so reads
+        cost nothing until the next write. Writers never modify a snapshot, and
+        building one does not block them.
+        """
+        version, rows = self._mappings_snapshot
+        if version != self.mappings_version:
+            with self.lock:
+                version, rows_by_id = self.mappings_version, self._share_mappings()
+            rows = FrozenList(rows_by_id.values())
+            self._mappings_snapshot = (version, rows)
+        return rows
+
+    def get_mappings(self, mapping_ids: Iterable[int]) -> Tuple[List[Dict], List[int]]:
+        """
+        Get mappings by ID, all read at once.
+
+        Returns:
+            Tuple[List[Dict], List[int]]: The mappings found and the IDs not found,
+            each in the order requested.
+        """
+        with self.lock:
+            rows = [(mapping_id, self.mappings_cache.get(mapping_id)) for mapping_id in mapping_ids]
+        return [row for _, row in rows if row is not None], [mapping_id for mapping_id, row in rows if row is None]
+
+    def get_mappings_by_index(self, index_name: str, key) -> List[Dict]:
+        """
+        Get the mappings with a field value through a hash index, in ID order.
+
+        Raises:
+            ValueError: If there is no hash index for the field.
+        """
+        if index_name not in self.hash_indexes:
+            raise ValueError(f"No index on field: {index_name}")
+        with self.lock:
+            return [self.mappings_cache[i] for i in sorted(self.hash_indexes[index_name].get(key))]
+
+    def group_mapping_ids(
+        self, groupings: Sequence[Tuple[str, Callable[[Hashable], Hashable]]]
+    ) -> List[Dict[Hashable, Set[int]]]:
+        """
+        Group the mapping IDs of hash indexes by a function of their keys.
+
+        Each grouping merges the ID sets of all keys of an index that map to the
+        same group, so the work per mapping is done by set unions rather than a
+        loop over mappings. All groupings are read at once, consistently with
+        each other.
+
+        Args:
+            groupings: (index name, key -> group) pairs.
+
+        Returns:
+            List[Dict[Hashable, Set[int]]]: The mapping IDs by group, per grouping.
+
+        Raises:
+            ValueError: If there is no hash index for a field.
+        """
+        for index_name, _ in groupings:
+            if index_name not in self.hash_indexes:
+                raise ValueError(f"No index on field: {index_name}")
+        results = []
+        with self.lock:
+            for index_name, group_of in groupings:
+                groups: Dict[Hashable, Set[int]] = {}
+                for key, ids in self.hash_indexes[index_name].items():
+                    group = group_of(key)
+                    if group in groups:
+                        groups[group] |= ids
+                    else:
+                        groups[group] = set(ids)
+                results.append(groups)
+        return results
+
+    def get_mapping_stats(self) -> Tuple[int, Dict]:
+        """
+        Get the coverage and status counters of every (scope, target table ID) group.
+
+        Returns:
+            Tuple[int, Dict]: The mappings version and the counters, as returned
+            by MappingStats.groups().
+        """
+        with self.lock:
+            return self.mappings_version, self.mapping_stats.groups()
+
+    def memory_usage(self) -> Dict:
+        """
+        Estimate the memory held by the mappings and the structures derived from them.
+
+        The rows are counted with the mappings; the snapshot, indexes, counters
+        and change log are counted for what they add on top of the rows. Large
+        structures are measured on samples, so this holds the lock only briefly.
+
+        Returns:
+            Dict: The workspace name, the entries and bytes of each structure and
+            the total bytes.
+        """
+        with self.lock:
+            snapshot = self._mappings_snapshot[1]
+            usage = {
+                "name": self.name,
+                "mappings": {"entries": len(self.mappings_cache), "bytes": self.mappings_cache.approximate_bytes()},
+                "snapshot": {"entries": len(snapshot), "bytes": sys.getsizeof(snapshot)},
+                "change_log": structure_usage(self.change_log, len(self.change_log), shared_leaves=True),
+                "mapping_stats": structure_usage(self.mapping_stats, len(self.mapping_stats), shared_leaves=True),
+                "sort_indexes": {
+                    name: {"entries": len(index), "bytes": index.approximate_bytes()}
+                    for name, index in self.sort_indexes.items()
+                },
+                "hash_indexes": {
+                    name: {"entries": len(index), "bytes": index.approximate_bytes()}
+                    for name, index in self.hash_indexes.items()
+                },
+            }
+        usage["total_bytes"] = (
+            sum(usage[name]["bytes"] for name in ("mappings", "snapshot", "change_log", "mapping_stats"))
+            + sum(index["bytes"] for index in usage["sort_indexes"].values())
+            + sum(index["bytes"] for index in usage["hash_indexes"].values())
+        )
+        return usage
+
+    def iter_sorted_mappings(self, sort_field: str, descending: bool = False) -> Iterator[Dict]:
+        """
+        Iterate over mappings in the order of a maintained sort index.
+
+        The iteration sees the mappings as of its start, however long it takes
+        and whatever is written meanwhile.
+
+        Raises:
+            ValueError: If there is no sort index for the field.
+        """
+        if sort_field not in self.sort_indexes:
+            raise ValueError(f"Cannot sort by field: {sort_field}")
+        with self.lock:
+            self._refresh_sort_indexes()
+            rows_by_id = self._share_mappings()
+            entries = self.sort_indexes[sort_field].snapshot()
+        for entry in (reversed(entries) if descending else entries):
+            yield rows_by_id[entry[2]]
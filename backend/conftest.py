@@ -5,4 +5,9 @@ import os
 import sys
 
 # Add the project root directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.service import audit_service
+
+# Keep the audit log of the tests in memory rather than in the source tree
+audit_service.configure_audit_log(None) 
\ No newline at end of file
@@ -1,8 +1,22 @@
 """
 Main entry point for the STTM application.
+
+Set STTM_WORKERS to run several worker processes. They share their mappings and
+reference data through the SQLite file in STTM_SHARED_DB (default:
+backend/database/sttm_shared.db) and the files next to it.
 """
+import os
+
 import uvicorn
 from backend.api.app import app
 
+DEFAULT_SHARED_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "sttm_shared.db")
+
 if __name__ == "__main__":
-    uvicorn.run("backend.api.app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    workers = int(os.environ.get("STTM_WORKERS", "1"))
+    if workers > 1:
+        # Workers inherit the environment, so they all open the same shared store
+        os.environ.setdefault("STTM_SHARED_DB", DEFAULT_SHARED_DB)
+        uvicorn.run("backend.api.app:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run("backend.api.app:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,82 @@
+"""
+Async service interface for the STTM application.
+This module exposes the service layer to async callers such as the API routers.
+
+Calls that can block (writes, which take the write lock and may wait on the
+shared store, reads that scan or take the lock, and every call once the ORM
+backend is used) run on the executor in backend.service.executor. Cheap
+lookups in the in-memory cache run inline, since handing them to a thread
+would cost more than the lookup itself.
+"""
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from backend.service import (
+    audit_service, catalog_service, compatibility_service, lineage_service, mapping_service, memory_service,
+    workspace_service
+)
+from backend.service.executor import run_blocking
+
+def _offloaded(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a blocking service call so that it runs on the executor."""
+    @wraps(func)
+    async def call(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return call
+
+def _inline_in_memory(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a service call that is a cheap lookup in the in-memory cache."""
+    @wraps(func)
+    async def call(*args, **kwargs):
+        if mapping_service.USE_DUMMY_DATA:
+            return func(*args, **kwargs)
+        return await run_blocking(func, *args, **kwargs)
+    return call
+
+# Reads
+get_mapping = _inline_in_memory(mapping_service.get_mapping)
+get_data_versions = _inline_in_memory(mapping_service.get_data_versions)
+get_source_tables = _inline_in_memory(mapping_service.get_source_tables)
+get_source_columns = _inline_in_memory(mapping_service.get_source_columns)
+get_target_tables = _inline_in_memory(mapping_service.get_target_tables)
+get_target_columns = _inline_in_memory(mapping_service.get_target_columns)
+get_releases = _inline_in_memory(mapping_service.get_releases)
+get_catalog = _inline_in_memory(mapping_service.get_catalog)
+get_enriched_mappings = _offloaded(mapping_service.get_enriched_mappings)
+get_mappings_by_ids = _offloaded(mapping_service.get_mappings_by_ids)
+get_mappings_page = _offloaded(mapping_service.get_mappings_page)
+get_mapping_changes = _offloaded(mapping_service.get_mapping_changes)
+get_column_impact = _offloaded(mapping_service.get_column_impact)
+get_mapping_stats = _offloaded(mapping_service.get_mapping_stats)
+get_lineage = _offloaded(lineage_service.get_lineage)
+get_type_compatibility_report = _offloaded(compatibility_service.get_type_compatibility_report)
+get_workspaces = _offloaded(workspace_service.get_workspaces)
+get_memory_report = _offloaded(memory_service.get_memory_report)
+get_audit_entries = _offloaded(audit_service.get_audit_entries)
+
+# Writes
+create_mapping = _offloaded(mapping_service.create_mapping)
+create_mappings = _offloaded(mapping_service.create_mappings)
+update_mapping = _offloaded(mapping_service.update_mapping)
+patch_mappings = _offloaded(mapping_service.patch_mappings)
+delete_mapping = _offloaded(mapping_service.delete_mapping)
+promote_release = _offloaded(mapping_service.promote_release)
+ingest_sqlite_catalog = _offloaded(catalog_service.ingest_sqlite_catalog)
+create_workspace = _offloaded(workspace_service.create_workspace)
+set_tracemalloc = _offloaded(memory_service.set_tracemalloc)
+maintain_audit_log = _offloaded(audit_service.maintain)
+
+async def sync_shared_state(all_workspaces: bool = False) -> bool:
+    """
+    Catch up with mapping writes made by other worker processes.
+
+    Args:
+        all_workspaces (bool): Sync every workspace open in this process instead
+            of only the current one.
+
+    Returns:
+        bool: True if any writes were applied.
+    """
+    if not mapping_service.is_store_shared():
+        return False
+    return await run_blocking(mapping_service.sync_shared_state, all_workspaces)
@@ -0,0 +1,126 @@
+"""
+Audit service module for the STTM application.
+This module records who changed which mapping, when and how, and answers
+queries over that history (see backend.cache.audit_log for the storage).
+
+Every mapping write made by this process is logged, in every workspace. Writes
+replayed from other worker processes are logged by the process that made them.
+The user is taken from the X-User header of the request that made the write.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from backend.cache import dummy_data
+from backend.cache.audit_log import AuditLog, make_entry
+from backend.service import mapping_service
+
+# Directory of the audit log segments
+AUDIT_LOG_DIR = os.environ.get(
+    "STTM_AUDIT_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "audit")
+)
+
+# User the writes of the current request are attributed to
+_current_user: ContextVar[Optional[str]] = ContextVar("sttm_user", default=None)
+
+_log = AuditLog(AUDIT_LOG_DIR)
+
+@contextmanager
+def use_user(user: Optional[str]):
+    """
+    Attribute the mapping writes made within this context to a user.
+
+    Args:
+        user (Optional[str]): The user name, or None if unknown.
+    """
+    token = _current_user.set(user)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+def configure_audit_log(directory: Optional[str]) -> None:
+    """
+    Store the audit log in another directory. Changes not yet sealed are sealed
+    into the previous directory first.
+
+    Args:
+        directory (Optional[str]): The directory of the segments, or None to keep
+            them in memory (e.g. for tests).
+    """
+    global _log
+    previous, _log = _log, AuditLog(directory)
+    previous.flush()
+
+def _on_mapping_changes(workspace: str, version: int, changes: List[Tuple[Optional[Dict], Optional[Dict]]]) -> None:
+    """Log the mapping writes of this process."""
+    if dummy_data.workspace(workspace).replaying:
+        return
+    timestamp = time.time()
+    user = _current_user.get()
+    _log.append([make_entry(timestamp, workspace, version, old, new, user) for old, new in changes])
+
+if mapping_service.USE_DUMMY_DATA:
+    dummy_data.change_listeners.append(_on_mapping_changes)
+
+def _formatted(entry: Dict) -> Dict:
+    """Format the timestamp of an audit entry like the other timestamps of the API."""
+    return {**entry, "timestamp": datetime.fromtimestamp(entry["timestamp"] / 1_000_000).isoformat()}
+
+def get_audit_entries(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    mapping_id: Optional[int] = None,
+    user: Optional[str] = None,
+    release_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[Dict]:
+    """
+    Get the newest mapping changes of the current workspace matching all given filters.
+
+    Args:
+        start (Optional[datetime]): Only changes at or after this time.
+        end (Optional[datetime]): Only changes at or before this time.
+        mapping_id (Optional[int]): Only changes to this mapping.
+        user (Optional[str]): Only changes by this user.
+        release_id (Optional[int]): Only changes to mappings of this release
+            (the release after the change).
+        limit (int): The maximum number of changes.
+
+    Returns:
+        List[Dict]: The changes, newest first, each with its "timestamp",
+        "mapping_id", mappings "version", "action", "user", "release_id" and
+        "changes" as {field: [old value, new value]}.
+    """
+    entries = _log.query(
+        start=start,
+        end=end,
+        mapping_id=mapping_id,
+        user=user,
+        release_id=release_id,
+        workspace=mapping_service.current_workspace(),
+        limit=limit,
+    )
+    return [_formatted(entry) for entry in entries]
+
+def maintain(force: bool = False) -> Dict:
+    """
+    Seal buffered changes older than the flush interval and compact old segments.
+
+    Args:
+        force (bool): Seal all buffered changes.
+
+    Returns:
+        Dict: The number of segments, of sealed and buffered changes, and of
+        bytes on disk, after maintenance.
+    """
+    _log.flush(force=force)
+    _log.compact()
+    return _log.stats()
+
+def get_memory_usage() -> Dict[str, int]:
+    """Estimate the memory held by buffered changes and decoded segments, as entries and approximate bytes."""
+    return _log.memory_usage()
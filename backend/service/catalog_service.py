@@ -0,0 +1,281 @@
+"""
+Catalog service module for the STTM application.
+This module keeps the source and target catalogs aligned with real database structure.
+
+Ingestion reads a database's whole structure in one query, hashes each table's
+columns and types, and applies only the tables whose hash differs from the
+catalog's. A re-sync of an unchanged database writes nothing.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from backend.cache import dummy_data
+from backend.cache.memory import structure_usage
+from backend.service import mapping_service
+
+# Directory that databases named in ingestion requests are resolved in
+CATALOG_DATABASE_DIR = os.environ.get(
+    "STTM_CATALOG_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database")
+)
+
+# Columns and structure hash of the tables of each introspected database, by
+# CREATE statement
+_introspected_tables: Dict[str, Dict[str, Tuple[List[Tuple[str, str]], str]]] = {}
+
+# Structure hashes of the catalog tables by side: (catalog section versions
+# they were computed at, lowercase table name -> hash)
+_structure_hashes: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+def resolve_catalog_database(database: str) -> str:
+    """
+    Get the path of a database in the catalog database directory.
+
+    Args:
+        database (str): The database file name.
+
+    Returns:
+        str: The database path.
+
+    Raises:
+        ValueError: If the name is not a plain file name.
+        FileNotFoundError: If the database does not exist.
+    """
+    if not database or os.path.basename(database) != database or database in (".", ".."):
+        raise ValueError(f"Invalid database name: {database}")
+    path = os.path.join(CATALOG_DATABASE_DIR, database)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Database {database} not found")
+    return path
+
+def introspect_sqlite(path: str) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Read the tables and columns of a SQLite database.
+
+    Args:
+        path (str): The database file, opened read-only.
+
+    Returns:
+        Dict[str, List[Tuple[str, str]]]: (column name, data type) pairs by table
+        name, in column order.
+    """
+    return {name: columns for name, (columns, _) in _read_structure(path).items()}
+
+def _read_structure(path: str) -> Dict[str, Tuple[List[Tuple[str, str]], str]]:
+    """
+    Read the columns and structure hash of each table of a SQLite database.
+
+    The CREATE statements of all tables are read in one query. Columns are
+    read with pragma_table_info, in one query, and hashed only for tables whose
+    statement differs from the last read of the same database; SQLite rewrites
+    the statement on every ALTER TABLE, so the others are unchanged.
+    """
+    known = _introspected_tables.get(path, {})
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        statements = connection.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+        unknown = [name for name, sql in statements if sql not in known]
+        rows = connection.execute(
+            """
+            SELECT m.value, p.name, p.type
+            FROM json_each(?) AS m JOIN pragma_table_info(m.value) AS p
+            ORDER BY m.value, p.cid
+            """,
+            (json.dumps(unknown),),
+        ).fetchall() if unknown else []
+    finally:
+        connection.close()
+
+    read: Dict[str, List[Tuple[str, str]]] = {}
+    for table_name, column_name, data_type in rows:
+        read.setdefault(table_name, []).append((column_name, _normalize_type(data_type)))
+
+    tables: Dict[str, Tuple[List[Tuple[str, str]], str]] = {}
+    structures: Dict[str, Tuple[List[Tuple[str, str]], str]] = {}
+    for table_name, sql in statements:
+        if sql in known:
+            structure = known[sql]
+        else:
+            columns = read.get(table_name, [])
+            structure = (columns, structure_hash(columns))
+        tables[table_name] = structures[sql] = structure
+    _introspected_tables[path] = structures
+    return tables
+
+def _normalize_type(data_type: Optional[str]) -> str:
+    """Normalize a declared column type, e.g. 'varchar( 255 )' -> 'VARCHAR(255)'."""
+    return "".join((data_type or "").upper().split())
+
+def structure_hash(columns: List[Tuple[str, str]]) -> str:
+    """
+    Hash a table's structure: its column names and types, in any order.
+
+    Args:
+        columns (List[Tuple[str, str]]): (column name, data type) pairs.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha1()
+    for name, data_type in sorted((name.lower(), data_type) for name, data_type in columns):
+        digest.update(f"{name}\t{data_type}\n".encode())
+    return digest.hexdigest()
+
+def _catalog_columns(side: str) -> Dict[int, List[Dict]]:
+    """Group a side's catalog columns by table ID."""
+    columns_by_table: Dict[int, List[Dict]] = {}
+    for column in dummy_data.get_reference_rows(f"{side}_columns"):
+        columns_by_table.setdefault(column["table_id"], []).append(column)
+    return columns_by_table
+
+def _catalog_hashes(side: str, tables: List[Dict]) -> Dict[str, str]:
+    """Get the structure hash of each catalog table, recomputing only after outside changes."""
+    section_versions = (
+        dummy_data.catalog_section_versions[f"{side}_tables"],
+        dummy_data.catalog_section_versions[f"{side}_columns"],
+    )
+    cached = _structure_hashes.get(side)
+    if cached is not None and cached[0] == section_versions:
+        return cached[1]
+    columns_by_table = _catalog_columns(side)
+    hashes = {
+        table["name"].lower(): structure_hash(
+            [(c["name"], c["data_type"]) for c in columns_by_table.get(table["id"], [])]
+        )
+        for table in tables
+    }
+    _structure_hashes[side] = (section_versions, hashes)
+    return hashes
+
+def get_memory_usage() -> Dict[str, int]:
+    """
+    Estimate the memory held by the introspection memo and the catalog structure hashes.
+
+    Returns:
+        Dict[str, int]: The number of memoized table structures and the approximate bytes.
+    """
+    memos = [_introspected_tables, _structure_hashes]
+    return structure_usage(memos, sum(len(tables) for tables in _introspected_tables.values()))
+
+def ingest_sqlite_catalog(side: str, path: str) -> Dict:
+    """
+    Align one side of the catalog with the structure of a SQLite database.
+
+    Tables are matched by name (case-insensitively) and only tables whose
+    structure hash changed are diffed column by column. Unchanged tables and
+    columns keep their rows and IDs, so their mappings are unaffected. Mappings
+    of dropped columns are kept, and those of the current workspace are
+    reported as orphaned.
+
+    Args:
+        side (str): "source" or "target".
+        path (str): The SQLite database file.
+
+    Returns:
+        Dict: Counts of the tables scanned, added, dropped and changed and of the
+        columns added, dropped and retyped, the orphaned mapping IDs and the
+        catalog version.
+
+    Raises:
+        ValueError: If the side is invalid.
+    """
+    if side not in ("source", "target"):
+        raise ValueError(f"Invalid side: {side}")
+    database_tables = _read_structure(path)
+    
+    if mapping_service.USE_DUMMY_DATA:
+        with dummy_data.catalog_transaction():
+            return _apply_structure(side, database_tables)
+    else:
+        # TODO: Implement ORM-based ingestion
+        raise NotImplementedError("ORM-based ingestion not implemented yet")
+
+def _apply_structure(side: str, database_tables: Dict[str, Tuple[List[Tuple[str, str]], str]]) -> Dict:
+    """Diff one side of the cached catalog against a database's structure and apply the changes."""
+    tables = dummy_data.get_reference_rows(f"{side}_tables")
+    catalog_hashes = _catalog_hashes(side, tables)
+    tables_by_name = {table["name"].lower(): table for table in tables}
+    database_names = {name.lower() for name in database_tables}
+    changed = [
+        (table_name, columns, table_hash)
+        for table_name, (columns, table_hash) in database_tables.items()
+        if catalog_hashes.get(table_name.lower()) != table_hash
+    ]
+    dropped = [table for key, table in tables_by_name.items() if key not in database_names]
+    summary = {
+        "side": side,
+        "tables_scanned": len(database_tables),
+        "tables_added": 0,
+        "tables_dropped": len(dropped),
+        "tables_changed": 0,
+        "columns_added": 0,
+        "columns_dropped": 0,
+        "columns_retyped": 0,
+        "orphaned_mapping_ids": [],
+        "catalog_version": dummy_data.catalog_version,
+    }
+    if not changed and not dropped:
+        return summary
+
+    catalog_hashes = dict(catalog_hashes)
+    columns_by_table = _catalog_columns(side)
+    next_table_id = max((t["id"] for t in tables), default=0) + 1
+    next_column_id = max((c["id"] for cs in columns_by_table.values() for c in cs), default=0) + 1
+    table_upserts: List[Dict] = []
+    column_upserts: List[Dict] = []
+    dropped_column_ids: List[int] = []
+
+    for table_name, columns, table_hash in changed:
+        key = table_name.lower()
+        table = tables_by_name.get(key)
+        if table is None:
+            table = {"id": next_table_id, "name": table_name, "description": ""}
+            next_table_id += 1
+            table_upserts.append(table)
+            summary["tables_added"] += 1
+        else:
+            summary["tables_changed"] += 1
+        catalog_hashes[key] = table_hash
+
+        existing = {c["name"].lower(): c for c in columns_by_table.get(table["id"], [])}
+        for column_name, data_type in columns:
+            column = existing.pop(column_name.lower(), None)
+            if column is None:
+                column_upserts.append({
+                    "id": next_column_id,
+                    "table_id": table["id"],
+                    "name": column_name,
+                    "data_type": data_type,
+                    "description": "",
+                })
+                next_column_id += 1
+                summary["columns_added"] += 1
+            elif column["data_type"] != data_type:
+                column_upserts.append({**column, "data_type": data_type})
+                summary["columns_retyped"] += 1
+        dropped_column_ids.extend(c["id"] for c in existing.values())
+
+    for table in dropped:
+        catalog_hashes.pop(table["name"].lower(), None)
+        dropped_column_ids.extend(c["id"] for c in columns_by_table.get(table["id"], []))
+    summary["columns_dropped"] = len(dropped_column_ids)
+
+    orphaned_ids = set()
+    for column_id in dropped_column_ids:
+        orphaned_ids.update(dummy_data.hash_indexes[f"{side}_column_id"].get(column_id))
+    summary["orphaned_mapping_ids"] = sorted(orphaned_ids)
+
+    dummy_data.apply_reference_changes(f"{side}_tables", table_upserts, [table["id"] for table in dropped])
+    dummy_data.apply_reference_changes(f"{side}_columns", column_upserts, dropped_column_ids)
+    dummy_data.mark_catalog_changed()
+    section_versions = (
+        dummy_data.catalog_section_versions[f"{side}_tables"],
+        dummy_data.catalog_section_versions[f"{side}_columns"],
+    )
+    _structure_hashes[side] = (section_versions, catalog_hashes)
+    summary["catalog_version"] = dummy_data.catalog_version
+    return summary
@@ -0,0 +1,168 @@
+"""
+Type compatibility service module for the STTM application.
+This module checks that the data types of mapped source and target columns are compatible.
+
+Declared types are normalized to a canonical type (e.g. 'varchar(255)' and
+'TEXT' are both VARCHAR), and each source -> target pair of canonical types is
+scored against a compatibility matrix. The report is computed in batch: mapping
+IDs are grouped by canonical type through the column hash indexes, and each type
+pair is counted by intersecting the source and target groups, so no Python code
+runs per mapping.
+"""
+from typing import Dict, Optional, Set
+
+from backend.cache import dummy_data
+from backend.service import mapping_service
+
+# Canonical type of declared base types (without length or precision)
+TYPE_ALIASES = {
+    "INTEGER": "INTEGER", "INT": "INTEGER", "SMALLINT": "INTEGER", "BIGINT": "INTEGER",
+    "TINYINT": "INTEGER", "MEDIUMINT": "INTEGER",
+    "DECIMAL": "DECIMAL", "NUMERIC": "DECIMAL", "NUMBER": "DECIMAL",
+    "FLOAT": "FLOAT", "REAL": "FLOAT", "DOUBLE": "FLOAT", "DOUBLE PRECISION": "FLOAT",
+    "VARCHAR": "VARCHAR", "CHAR": "VARCHAR", "NVARCHAR": "VARCHAR", "NCHAR": "VARCHAR",
+    "TEXT": "VARCHAR", "STRING": "VARCHAR", "CLOB": "VARCHAR", "CHARACTER": "VARCHAR",
+    "CHARACTER VARYING": "VARCHAR",
+    "BOOLEAN": "BOOLEAN", "BOOL": "BOOLEAN",
+    "DATE": "DATE",
+    "TIMESTAMP": "TIMESTAMP", "DATETIME": "TIMESTAMP",
+    "TIME": "TIME",
+    "BLOB": "BINARY", "BINARY": "BINARY", "VARBINARY": "BINARY", "BYTEA": "BINARY",
+}
+
+# Canonical type of columns whose type is not recognized or that are not in the catalog
+UNKNOWN_TYPE = "UNKNOWN"
+
+# Compatibility levels, from best to worst
+LEVELS = ["exact", "safe", "lossy", "incompatible", "unknown"]
+
+# Levels of source -> target pairs of different types; pairs not listed are incompatible
+COMPATIBILITY = {
+    ("INTEGER", "DECIMAL"): "safe",
+    ("INTEGER", "FLOAT"): "safe",
+    ("INTEGER", "VARCHAR"): "safe",
+    ("INTEGER", "BOOLEAN"): "lossy",
+    ("DECIMAL", "INTEGER"): "lossy",
+    ("DECIMAL", "FLOAT"): "lossy",
+    ("DECIMAL", "VARCHAR"): "safe",
+    ("FLOAT", "INTEGER"): "lossy",
+    ("FLOAT", "DECIMAL"): "lossy",
+    ("FLOAT", "VARCHAR"): "safe",
+    ("BOOLEAN", "INTEGER"): "safe",
+    ("BOOLEAN", "DECIMAL"): "safe",
+    ("BOOLEAN", "VARCHAR"): "safe",
+    ("DATE", "TIMESTAMP"): "safe",
+    ("DATE", "VARCHAR"): "safe",
+    ("TIMESTAMP", "DATE"): "lossy",
+    ("TIMESTAMP", "TIME"): "lossy",
+    ("TIMESTAMP", "VARCHAR"): "safe",
+    ("TIME", "VARCHAR"): "safe",
+    ("VARCHAR", "INTEGER"): "lossy",
+    ("VARCHAR", "DECIMAL"): "lossy",
+    ("VARCHAR", "FLOAT"): "lossy",
+    ("VARCHAR", "BOOLEAN"): "lossy",
+    ("VARCHAR", "DATE"): "lossy",
+    ("VARCHAR", "TIMESTAMP"): "lossy",
+    ("VARCHAR", "TIME"): "lossy",
+    ("VARCHAR", "BINARY"): "safe",
+    ("BINARY", "VARCHAR"): "lossy",
+}
+
+# Default maximum number of flagged mapping IDs listed in a report
+DEFAULT_FLAGGED_LIMIT = 1000
+
+def canonical_type(data_type: Optional[str]) -> str:
+    """
+    Get the canonical type of a declared column type.
+
+    Args:
+        data_type (Optional[str]): The declared type, e.g. 'varchar(255)'.
+
+    Returns:
+        str: The canonical type, or UNKNOWN_TYPE if it is not recognized.
+    """
+    base = " ".join((data_type or "").upper().split("(")[0].split())
+    return TYPE_ALIASES.get(base, UNKNOWN_TYPE)
+
+def compatibility_level(source_type: str, target_type: str) -> str:
+    """
+    Get the compatibility level of a source -> target pair of canonical types.
+
+    Args:
+        source_type (str): The canonical source type.
+        target_type (str): The canonical target type.
+
+    Returns:
+        str: One of LEVELS.
+    """
+    if source_type == UNKNOWN_TYPE or target_type == UNKNOWN_TYPE:
+        return "unknown"
+    if source_type == target_type:
+        return "exact"
+    return COMPATIBILITY.get((source_type, target_type), "incompatible")
+
+def _column_types(side: str) -> Dict[int, str]:
+    """Get the canonical type of each catalog column of a side."""
+    return {
+        column["id"]: canonical_type(column["data_type"])
+        for column in dummy_data.get_reference_rows(f"{side}_columns")
+    }
+
+def get_type_compatibility_report(release_id: Optional[int] = None, flagged_limit: int = DEFAULT_FLAGGED_LIMIT) -> Dict:
+    """
+    Score the source -> target type pair of every mapping against the compatibility matrix.
+
+    Args:
+        release_id (Optional[int]): Only report on the mappings of this release.
+        flagged_limit (int): Maximum number of flagged mapping IDs to list.
+
+    Returns:
+        Dict: The release ID, the total number of mappings, the number of
+        mappings per level, the ratio of exact or safe mappings, the type pairs
+        found with their level and count, and the IDs of the mappings with a
+        lossy, incompatible or unknown pair (the first flagged_limit, in ID order)
+        with their total count.
+    """
+    if mapping_service.USE_DUMMY_DATA:
+        source_types = _column_types("source")
+        target_types = _column_types("target")
+        groupings = [
+            ("source_column_id", lambda key: source_types.get(key, UNKNOWN_TYPE)),
+            ("target_column_id", lambda key: target_types.get(key, UNKNOWN_TYPE)),
+        ]
+        if release_id is not None:
+            groupings.append(("release_id", lambda key: key == release_id))
+        groups = dummy_data.group_mapping_ids(groupings)
+        ids_by_source_type, ids_by_target_type = groups[0], groups[1]
+        if release_id is not None:
+            scope = groups[2].get(True, set())
+            ids_by_source_type = {t: ids & scope for t, ids in ids_by_source_type.items()}
+    else:
+        # TODO: Implement ORM-based report
+        raise NotImplementedError("ORM-based type compatibility report not implemented yet")
+
+    levels = dict.fromkeys(LEVELS, 0)
+    pairs = []
+    flagged: Set[int] = set()
+    for source_type, source_ids in ids_by_source_type.items():
+        for target_type, target_ids in ids_by_target_type.items():
+            ids = source_ids & target_ids
+            if not ids:
+                continue
+            level = compatibility_level(source_type, target_type)
+            levels[level] += len(ids)
+            pairs.append({"source_type": source_type, "target_type": target_type, "level": level, "count": len(ids)})
+            if level not in ("exact", "safe"):
+                flagged |= ids
+
+    total = sum(levels.values())
+    pairs.sort(key=lambda pair: (LEVELS.index(pair["level"]), -pair["count"], pair["source_type"], pair["target_type"]))
+    return {
+        "release_id": release_id,
+        "total": total,
+        "levels": levels,
+        "compatible_ratio": (levels["exact"] + levels["safe"]) / total if total else 1.0,
+        "pairs": pairs,
+        "flagged_total": len(flagged),
+        "flagged_mapping_ids": sorted(flagged)[:flagged_limit],
+    }
@@ -0,0 +1,182 @@
+"""
+Mapping change event service for the STTM application.
+This module fans mapping writes out to push subscribers such as SSE clients.
+"""
+import asyncio
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.cache import dummy_data
+from backend.service import mapping_service
+from backend.service.executor import run_blocking
+
+# Maximum number of distinct pending mappings per subscriber before it is told to resync
+MAX_PENDING_CHANGES = 1000
+
+# Delay after the first pending change so that bursts (e.g. bulk edits) go out as one batch
+COALESCE_SECONDS = 0.05
+
+class Subscription:
+    """
+    A push subscriber to one workspace with an optional filter.
+
+    Pending changes are kept as a bounded set of mapping IDs, so repeated edits to
+    the same mapping coalesce and a slow consumer never holds more than
+    max_pending entries. On overflow the subscriber is asked to resync through
+    the delta sync endpoint instead.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        workspace: str,
+        release_id: Optional[int] = None,
+        source_table_id: Optional[int] = None,
+        target_table_id: Optional[int] = None,
+        max_pending: int = MAX_PENDING_CHANGES,
+    ):
+        self.workspace = workspace
+        self.release_id = release_id
+        self.source_table_id = source_table_id
+        self.target_table_id = target_table_id
+        self.max_pending = max_pending
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._pending: Dict[int, None] = {}
+        self._overflowed = False
+
+    def matches(self, mapping: Optional[Dict]) -> bool:
+        """Check whether a mapping passes this subscription's filter."""
+        if mapping is None:
+            return False
+        if self.release_id is not None and mapping.get("release_id") != self.release_id:
+            return False
+        if self.source_table_id is not None and mapping.get("source_table_id") != self.source_table_id:
+            return False
+        if self.target_table_id is not None and mapping.get("target_table_id") != self.target_table_id:
+            return False
+        return True
+
+    def notify(self, changes: List[Tuple[Optional[Dict], Optional[Dict]]]) -> None:
+        """Record the changes to mappings that are (or were) visible to this subscriber."""
+        mapping_ids = [(new or old)["id"] for old, new in changes if self.matches(old) or self.matches(new)]
+        if not mapping_ids:
+            return
+        with self._lock:
+            if self._overflowed:
+                return
+            self._pending.update(dict.fromkeys(mapping_ids))
+            if len(self._pending) > self.max_pending:
+                self._pending.clear()
+                self._overflowed = True
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The subscriber's event loop has already shut down
+            pass
+
+    async def next_batch(self, timeout: float) -> Optional[Dict]:
+        """
+        Wait for the next batch of changes.
+
+        Args:
+            timeout (float): Seconds to wait before giving up.
+
+        Returns:
+            Optional[Dict]: None on timeout, a "resync" event after an overflow,
+            or a "changes" event with the enriched upserts and the IDs of the
+            mappings deleted or moved out of the filter.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        await asyncio.sleep(COALESCE_SECONDS)
+
+        with self._lock:
+            self._ready.clear()
+            mapping_ids = list(self._pending)
+            self._pending.clear()
+            overflowed, self._overflowed = self._overflowed, False
+
+        return await run_blocking(self._load_batch, mapping_ids, overflowed)
+
+    def _load_batch(self, mapping_ids: List[int], overflowed: bool) -> Dict:
+        """Build the event for a batch of changed mapping IDs from the current rows."""
+        with dummy_data.use_workspace(self.workspace):
+            version = mapping_service.get_data_versions()["mappings"]
+            if overflowed:
+                return {"type": "resync", "version": version}
+
+            batch = mapping_service.get_mappings_by_ids(mapping_ids)
+        # Mappings that moved out of the filter are removals for this subscriber
+        upserts = [mapping for mapping in batch["mappings"] if self.matches(mapping)]
+        left_ids = [mapping["id"] for mapping in batch["mappings"] if not self.matches(mapping)]
+        return {
+            "type": "changes",
+            "version": version,
+            "upserts": upserts,
+            "deleted_ids": batch["missing_ids"] + left_ids,
+        }
+
+# Active subscriptions
+_subscriptions: Set[Subscription] = set()
+_subscriptions_lock = threading.Lock()
+
+def _on_mapping_changes(
+    workspace: str, version: int, changes: List[Tuple[Optional[Dict], Optional[Dict]]]
+) -> None:
+    """Fan a batch of mapping writes out to every subscriber of the workspace."""
+    with _subscriptions_lock:
+        subscriptions = [subscription for subscription in _subscriptions if subscription.workspace == workspace]
+    for subscription in subscriptions:
+        subscription.notify(changes)
+
+def subscribe(
+    release_id: Optional[int] = None,
+    source_table_id: Optional[int] = None,
+    target_table_id: Optional[int] = None,
+    max_pending: int = MAX_PENDING_CHANGES,
+) -> Subscription:
+    """
+    Subscribe to mapping changes in the current workspace. Must be called from a running event loop.
+
+    Args:
+        release_id (Optional[int]): Only push mappings in this release.
+        source_table_id (Optional[int]): Only push mappings from this source table.
+        target_table_id (Optional[int]): Only push mappings to this target table.
+        max_pending (int): Bound on coalesced pending changes before a resync.
+
+    Returns:
+        Subscription: The new subscription.
+    """
+    subscription = Subscription(
+        asyncio.get_running_loop(), mapping_service.current_workspace(), release_id, source_table_id, target_table_id, max_pending
+    )
+    with _subscriptions_lock:
+        _subscriptions.add(subscription)
+    return subscription
+
+def unsubscribe(subscription: Subscription) -> None:
+    """
+    Remove a subscription.
+
+    Args:
+        subscription (Subscription): The subscription to remove.
+    """
+    with _subscriptions_lock:
+        _subscriptions.discard(subscription)
+
+def get_subscriber_count() -> int:
+    """
+    Get the number of active subscriptions.
+
+    Returns:
+        int: The number of active subscriptions.
+    """
+    return len(_subscriptions)
+
+# Register for writes made through the dummy data cache
+if mapping_service.USE_DUMMY_DATA:
+    dummy_data.change_listeners.append(_on_mapping_changes)
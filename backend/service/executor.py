@@ -0,0 +1,58 @@
+"""
+Blocking work offload for the STTM service layer.
+This module runs blocking service calls on a bounded, dedicated thread pool so
+that they never stall the event loop serving other requests.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+# Threads available for blocking service calls per worker process. Bounds the
+# number of concurrent backend queries; further calls queue in the executor.
+BLOCKING_THREADS = int(os.environ.get("STTM_BLOCKING_THREADS", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the executor for blocking calls, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BLOCKING_THREADS, thread_name_prefix="sttm-blocking")
+        return _executor
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking call on the executor and wait for it without blocking the event loop.
+
+    Context variables of the caller are visible to the call.
+
+    Args:
+        func (Callable[..., Any]): The blocking function.
+        *args (Any): Positional arguments for the function.
+        **kwargs (Any): Keyword arguments for the function.
+
+    Returns:
+        Any: The function's return value; its exceptions are re-raised.
+    """
+    context = contextvars.copy_context()
+    call = partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
+
+def shutdown(wait: bool = True) -> None:
+    """
+    Stop the executor. A later call starts a new one.
+
+    Args:
+        wait (bool): Wait for running calls to finish.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
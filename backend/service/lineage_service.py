@@ -0,0 +1,260 @@
+"""
+Lineage service module for the STTM application.
+This module maintains a column-level lineage graph built from mappings.
+
+Mapping edges link a source column to a target column. A target column links
+to the source column of the next layer with the same qualified name
+(table.column), so that e.g. dim_customer.customer_key as a target continues
+as dim_customer.customer_key when it is used as a source.
+"""
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from backend.cache import dummy_data
+from backend.cache.memory import structure_usage
+from backend.service import mapping_service
+
+# Upper bound on the number of nodes returned by one traversal
+MAX_LINEAGE_NODES = 10000
+
+Node = Tuple[str, int]
+
+class LineageGraph:
+    """
+    Column-level adjacency built from mappings and kept current on mapping writes.
+
+    Mapping edges are stored in both directions with a count of the mappings
+    that produce them. Qualified-name links between layers are resolved through
+    name indexes that are rebuilt only when the catalog version changes.
+    """
+
+    def __init__(self):
+        self.downstream: Dict[int, Counter] = {}
+        self.upstream: Dict[int, Counter] = {}
+        self._catalog_version: Optional[int] = None
+        self._source_names: Dict[int, Tuple[str, str]] = {}
+        self._target_names: Dict[int, Tuple[str, str]] = {}
+        self._source_by_name: Dict[str, int] = {}
+        self._target_by_name: Dict[str, int] = {}
+
+    def add_edge(self, source_column_id: int, target_column_id: int) -> None:
+        """Add one mapping edge."""
+        self.downstream.setdefault(source_column_id, Counter())[target_column_id] += 1
+        self.upstream.setdefault(target_column_id, Counter())[source_column_id] += 1
+
+    def remove_edge(self, source_column_id: int, target_column_id: int) -> None:
+        """Remove one mapping edge, dropping it when no mapping produces it anymore."""
+        for adjacency, key, other in (
+            (self.downstream, source_column_id, target_column_id),
+            (self.upstream, target_column_id, source_column_id),
+        ):
+            neighbours = adjacency.get(key)
+            if neighbours is None:
+                continue
+            neighbours[other] -= 1
+            if neighbours[other] <= 0:
+                del neighbours[other]
+            if not neighbours:
+                del adjacency[key]
+
+    def apply_change(self, old: Optional[Dict], new: Optional[Dict]) -> None:
+        """Apply a mapping write to the graph."""
+        old_edge = _edge(old) if old is not None else None
+        new_edge = _edge(new) if new is not None else None
+        if old_edge == new_edge:
+            return
+        if old_edge is not None and None not in old_edge:
+            self.remove_edge(*old_edge)
+        if new_edge is not None and None not in new_edge:
+            self.add_edge(*new_edge)
+
+    def rebuild(self, mappings: List[Dict]) -> None:
+        """Rebuild all mapping edges from scratch."""
+        self.downstream = {}
+        self.upstream = {}
+        for mapping in mappings:
+            self.apply_change(None, mapping)
+
+    def _refresh_names(self) -> None:
+        """Rebuild the qualified-name indexes if the catalog has changed."""
+        catalog_version = mapping_service.get_data_versions()["catalog"]
+        if catalog_version == self._catalog_version:
+            return
+        self._source_names = _column_names(
+            mapping_service.get_source_tables(), mapping_service.get_source_columns()
+        )
+        self._target_names = _column_names(
+            mapping_service.get_target_tables(), mapping_service.get_target_columns()
+        )
+        self._source_by_name = _by_qualified_name(self._source_names)
+        self._target_by_name = _by_qualified_name(self._target_names)
+        self._catalog_version = catalog_version
+
+    def has_column(self, node: Node) -> bool:
+        """Check whether a column exists in the catalog."""
+        self._refresh_names()
+        names = self._source_names if node[0] == "source" else self._target_names
+        return node[1] in names
+
+    def _names(self, node: Node) -> Tuple[str, str]:
+        names = self._source_names if node[0] == "source" else self._target_names
+        return names.get(node[1], (None, None))
+
+    def _neighbours(self, node: Node, direction: str) -> List[Tuple[Node, str, int]]:
+        """Get (neighbour, edge kind, mapping count) for one step in a direction."""
+        side, column_id = node
+        if (side, direction) == ("source", "downstream"):
+            return [(("target", t), "mapping", n) for t, n in self.downstream.get(column_id, {}).items()]
+        if (side, direction) == ("target", "upstream"):
+            return [(("source", s), "mapping", n) for s, n in self.upstream.get(column_id, {}).items()]
+        # Cross layers through a column with the same qualified name on the other side
+        by_name = self._source_by_name if side == "target" else self._target_by_name
+        other_id = by_name.get(_qualify(*self._names(node)))
+        if other_id is None:
+            return []
+        return [(("source" if side == "target" else "target", other_id), "same_column", 0)]
+
+    def traverse(self, root: Node, direction: str, max_depth: int) -> Dict:
+        """
+        Breadth-first traversal from a column.
+
+        Depth counts mapping edges; crossing into the next layer by qualified
+        name is free.
+        """
+        self._refresh_names()
+        depths: Dict[Node, int] = {root: 0}
+        edges: List[Dict] = []
+        queue = deque([root])
+        truncated = False
+        while queue:
+            node = queue.popleft()
+            for neighbour, kind, count in self._neighbours(node, direction):
+                depth = depths[node] + (1 if kind == "mapping" else 0)
+                if depth > max_depth:
+                    truncated = True
+                    continue
+                if neighbour not in depths:
+                    if len(depths) >= MAX_LINEAGE_NODES:
+                        truncated = True
+                        continue
+                    depths[neighbour] = depth
+                    queue.append(neighbour)
+                edges.append({
+                    "from_side": node[0],
+                    "from_column_id": node[1],
+                    "to_side": neighbour[0],
+                    "to_column_id": neighbour[1],
+                    "kind": kind,
+                    "mapping_count": count,
+                })
+
+        nodes = []
+        for node, depth in depths.items():
+            table_name, column_name = self._names(node)
+            nodes.append({
+                "side": node[0],
+                "column_id": node[1],
+                "table_name": table_name,
+                "column_name": column_name,
+                "depth": depth,
+            })
+        return {"direction": direction, "max_depth": max_depth, "nodes": nodes, "edges": edges, "truncated": truncated}
+
+def _edge(mapping: Dict) -> Tuple[Optional[int], Optional[int]]:
+    return mapping.get("source_column_id"), mapping.get("target_column_id")
+
+def _qualify(table_name: Optional[str], column_name: Optional[str]) -> Optional[str]:
+    if table_name is None or column_name is None:
+        return None
+    return f"{table_name}.{column_name}".lower()
+
+def _by_qualified_name(names: Dict[int, Tuple[str, str]]) -> Dict[str, int]:
+    """Build qualified name -> column ID for one side of the catalog."""
+    by_name = {}
+    for column_id, (table_name, column_name) in names.items():
+        qualified_name = _qualify(table_name, column_name)
+        if qualified_name is not None:
+            by_name[qualified_name] = column_id
+    return by_name
+
+def _column_names(tables: List[Dict], columns: List[Dict]) -> Dict[int, Tuple[str, str]]:
+    """Build column ID -> (table name, column name) for one side of the catalog."""
+    table_names = {t["id"]: t["name"] for t in tables}
+    return {c["id"]: (table_names.get(c["table_id"]), c["name"]) for c in columns}
+
+# Lineage graphs of the dummy data cache by workspace, built on first use and kept current by the change listener
+_graphs: Dict[str, LineageGraph] = {}
+
+def _on_mapping_changes(
+    workspace: str, version: int, changes: List[Tuple[Optional[Dict], Optional[Dict]]]
+) -> None:
+    """Apply mapping writes to the workspace's graph; runs with the workspace lock held."""
+    graph = _graphs.get(workspace)
+    if graph is None:
+        return
+    for old, new in changes:
+        graph.apply_change(old, new)
+
+def _get_graph() -> LineageGraph:
+    """Get the lineage graph of the current workspace, building it on first use."""
+    workspace = dummy_data.workspace()
+    graph = _graphs.get(workspace.name)
+    if graph is None:
+        # Build under the workspace's write lock so that no write is missed or applied twice
+        with workspace.lock:
+            graph = _graphs.get(workspace.name)
+            if graph is None:
+                graph = LineageGraph()
+                graph.rebuild(workspace.get_all_mappings())
+                _graphs[workspace.name] = graph
+    return graph
+
+def get_memory_usage() -> Dict[str, int]:
+    """
+    Estimate the memory held by the lineage graphs built so far.
+
+    Returns:
+        Dict[str, int]: The number of columns with mapping edges and the approximate bytes.
+    """
+    graphs = list(_graphs.values())
+    return structure_usage(graphs, sum(len(graph.downstream) + len(graph.upstream) for graph in graphs), shared_leaves=True)
+
+def get_lineage(side: str, column_id: int, direction: str, max_depth: int) -> Optional[Dict]:
+    """
+    Get the lineage of a column.
+
+    Args:
+        side (str): "source" or "target".
+        column_id (int): The ID of the column on that side.
+        direction (str): "upstream" or "downstream".
+        max_depth (int): The maximum number of mapping hops to follow.
+
+    Returns:
+        Optional[Dict]: The lineage graph, or None if the column does not exist.
+
+    Raises:
+        ValueError: If the side, direction or depth is invalid.
+    """
+    if side not in ("source", "target"):
+        raise ValueError(f"Invalid side: {side}")
+    if direction not in ("upstream", "downstream"):
+        raise ValueError(f"Invalid direction: {direction}")
+    if max_depth < 1:
+        raise ValueError("max_depth must be at least 1")
+
+    if mapping_service.USE_DUMMY_DATA:
+        lineage_graph = _get_graph()
+        # Writes on other threads update the graph under the workspace lock (see _on_mapping_changes)
+        graph_lock = dummy_data.workspace().lock
+    else:
+        # TODO: Implement ORM-based lineage
+        raise NotImplementedError("ORM-based lineage not implemented yet")
+
+    with graph_lock:
+        if not lineage_graph.has_column((side, column_id)):
+            return None
+        return lineage_graph.traverse((side, column_id), direction, max_depth)
+
+# Register for writes made through the dummy data cache
+if mapping_service.USE_DUMMY_DATA:
+    dummy_data.change_listeners.append(_on_mapping_changes)
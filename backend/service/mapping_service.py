@@ -2,15 +2,293 @@
 Mapping service module for the STTM application.
 This module provides business logic for managing source-to-target mappings.
 """
-from typing import Dict, List, Optional, Union
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Set, Tuple, Union
 from datetime import datetime
 
 # Import dummy data cache for initial implementation
 from backend.cache import dummy_data
+from backend.cache.mapping_stats import ALL_RELEASES
 
 # Flag to determine whether to use dummy data or ORM
 USE_DUMMY_DATA = True
 
+# Fields every mapping must provide
+REQUIRED_MAPPING_FIELDS = [
+    "source_table_id", "source_column_id",
+    "target_table_id", "target_column_id"
+]
+
+class MappingValidationError(ValueError):
+    """
+    Raised when one or more mappings fail validation.
+    
+    Each error is a dict with a "code", a "message" and, for batches, the
+    "index" of the offending row or the "mapping_id" of the offending mapping.
+    """
+    def __init__(self, errors: List[Dict]):
+        self.errors = errors
+        super().__init__("; ".join(error["message"] for error in errors))
+
+class MappingConflictError(MappingValidationError):
+    """Raised when a mapping would duplicate or conflict with existing mappings."""
+    pass
+
+class MappingVersionConflictError(MappingConflictError):
+    """
+    Raised when a write is based on an outdated version of a mapping.
+    
+    Each error has the "mapping_id", the "expected_version" and the current
+    "mapping", so that the client can resolve the conflict without reloading.
+    """
+    pass
+
+def _check_versions(mappings: List[Dict], expected_versions: Dict[int, int]) -> None:
+    """
+    Check that mappings are at the versions a write is based on.
+    
+    Args:
+        mappings (List[Dict]): The current mappings.
+        expected_versions (Dict[int, int]): The versions the write expects, by
+            mapping ID; mappings not listed are not checked.
+        
+    Raises:
+        MappingVersionConflictError: With one error per outdated mapping.
+    """
+    errors = []
+    for mapping in mappings:
+        expected = expected_versions.get(mapping["id"])
+        if expected is not None and expected != mapping.get("version", 1):
+            errors.append({
+                "code": "stale",
+                "message": (
+                    f"Mapping {mapping['id']} is at version {mapping.get('version', 1)}, "
+                    f"not version {expected}"
+                ),
+                "mapping_id": mapping["id"],
+                "expected_version": expected,
+                "mapping": mapping,
+            })
+    if errors:
+        raise MappingVersionConflictError(errors)
+
+def _write_transaction():
+    """
+    Get a context that keeps validation and the write it guards atomic.
+    
+    Concurrent writers, including other workers sharing the store, cannot
+    interleave between the checks and the write. The reference data the checks
+    read is first caught up with other workers.
+    """
+    if USE_DUMMY_DATA:
+        dummy_data.sync_catalog()
+        return dummy_data.write_transaction()
+    else:
+        # TODO: Implement ORM-based transactions
+        return nullcontext()
+
+def is_store_shared() -> bool:
+    """
+    Check whether the mappings are shared with other worker processes.
+    
+    Returns:
+        bool: True if writes by other workers must be synced.
+    """
+    if USE_DUMMY_DATA:
+        return dummy_data.shared_store is not None
+    else:
+        return False
+
+def sync_shared_state(all_workspaces: bool = False) -> bool:
+    """
+    Catch up with mapping and reference data writes made by other worker processes.
+    
+    Does nothing unless the store is shared between workers, and does not wait
+    for a write in progress in this process.
+    
+    Args:
+        all_workspaces (bool): Sync every workspace open in this process instead
+            of only the current one.
+    
+    Returns:
+        bool: True if any writes were applied.
+    """
+    if USE_DUMMY_DATA:
+        synced = dummy_data.sync_catalog(blocking=False)
+        if all_workspaces:
+            return dummy_data.sync_all(blocking=False) or synced
+        return dummy_data.sync(blocking=False) or synced
+    else:
+        return False
+
+def current_workspace() -> str:
+    """
+    Get the workspace that mapping reads and writes currently act on.
+    
+    Returns:
+        str: The workspace name.
+    """
+    if USE_DUMMY_DATA:
+        return dummy_data.current_workspace_name()
+    else:
+        # TODO: Implement ORM-based workspaces
+        raise NotImplementedError("ORM-based workspaces not implemented yet")
+
+def _check_references(mapping: Dict) -> List[Dict]:
+    """
+    Check that a mapping's foreign keys exist and are consistent.
+    
+    Source and target columns must exist and belong to the given tables, and the
+    release must exist if one is set. All lookups go through the ID indexes of
+    the reference data, so each check is O(1) per row.
+    
+    Args:
+        mapping (Dict): The mapping as it would be stored.
+        
+    Returns:
+        List[Dict]: The errors found, empty if all references are valid.
+    """
+    lookups = _build_enrichment_lookups()
+    errors = []
+    
+    for side in ("source", "target"):
+        table_id = mapping.get(f"{side}_table_id")
+        column_id = mapping.get(f"{side}_column_id")
+        column = lookups[f"{side}_columns"].get(column_id)
+        if table_id not in lookups[f"{side}_tables"]:
+            errors.append({
+                "code": "invalid_reference",
+                "field": f"{side}_table_id",
+                "message": f"{side.capitalize()} table {table_id} does not exist",
+            })
+        if column is None:
+            errors.append({
+                "code": "invalid_reference",
+                "field": f"{side}_column_id",
+                "message": f"{side.capitalize()} column {column_id} does not exist",
+            })
+        elif column["table_id"] != table_id:
+            errors.append({
+                "code": "invalid_reference",
+                "field": f"{side}_column_id",
+                "message": f"{side.capitalize()} column {column_id} does not belong to {side} table {table_id}",
+            })
+    
+    release_id = mapping.get("release_id")
+    if release_id is not None and release_id not in lookups["releases"]:
+        errors.append({
+            "code": "invalid_reference",
+            "field": "release_id",
+            "message": f"Release {release_id} does not exist",
+        })
+    return errors
+
+def _validate_mapping(
+    mapping: Dict,
+    exclude_id: Optional[int] = None,
+    batch_pairs: Optional[Dict] = None,
+    batch_targets: Optional[Dict] = None,
+    exclude_ids: Optional[Set[int]] = None,
+) -> List[Dict]:
+    """
+    Run the reference checks and, if they pass, the uniqueness checks on a mapping.
+    
+    Args:
+        mapping (Dict): The mapping as it would be stored.
+        exclude_id (Optional[int]): The ID of the mapping being updated, if any.
+        batch_pairs (Optional[Dict]): Pair keys already claimed earlier in a batch.
+        batch_targets (Optional[Dict]): Target keys already claimed earlier in a batch.
+        exclude_ids (Optional[Set[int]]): The IDs of all mappings being updated in
+            a batch, instead of exclude_id.
+        
+    Returns:
+        List[Dict]: The errors found, empty if the mapping is valid.
+    """
+    errors = _check_references(mapping)
+    if errors:
+        return errors
+    return _check_uniqueness(mapping, exclude_id, batch_pairs, batch_targets, exclude_ids)
+
+def _raise_for_errors(errors: List[Dict]) -> None:
+    """
+    Raise the appropriate validation error for a single mapping's errors.
+    
+    Raises:
+        MappingConflictError: If the errors are duplicates or conflicts.
+        MappingValidationError: For any other errors.
+    """
+    if not errors:
+        return
+    if all(error["code"] in ("duplicate", "conflict") for error in errors):
+        raise MappingConflictError(errors)
+    raise MappingValidationError(errors)
+
+def _check_uniqueness(
+    mapping: Dict,
+    exclude_id: Optional[int] = None,
+    batch_pairs: Optional[Dict] = None,
+    batch_targets: Optional[Dict] = None,
+    exclude_ids: Optional[Set[int]] = None,
+) -> List[Dict]:
+    """
+    Check a mapping against the uniqueness and conflict rules.
+    
+    Within a release, a source/target column pair may be mapped only once, and a
+    target column may be fed by only one source column. Both rules are checked
+    through hash indexes on the key tuples, so each check is O(1) per row.
+    
+    Args:
+        mapping (Dict): The mapping as it would be stored.
+        exclude_id (Optional[int]): The ID of the mapping being updated, if any.
+        batch_pairs (Optional[Dict]): Pair keys already claimed earlier in a batch.
+        batch_targets (Optional[Dict]): Target keys already claimed earlier in a batch.
+        exclude_ids (Optional[Set[int]]): The IDs of all mappings being updated in
+            a batch, instead of exclude_id.
+        
+    Returns:
+        List[Dict]: The errors found, empty if the mapping is valid.
+    """
+    excluded = exclude_ids if exclude_ids is not None else {exclude_id}
+    release_id = mapping.get("release_id")
+    source_column_id = mapping.get("source_column_id")
+    target_column_id = mapping.get("target_column_id")
+    pair_key = (release_id, source_column_id, target_column_id)
+    target_key = (release_id, target_column_id)
+    release_label = f"release {release_id}" if release_id is not None else "unreleased mappings"
+    errors = []
+    
+    if USE_DUMMY_DATA:
+        duplicate_ids = sorted(dummy_data.hash_indexes["release_source_target"].get(pair_key) - excluded)
+        conflicting_ids = sorted(
+            i for i in dummy_data.hash_indexes["release_target"].get(target_key)
+            if i not in excluded and dummy_data.get_mapping(i)["source_column_id"] != source_column_id
+        )
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+    
+    if duplicate_ids or (batch_pairs is not None and pair_key in batch_pairs):
+        errors.append({
+            "code": "duplicate",
+            "message": (
+                f"Source column {source_column_id} is already mapped to target column "
+                f"{target_column_id} in {release_label}"
+            ),
+            "mapping_ids": duplicate_ids,
+        })
+    elif conflicting_ids or (
+        batch_targets is not None and batch_targets.get(target_key, source_column_id) != source_column_id
+    ):
+        errors.append({
+            "code": "conflict",
+            "message": (
+                f"Target column {target_column_id} is already fed by a different source column "
+                f"in {release_label}"
+            ),
+            "mapping_ids": conflicting_ids,
+        })
+    return errors
+
 def get_all_mappings() -> List[Dict]:
     """
     Get all mappings.
@@ -40,6 +318,29 @@ def get_mapping(mapping_id: int) -> Optional[Dict]:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
 
+def get_mappings_by_ids(mapping_ids: List[int]) -> Dict:
+    """
+    Get enriched mappings by ID in one lookup.
+    
+    Every ID is a direct lookup, so the cost depends on the number of IDs
+    requested, not of mappings. Repeated IDs are returned once.
+    
+    Args:
+        mapping_ids (List[int]): The IDs of the mappings to retrieve.
+        
+    Returns:
+        Dict: The enriched "mappings" found and the "missing_ids", both in the
+        order requested.
+    """
+    mapping_ids = list(dict.fromkeys(mapping_ids))
+    if USE_DUMMY_DATA:
+        mappings, missing_ids = dummy_data.get_mappings(mapping_ids)
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+    
+    return {"mappings": enrich_mappings(mappings), "missing_ids": missing_ids}
+
 def create_mapping(mapping_data: Dict) -> Dict:
     """
     Create a new mapping.
@@ -49,14 +350,14 @@ def create_mapping(mapping_data: Dict) -> Dict:
         
     Returns:
         Dict: The created mapping.
+        
+    Raises:
+        ValueError: If a required field is missing.
+        MappingValidationError: If a foreign key is invalid.
+        MappingConflictError: If the mapping duplicates or conflicts with an existing one.
     """
     # Validate mapping data
-    required_fields = [
-        "source_table_id", "source_column_id", 
-        "target_table_id", "target_column_id"
-    ]
-    
-    for field in required_fields:
+    for field in REQUIRED_MAPPING_FIELDS:
         if field not in mapping_data:
             raise ValueError(f"Missing required field: {field}")
     
@@ -67,33 +368,212 @@ def create_mapping(mapping_data: Dict) -> Dict:
     if "description" not in mapping_data:
         mapping_data["description"] = ""
     
-    if USE_DUMMY_DATA:
-        return dummy_data.add_mapping(mapping_data)
-    else:
-        # TODO: Implement ORM-based creation
-        raise NotImplementedError("ORM-based creation not implemented yet")
+    with _write_transaction():
+        _raise_for_errors(_validate_mapping(mapping_data))
+        
+        if USE_DUMMY_DATA:
+            return dummy_data.add_mapping(mapping_data)
+        else:
+            # TODO: Implement ORM-based creation
+            raise NotImplementedError("ORM-based creation not implemented yet")
+
+def create_mappings(mappings_data: List[Dict]) -> List[Dict]:
+    """
+    Create many mappings at once.
+    
+    Every row is validated before anything is written, so either all mappings
+    are created or none are. The mappings are written as one change: one
+    mappings version, one created_at and one bulk index update.
+    
+    Args:
+        mappings_data (List[Dict]): The mapping data for each new mapping.
+        
+    Returns:
+        List[Dict]: The created mappings, in input order.
+        
+    Raises:
+        MappingValidationError: With one error per invalid row.
+    """
+    with _write_transaction():
+        errors = []
+        batch_pairs: Dict = {}
+        batch_targets: Dict = {}
+        for index, mapping_data in enumerate(mappings_data):
+            missing = [f for f in REQUIRED_MAPPING_FIELDS if f not in mapping_data]
+            if missing:
+                errors.append({
+                    "index": index,
+                    "code": "missing_field",
+                    "message": f"Missing required field: {missing[0]}",
+                })
+                continue
+            row_errors = _validate_mapping(mapping_data, batch_pairs=batch_pairs, batch_targets=batch_targets)
+            errors.extend({"index": index, **error} for error in row_errors)
+            release_id = mapping_data.get("release_id")
+            batch_pairs[(release_id, mapping_data["source_column_id"], mapping_data["target_column_id"])] = index
+            batch_targets.setdefault((release_id, mapping_data["target_column_id"]), mapping_data["source_column_id"])
+        
+        if errors:
+            raise MappingValidationError(errors)
+        
+        mappings = [{"status": "Draft", "description": "", **mapping_data} for mapping_data in mappings_data]
+        if USE_DUMMY_DATA:
+            return dummy_data.add_mappings(mappings)
+        else:
+            # TODO: Implement ORM-based creation
+            raise NotImplementedError("ORM-based creation not implemented yet")
 
-def update_mapping(mapping_id: int, mapping_data: Dict) -> Optional[Dict]:
+def update_mapping(
+    mapping_id: int, mapping_data: Dict, expected_version: Optional[int] = None
+) -> Optional[Dict]:
     """
-    Update an existing mapping.
+    Update an existing mapping and increment its version.
     
     Args:
         mapping_id (int): The ID of the mapping to update.
         mapping_data (Dict): The updated mapping data.
+        expected_version (Optional[int]): If given, the version of the mapping
+            the update is based on; the update fails if the mapping has changed since.
         
     Returns:
         Optional[Dict]: The updated mapping if found, None otherwise.
+        
+    Raises:
+        MappingValidationError: If a foreign key is invalid.
+        MappingConflictError: If the update would duplicate or conflict with another mapping.
+        MappingVersionConflictError: If the mapping is not at the expected version.
     """
-    # Get the existing mapping
-    existing_mapping = get_mapping(mapping_id)
-    if not existing_mapping:
-        return None
-    
+    with _write_transaction():
+        # Get the existing mapping
+        existing_mapping = get_mapping(mapping_id)
+        if not existing_mapping:
+            return None
+        
+        if expected_version is not None:
+            _check_versions([existing_mapping], {mapping_id: expected_version})
+        
+        _raise_for_errors(_validate_mapping({**existing_mapping, **mapping_data}, exclude_id=mapping_id))
+        
+        if USE_DUMMY_DATA:
+            return dummy_data.update_mapping(mapping_id, mapping_data)
+        else:
+            # TODO: Implement ORM-based update
+            raise NotImplementedError("ORM-based update not implemented yet")
+
+# Mapping fields whose changes are checked against the catalog and the uniqueness rules
+REFERENCE_FIELDS = {"source_table_id", "source_column_id", "target_table_id", "target_column_id", "release_id"}
+
+# Filters that select the mappings of a range patch
+RANGE_FILTER_FIELDS = ["release_id", "status", "source_table_id", "target_table_id"]
+
+def _select_mappings(filters: Dict) -> List[Dict]:
+    """Get the mappings matching all filters, narrowed first through a hash index when one applies."""
     if USE_DUMMY_DATA:
-        return dummy_data.update_mapping(mapping_id, mapping_data)
+        indexed = next((field for field in ("release_id", "status") if filters.get(field) is not None), None)
+        if indexed is not None:
+            mappings = dummy_data.get_mappings_by_index(indexed, filters[indexed])
+        else:
+            mappings = dummy_data.get_all_mappings()
     else:
-        # TODO: Implement ORM-based update
-        raise NotImplementedError("ORM-based update not implemented yet")
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+    
+    conditions = [(field, value) for field, value in filters.items() if value is not None]
+    return [m for m in mappings if all(m.get(field) == value for field, value in conditions)]
+
+def patch_mappings(
+    fields: Dict,
+    mapping_ids: Optional[List[int]] = None,
+    filters: Optional[Dict] = None,
+    expected_versions: Optional[Dict[int, int]] = None,
+) -> Dict:
+    """
+    Set the same field values on many mappings at once, e.g. for a drag fill.
+    
+    The mappings are given by ID or selected by filter. Every changed mapping is
+    validated before anything is written, so either all of them are updated or
+    none are, and the update is one write: one mappings version, one updated_at
+    and one bulk index update. Mappings that already have the values are left
+    untouched. Changes to fields that no rule depends on (e.g. status or
+    description) skip validation.
+    
+    Args:
+        fields (Dict): The field values to set.
+        mapping_ids (Optional[List[int]]): The IDs of the mappings to update.
+        filters (Optional[Dict]): Instead of IDs, update the mappings matching
+            these RANGE_FILTER_FIELDS values; None values do not filter.
+        expected_versions (Optional[Dict[int, int]]): The versions of the mappings
+            the patch is based on, by ID; the patch fails if any listed mapping
+            has changed since.
+        
+    Returns:
+        Dict: The mappings "version" after the update, and the "updated_ids",
+        "unchanged_ids" and "missing_ids" (requested IDs with no mapping).
+        
+    Raises:
+        ValueError: If no fields are given, not exactly one of mapping_ids and
+            filters, or filters without any non-None value (which would select
+            every mapping).
+        MappingValidationError: With one error per invalid mapping.
+        MappingConflictError: If every error is a duplicate or conflict.
+        MappingVersionConflictError: With one error per outdated mapping.
+    """
+    if not fields:
+        raise ValueError("No fields to set")
+    if "version" in fields:
+        raise ValueError("The version of a mapping cannot be set")
+    if (mapping_ids is None) == (filters is None):
+        raise ValueError("Give either mapping IDs or filters")
+    unknown = set(filters or {}) - set(RANGE_FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot filter by field: {sorted(unknown)[0]}")
+    if filters is not None and all(value is None for value in filters.values()):
+        raise ValueError("The filter must set at least one field")
+    
+    with _write_transaction():
+        if mapping_ids is not None:
+            if USE_DUMMY_DATA:
+                mappings, missing_ids = dummy_data.get_mappings(dict.fromkeys(mapping_ids))
+            else:
+                # TODO: Implement ORM-based retrieval
+                raise NotImplementedError("ORM-based retrieval not implemented yet")
+        else:
+            mappings, missing_ids = _select_mappings(filters), []
+        
+        if expected_versions:
+            _check_versions(mappings, expected_versions)
+        
+        changed = [m for m in mappings if any(m.get(field) != value for field, value in fields.items())]
+        if REFERENCE_FIELDS & set(fields):
+            errors = []
+            exclude_ids = {m["id"] for m in changed}
+            batch_pairs: Dict = {}
+            batch_targets: Dict = {}
+            for mapping in changed:
+                patched = {**mapping, **fields}
+                row_errors = _validate_mapping(
+                    patched, batch_pairs=batch_pairs, batch_targets=batch_targets, exclude_ids=exclude_ids
+                )
+                errors.extend({"mapping_id": mapping["id"], **error} for error in row_errors)
+                release_id = patched.get("release_id")
+                batch_pairs[(release_id, patched["source_column_id"], patched["target_column_id"])] = mapping["id"]
+                batch_targets.setdefault((release_id, patched["target_column_id"]), patched["source_column_id"])
+            _raise_for_errors(errors)
+        
+        if USE_DUMMY_DATA:
+            updated = dummy_data.update_mappings({m["id"]: fields for m in changed})
+            version = dummy_data.mappings_version
+        else:
+            # TODO: Implement ORM-based update
+            raise NotImplementedError("ORM-based update not implemented yet")
+    
+    changed_ids = {m["id"] for m in changed}
+    return {
+        "version": version,
+        "updated_ids": [m["id"] for m in updated],
+        "unchanged_ids": [m["id"] for m in mappings if m["id"] not in changed_ids],
+        "missing_ids": missing_ids,
+    }
 
 def delete_mapping(mapping_id: int) -> bool:
     """
@@ -122,8 +602,7 @@ def get_mappings_by_release(release_id: int) -> List[Dict]:
         List[Dict]: A list of mappings for the specified release.
     """
     if USE_DUMMY_DATA:
-        all_mappings = dummy_data.get_all_mappings()
-        return [m for m in all_mappings if m.get("release_id") == release_id]
+        return dummy_data.get_mappings_by_index("release_id", release_id)
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
@@ -139,8 +618,7 @@ def get_mappings_by_status(status: str) -> List[Dict]:
         List[Dict]: A list of mappings with the specified status.
     """
     if USE_DUMMY_DATA:
-        all_mappings = dummy_data.get_all_mappings()
-        return [m for m in all_mappings if m.get("status") == status]
+        return dummy_data.get_mappings_by_index("status", status)
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
@@ -153,7 +631,7 @@ def get_source_tables() -> List[Dict]:
         List[Dict]: A list of all source tables.
     """
     if USE_DUMMY_DATA:
-        return dummy_data.source_tables_cache
+        return dummy_data.get_reference_rows("source_tables")
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
@@ -169,9 +647,10 @@ def get_source_columns(table_id: Optional[int] = None) -> List[Dict]:
         List[Dict]: A list of source columns.
     """
     if USE_DUMMY_DATA:
+        columns = dummy_data.get_reference_rows("source_columns")
         if table_id is not None:
-            return [c for c in dummy_data.source_columns_cache if c.get("table_id") == table_id]
-        return dummy_data.source_columns_cache
+            return [c for c in columns if c.get("table_id") == table_id]
+        return columns
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
@@ -184,7 +663,7 @@ def get_target_tables() -> List[Dict]:
         List[Dict]: A list of all target tables.
     """
     if USE_DUMMY_DATA:
-        return dummy_data.target_tables_cache
+        return dummy_data.get_reference_rows("target_tables")
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
@@ -200,9 +679,10 @@ def get_target_columns(table_id: Optional[int] = None) -> List[Dict]:
         List[Dict]: A list of target columns.
     """
     if USE_DUMMY_DATA:
+        columns = dummy_data.get_reference_rows("target_columns")
         if table_id is not None:
-            return [c for c in dummy_data.target_columns_cache if c.get("table_id") == table_id]
-        return dummy_data.target_columns_cache
+            return [c for c in columns if c.get("table_id") == table_id]
+        return columns
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
@@ -215,11 +695,143 @@ def get_releases() -> List[Dict]:
         List[Dict]: A list of all releases.
     """
     if USE_DUMMY_DATA:
-        return dummy_data.releases_cache
+        return dummy_data.get_reference_rows("releases")
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+
+def get_data_versions() -> Dict[str, int]:
+    """
+    Get the current data versions.
+    
+    The mappings version changes on every mapping write and the catalog version
+    on every change to tables, columns or releases.
+    
+    Returns:
+        Dict[str, int]: The "mappings" and "catalog" versions.
+    """
+    if USE_DUMMY_DATA:
+        return {"mappings": dummy_data.mappings_version, "catalog": dummy_data.catalog_version}
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+
+# Reference data sections of the catalog
+CATALOG_SECTIONS = ["source_tables", "source_columns", "target_tables", "target_columns", "releases"]
+
+def get_catalog(since: Optional[int] = None) -> Dict:
+    """
+    Get all reference data in one payload, or only the sections changed since a catalog version.
+    
+    Args:
+        since (Optional[int]): The catalog version the caller already has. A
+            version newer than the current one (e.g. from before a restart)
+            gets the full catalog.
+        
+    Returns:
+        Dict: The catalog "version", "since" and the "sections" by name, with
+        None for sections unchanged since the given version.
+    """
+    if USE_DUMMY_DATA:
+        version = dummy_data.catalog_version
+        if since is None or since > version:
+            since = None
+            changed = CATALOG_SECTIONS
+        else:
+            changed = dummy_data.get_catalog_sections_changed_since(since)
+        sections = {
+            name: dummy_data.get_reference_rows(name) if name in changed else None
+            for name in CATALOG_SECTIONS
+        }
+        return {"version": version, "since": since, "sections": sections}
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+
+def _build_enrichment_lookups() -> Dict[str, Dict[int, Dict]]:
+    """
+    Get id -> row lookups for the reference data used to enrich mappings.
+    
+    The lookups are maintained by the data cache and must not be modified.
+    
+    Returns:
+        Dict[str, Dict[int, Dict]]: Lookups keyed by reference type.
+    """
+    if USE_DUMMY_DATA:
+        return dummy_data.reference_lookups
     else:
         # TODO: Implement ORM-based retrieval
         raise NotImplementedError("ORM-based retrieval not implemented yet")
 
+# Enriched name fields: field -> (lookup key, ID field on the mapping)
+ENRICHED_NAME_FIELDS = {
+    "source_table_name": ("source_tables", "source_table_id"),
+    "source_column_name": ("source_columns", "source_column_id"),
+    "target_table_name": ("target_tables", "target_table_id"),
+    "target_column_name": ("target_columns", "target_column_id"),
+    "release_name": ("releases", "release_id"),
+}
+
+def _enrich_mapping(
+    mapping: Dict,
+    lookups: Dict[str, Dict[int, Dict]],
+    fields: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Add table, column and release names to a single mapping.
+    
+    Args:
+        mapping (Dict): The mapping to enrich.
+        lookups (Dict[str, Dict[int, Dict]]): Lookups from _build_enrichment_lookups.
+        fields (Optional[List[str]]): If given, only these fields are built.
+        
+    Returns:
+        Dict: An enriched copy of the mapping.
+    """
+    if fields is None:
+        enriched = mapping.copy()
+        name_fields = ENRICHED_NAME_FIELDS
+    else:
+        enriched = {f: mapping.get(f) for f in fields if f not in ENRICHED_NAME_FIELDS}
+        name_fields = {f: ENRICHED_NAME_FIELDS[f] for f in fields if f in ENRICHED_NAME_FIELDS}
+    
+    for name_field, (lookup_key, id_field) in name_fields.items():
+        ref_id = mapping.get(id_field)
+        if ref_id and ref_id in lookups[lookup_key]:
+            enriched[name_field] = lookups[lookup_key][ref_id]["name"]
+        elif fields is not None:
+            enriched[name_field] = None
+    
+    return enriched
+
+def select_fields(rows: List[Dict], fields: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Project rows onto a subset of their fields.
+    
+    Args:
+        rows (List[Dict]): The rows to project.
+        fields (Optional[List[str]]): The fields to keep, or None to keep all.
+        
+    Returns:
+        List[Dict]: The projected rows.
+    """
+    if fields is None:
+        return rows
+    return [{f: row.get(f) for f in fields} for row in rows]
+
+def enrich_mappings(mappings: List[Dict]) -> List[Dict]:
+    """
+    Add table, column and release names to a list of mappings.
+    
+    Args:
+        mappings (List[Dict]): The mappings to enrich.
+        
+    Returns:
+        List[Dict]: Enriched copies of the mappings.
+    """
+    lookups = _build_enrichment_lookups()
+    return [_enrich_mapping(mapping, lookups) for mapping in mappings]
+
 def get_enriched_mappings() -> List[Dict]:
     """
     Get all mappings with enriched information (table and column names).
@@ -227,38 +839,295 @@ def get_enriched_mappings() -> List[Dict]:
     Returns:
         List[Dict]: A list of enriched mappings.
     """
-    mappings = get_all_mappings()
-    source_tables = {t["id"]: t for t in get_source_tables()}
-    source_columns = {c["id"]: c for c in get_source_columns()}
-    target_tables = {t["id"]: t for t in get_target_tables()}
-    target_columns = {c["id"]: c for c in get_target_columns()}
-    releases = {r["id"]: r for r in get_releases()}
+    return enrich_mappings(get_all_mappings())
+
+def get_mappings_page(
+    release_id: Optional[int] = None,
+    status: Optional[str] = None,
+    sort: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    Get a page of enriched mappings, optionally filtered and sorted.
     
-    enriched_mappings = []
+    Ordering comes from the sort indexes maintained by the data cache, so only
+    the rows on the requested page are visited and enriched when no filter is set.
+    
+    Args:
+        release_id (Optional[int]): The ID of the release to filter by.
+        status (Optional[str]): The status to filter by.
+        sort (Optional[str]): The field to sort by, prefixed with '-' for descending order.
+        offset (int): The number of matching mappings to skip.
+        limit (Optional[int]): The maximum number of mappings to return.
+        fields (Optional[List[str]]): If given, only these fields are built for each mapping.
+        
+    Returns:
+        List[Dict]: A list of enriched mappings.
+        
+    Raises:
+        ValueError: If the sort field is not supported.
+    """
+    if USE_DUMMY_DATA:
+        sort = sort or "id"
+        descending = sort.startswith("-")
+        mappings = dummy_data.iter_sorted_mappings(sort.lstrip("-"), descending)
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+    
+    page = []
+    skipped = 0
     for mapping in mappings:
-        enriched = mapping.copy()
+        if release_id is not None and mapping.get("release_id") != release_id:
+            continue
+        if status is not None and mapping.get("status") != status:
+            continue
+        if skipped < offset:
+            skipped += 1
+            continue
+        if limit is not None and len(page) >= limit:
+            break
+        page.append(mapping)
+    
+    lookups = _build_enrichment_lookups()
+    return [_enrich_mapping(mapping, lookups, fields) for mapping in page]
+
+
+def get_mapping_changes(since: int) -> Dict:
+    """
+    Get the mappings created, updated or deleted after a mappings version.
+    
+    Args:
+        since (int): The mappings version the client last synced to. A version
+            newer than the current one (e.g. from before a restart) gets all
+            mappings.
+        
+    Returns:
+        Dict: The current "version", "since" (None if the upserts are all
+        mappings and the client must drop the rows it has), the enriched
+        "upserts" and the "deleted_ids".
+    """
+    if USE_DUMMY_DATA:
+        version, since, upserts, deleted_ids = dummy_data.get_changes_since(since)
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+    
+    return {
+        "version": version,
+        "since": since,
+        "upserts": enrich_mappings(upserts),
+        "deleted_ids": deleted_ids,
+    }
+
+def get_column_impact(side: str, column_ids: List[int]) -> Dict:
+    """
+    Get the mappings, related columns, releases and JIRA tickets affected by columns.
+    
+    For a source column the related columns are the target columns it feeds; for
+    a target column they are the source columns feeding it.
+    
+    Args:
+        side (str): "source" or "target".
+        column_ids (List[int]): The IDs of the columns on that side.
         
-        # Add source table and column information
-        source_table_id = mapping.get("source_table_id")
-        source_column_id = mapping.get("source_column_id")
-        if source_table_id and source_table_id in source_tables:
-            enriched["source_table_name"] = source_tables[source_table_id]["name"]
-        if source_column_id and source_column_id in source_columns:
-            enriched["source_column_name"] = source_columns[source_column_id]["name"]
-        
-        # Add target table and column information
-        target_table_id = mapping.get("target_table_id")
-        target_column_id = mapping.get("target_column_id")
-        if target_table_id and target_table_id in target_tables:
-            enriched["target_table_name"] = target_tables[target_table_id]["name"]
-        if target_column_id and target_column_id in target_columns:
-            enriched["target_column_name"] = target_columns[target_column_id]["name"]
-        
-        # Add release information
-        release_id = mapping.get("release_id")
-        if release_id and release_id in releases:
-            enriched["release_name"] = releases[release_id]["name"]
-        
-        enriched_mappings.append(enriched)
-    
-    return enriched_mappings 
\ No newline at end of file
+    Returns:
+        Dict: The "impacts" of the columns found and the "not_found_ids".
+        
+    Raises:
+        ValueError: If the side is invalid.
+    """
+    if side not in ("source", "target"):
+        raise ValueError(f"Invalid side: {side}")
+    other = "target" if side == "source" else "source"
+    lookups = _build_enrichment_lookups()
+    columns = lookups[f"{side}_columns"]
+    tables = lookups[f"{side}_tables"]
+    other_columns = lookups[f"{other}_columns"]
+    other_tables = lookups[f"{other}_tables"]
+    releases = lookups["releases"]
+    
+    impacts = []
+    not_found_ids = []
+    for column_id in dict.fromkeys(column_ids):
+        column = columns.get(column_id)
+        if column is None:
+            not_found_ids.append(column_id)
+            continue
+        
+        if USE_DUMMY_DATA:
+            mappings = dummy_data.get_mappings_by_index(f"{side}_column_id", column_id)
+        else:
+            # TODO: Implement ORM-based retrieval
+            raise NotImplementedError("ORM-based retrieval not implemented yet")
+        
+        related_ids = dict.fromkeys(m[f"{other}_column_id"] for m in mappings)
+        related_columns = []
+        for related_id in related_ids:
+            related = other_columns.get(related_id, {})
+            related_table = other_tables.get(related.get("table_id"), {})
+            related_columns.append({
+                "side": other,
+                "column_id": related_id,
+                "table_id": related.get("table_id"),
+                "table_name": related_table.get("name"),
+                "column_name": related.get("name"),
+            })
+        release_ids = sorted({m["release_id"] for m in mappings if m.get("release_id") is not None})
+        
+        impacts.append({
+            "side": side,
+            "column_id": column_id,
+            "table_id": column["table_id"],
+            "table_name": tables.get(column["table_id"], {}).get("name"),
+            "column_name": column["name"],
+            "mapping_ids": [m["id"] for m in mappings],
+            "related_columns": related_columns,
+            "releases": [
+                {"id": r, "name": releases[r]["name"] if r in releases else None} for r in release_ids
+            ],
+            "jira_tickets": sorted({m["jira_ticket"] for m in mappings if m.get("jira_ticket")}),
+        })
+    
+    return {"impacts": impacts, "not_found_ids": not_found_ids}
+
+# Status key under which mappings without a status are counted
+UNSET_STATUS = "Unset"
+
+# Number of target columns per target table: (target columns section version, counts)
+_target_column_counts: Tuple[int, Dict[int, int]] = (-1, {})
+
+def _get_target_column_counts() -> Dict[int, int]:
+    """Get the number of catalog columns of each target table, recounted only after catalog changes."""
+    global _target_column_counts
+    version = dummy_data.catalog_section_versions["target_columns"]
+    if _target_column_counts[0] != version:
+        counts: Dict[int, int] = {}
+        for column in dummy_data.get_reference_rows("target_columns"):
+            counts[column["table_id"]] = counts.get(column["table_id"], 0) + 1
+        _target_column_counts = (version, counts)
+    return _target_column_counts[1]
+
+def _coverage_entry(total_columns: int, mapped_columns: int, status_counts: Dict[Optional[str], int]) -> Dict:
+    """Build the coverage and status counts of one group."""
+    return {
+        "total_columns": total_columns,
+        "mapped_columns": mapped_columns,
+        "coverage": round(100.0 * mapped_columns / total_columns, 2) if total_columns else 0.0,
+        "mapping_count": sum(status_counts.values()),
+        "status_counts": {UNSET_STATUS if status is None else status: count for status, count in status_counts.items()},
+    }
+
+def get_mapping_stats(release_id: Optional[int] = None) -> Dict:
+    """
+    Get the share of target columns mapped and the mapping counts by status.
+    
+    The counts are read from counters maintained on every mapping write, so the
+    cost depends on the number of tables and releases, not of mappings.
+    
+    Args:
+        release_id (Optional[int]): Report the tables for this release instead of
+            for all releases.
+        
+    Returns:
+        Dict: The mappings and catalog versions, the release ID, the totals of the
+        release (or all releases), the same figures for every target table, and
+        the figures of every release. Coverage is the percentage of target
+        columns with at least one mapping.
+    """
+    if USE_DUMMY_DATA:
+        mappings_version, groups = dummy_data.get_mapping_stats()
+        catalog_version = dummy_data.catalog_version
+        column_counts = _get_target_column_counts()
+        tables = get_target_tables()
+        releases = get_releases()
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+    
+    scope = ALL_RELEASES if release_id is None else release_id
+    total_columns = sum(column_counts.values())
+    by_release: Dict = {}
+    for (group_scope, _), (mapped_columns, status_counts) in groups.items():
+        totals = by_release.setdefault(group_scope, [0, {}])
+        totals[0] += mapped_columns
+        for status, count in status_counts.items():
+            totals[1][status] = totals[1].get(status, 0) + count
+    
+    table_entries = []
+    for table in tables:
+        mapped_columns, status_counts = groups.get((scope, table["id"]), (0, {}))
+        table_entries.append({
+            "target_table_id": table["id"],
+            "target_table_name": table["name"],
+            **_coverage_entry(column_counts.get(table["id"], 0), mapped_columns, status_counts),
+        })
+    release_entries = []
+    for release in releases:
+        mapped_columns, status_counts = by_release.get(release["id"], (0, {}))
+        release_entries.append({
+            "release_id": release["id"],
+            "release_name": release["name"],
+            **_coverage_entry(total_columns, mapped_columns, status_counts),
+        })
+    
+    mapped_columns, status_counts = by_release.get(scope, (0, {}))
+    return {
+        "mappings_version": mappings_version,
+        "catalog_version": catalog_version,
+        "release_id": release_id,
+        **_coverage_entry(total_columns, mapped_columns, status_counts),
+        "tables": table_entries,
+        "releases": release_entries,
+    }
+
+# Mapping statuses that a release promotion moves to "Released"
+PROMOTABLE_STATUSES = ["Draft", "In Progress"]
+
+def promote_release(
+    release_id: int,
+    from_statuses: Optional[List[str]] = None,
+    to_status: str = "Released",
+) -> Optional[Dict]:
+    """
+    Promote every pre-release mapping of a release in one atomic step.
+    
+    The mappings are found through the release index and updated together under
+    a single mappings version, and the release itself is marked with the new status.
+    
+    Args:
+        release_id (int): The ID of the release to promote.
+        from_statuses (Optional[List[str]]): The mapping statuses to promote.
+            Defaults to PROMOTABLE_STATUSES.
+        to_status (str): The status to set.
+        
+    Returns:
+        Optional[Dict]: The "release", the "promoted_ids" and the new mappings
+        "version", or None if the release does not exist.
+    """
+    from_statuses = set(PROMOTABLE_STATUSES if from_statuses is None else from_statuses)
+    
+    if USE_DUMMY_DATA:
+        # The release is marked in the same transaction, so no writer sees promoted
+        # mappings of an unmarked release or the reverse
+        with _write_transaction(), dummy_data.catalog_transaction():
+            release = dummy_data.reference_lookups["releases"].get(release_id)
+            if release is None:
+                return None
+            mappings = dummy_data.get_mappings_by_index("release_id", release_id)
+            updates = {m["id"]: {"status": to_status} for m in mappings if m.get("status") in from_statuses}
+            promoted = dummy_data.update_mappings(updates)
+            if release.get("status") != to_status:
+                release = {**release, "status": to_status}
+                dummy_data.replace_reference_row("releases", release)
+            version = dummy_data.mappings_version
+        return {
+            "release": release,
+            "promoted_ids": [m["id"] for m in promoted],
+            "version": version,
+        }
+    else:
+        # TODO: Implement ORM-based update
+        raise NotImplementedError("ORM-based update not implemented yet")
@@ -0,0 +1,112 @@
+"""
+Memory accounting service module for the STTM application.
+This module reports the approximate memory held by the caches and indexes,
+and optionally the top allocation sites traced by tracemalloc.
+
+Sizes are estimated from samples of each structure, so a report is cheap to
+build but approximate. Tracing is off by default since it slows every
+allocation; turn it on with set_tracemalloc() or PYTHONTRACEMALLOC=1.
+"""
+import tracemalloc
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+from backend.cache import dummy_data
+from backend.service import audit_service, catalog_service, lineage_service, mapping_service
+
+# Frames kept per traced allocation when tracing is started without a frame count
+DEFAULT_TRACEMALLOC_FRAMES = 1
+
+def _max_rss_bytes() -> Optional[int]:
+    """Get the peak resident set size of this process, if the platform reports it."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def get_tracemalloc_report(top: int) -> Dict:
+    """
+    Get the top allocation sites traced by tracemalloc.
+
+    Args:
+        top (int): The number of allocation sites (source lines) to list.
+
+    Returns:
+        Dict: Whether tracing is on, the current and peak traced bytes, and the
+        top sites by bytes. Empty if tracing is off.
+    """
+    if not tracemalloc.is_tracing():
+        return {"tracing": False, "current_bytes": 0, "peak_bytes": 0, "top": []}
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    sites = []
+    for statistic in snapshot.statistics("lineno")[:top]:
+        frame = statistic.traceback[0]
+        sites.append({"location": f"{frame.filename}:{frame.lineno}", "bytes": statistic.size, "blocks": statistic.count})
+    return {"tracing": True, "current_bytes": current, "peak_bytes": peak, "top": sites}
+
+def set_tracemalloc(enabled: bool, frames: int = DEFAULT_TRACEMALLOC_FRAMES) -> Dict:
+    """
+    Start or stop tracing allocations with tracemalloc.
+
+    Stopping drops the traces collected so far.
+
+    Args:
+        enabled (bool): Whether allocations are traced.
+        frames (int): The number of frames stored per allocation.
+
+    Returns:
+        Dict: The tracemalloc report without allocation sites.
+
+    Raises:
+        ValueError: If the frame count is less than 1.
+    """
+    if frames < 1:
+        raise ValueError("frames must be at least 1")
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return get_tracemalloc_report(0)
+
+def get_memory_report(top: int = 0) -> Dict:
+    """
+    Estimate the memory held by the caches and indexes of this process.
+
+    Args:
+        top (int): If positive, also list this many top allocation sites traced
+            by tracemalloc.
+
+    Returns:
+        Dict: The total estimated bytes, the peak resident set size, the usage of
+        the catalog, of every workspace and of the derived caches, and the
+        tracemalloc report if requested.
+    """
+    if mapping_service.USE_DUMMY_DATA:
+        usage = dummy_data.get_memory_usage()
+    else:
+        # TODO: Implement ORM-based memory accounting
+        raise NotImplementedError("ORM-based memory accounting not implemented yet")
+
+    caches = {
+        "lineage_graphs": lineage_service.get_memory_usage(),
+        "catalog_introspection": catalog_service.get_memory_usage(),
+        "audit_log": audit_service.get_memory_usage(),
+    }
+    return {
+        "total_bytes": (
+            usage["catalog"]["total_bytes"]
+            + sum(workspace["total_bytes"] for workspace in usage["workspaces"])
+            + sum(cache["bytes"] for cache in caches.values())
+        ),
+        "max_rss_bytes": _max_rss_bytes(),
+        "catalog": usage["catalog"],
+        "workspaces": usage["workspaces"],
+        "caches": caches,
+        "tracemalloc": get_tracemalloc_report(top) if top > 0 else None,
+    }
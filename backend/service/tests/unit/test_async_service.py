@@ -0,0 +1,57 @@
+"""
+Unit tests for the async service interface and blocking call offload.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from backend.service import async_service, executor, mapping_service
+
+def test_blocking_calls_do_not_stall_the_event_loop():
+    """Test that the event loop keeps running while an offloaded call blocks."""
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        thread_name = await executor.run_blocking(lambda: (time.sleep(0.2), threading.current_thread().name)[1])
+        ticking.cancel()
+        return ticks, thread_name
+
+    ticks, thread_name = asyncio.run(scenario())
+    assert ticks >= 5
+    assert thread_name.startswith("sttm-blocking")
+
+def test_async_service_round_trip():
+    """Test creating, reading and deleting a mapping through the async interface."""
+    mapping_data = {
+        "source_table_id": 3,
+        "source_column_id": 9,
+        "target_table_id": 3,
+        "target_column_id": 9,
+        "release_id": 2,
+    }
+
+    async def scenario():
+        created = await async_service.create_mapping(dict(mapping_data))
+        fetched = await async_service.get_mapping(created["id"])
+        with pytest.raises(mapping_service.MappingConflictError):
+            await async_service.create_mapping(dict(mapping_data))
+        deleted = await async_service.delete_mapping(created["id"])
+        return created, fetched, deleted
+
+    created, fetched, deleted = asyncio.run(scenario())
+    assert fetched == created
+    assert deleted is True
+    assert mapping_service.get_mapping(created["id"]) is None
+
+def test_executor_restarts_after_shutdown():
+    """Test that blocking calls still work after the executor was shut down."""
+    executor.shutdown()
+    assert asyncio.run(executor.run_blocking(sum, [1, 2, 3])) == 6
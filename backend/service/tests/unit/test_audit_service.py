@@ -0,0 +1,99 @@
+"""
+Unit tests for the audit service.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from backend.cache import audit_log
+from backend.service import audit_service, mapping_service, workspace_service
+
+@pytest.fixture
+def audit_workspace(tmp_path):
+    """Log to a temporary directory and write to a workspace of the test's own."""
+    audit_service.configure_audit_log(str(tmp_path))
+    name = f"audit-{tmp_path.name}"[:64]
+    workspace_service.create_workspace(name)
+    try:
+        with workspace_service.use_workspace(name):
+            yield tmp_path
+    finally:
+        audit_service.configure_audit_log(None)
+
+def _mapping(column_id, release_id=1):
+    return {
+        "source_table_id": 1,
+        "source_column_id": column_id,
+        "target_table_id": 1,
+        "target_column_id": column_id,
+        "release_id": release_id,
+        "status": "Draft",
+    }
+
+def test_changes_are_logged_with_user_and_diff(audit_workspace):
+    """Test that writes are logged with their user and only the changed fields."""
+    with audit_service.use_user("alice"):
+        created = mapping_service.create_mapping(_mapping(1))
+    with audit_service.use_user("bob"):
+        mapping_service.update_mapping(created["id"], {"status": "Approved"})
+        mapping_service.delete_mapping(created["id"])
+    
+    entries = audit_service.get_audit_entries(mapping_id=created["id"])
+    assert [(e["action"], e["user"]) for e in entries] == [("delete", "bob"), ("update", "bob"), ("create", "alice")]
+    assert entries[1]["changes"] == {"status": ["Draft", "Approved"]}
+    assert entries[2]["changes"]["source_column_id"] == [None, 1]
+    assert entries[0]["release_id"] == 1
+    
+    assert [e["action"] for e in audit_service.get_audit_entries(user="alice")] == ["create"]
+    assert audit_service.get_audit_entries(limit=1) == entries[:1]
+
+def test_queries_span_compacted_segments(audit_workspace):
+    """Test filtering by user, release and time across sealed, compacted and buffered changes."""
+    before = datetime.now() - timedelta(seconds=1)
+    ids = []
+    for round_number in range(audit_log.COMPACTION_MIN_SEGMENTS):
+        with audit_service.use_user("carol" if round_number % 2 else "dave"):
+            ids.append(mapping_service.create_mapping(_mapping(round_number % 3 + 1, release_id=1 + round_number % 2))["id"])
+        stats = audit_service.maintain(force=True)
+    assert stats["segments"] == 1
+    assert stats["entries"] == audit_log.COMPACTION_MIN_SEGMENTS
+    assert list(audit_workspace.glob("*.seg"))
+    
+    with audit_service.use_user("carol"):
+        mapping_service.update_mapping(ids[1], {"description": "Buffered"})
+    
+    entries = audit_service.get_audit_entries(user="carol", release_id=2)
+    assert [(e["mapping_id"], e["action"]) for e in entries] == [(ids[1], "update"), (ids[3], "create"), (ids[1], "create")]
+    assert audit_service.get_audit_entries(user="carol", release_id=1) == []
+    assert len(audit_service.get_audit_entries(start=before)) == audit_log.COMPACTION_MIN_SEGMENTS + 1
+    assert audit_service.get_audit_entries(end=before) == []
+    
+    for mapping_id in ids:
+        mapping_service.delete_mapping(mapping_id)
+
+def test_full_buffer_is_sealed_off_the_write_path(audit_workspace, monkeypatch):
+    """Test that a full buffer is sealed in the background and stays queryable meanwhile."""
+    monkeypatch.setattr(audit_log, "FLUSH_ENTRIES", 2)
+    log = audit_service._log
+    write = log._write
+    unblocked = threading.Event()
+    
+    def blocked_write(name, data):
+        unblocked.wait(timeout=5)
+        write(name, data)
+    
+    monkeypatch.setattr(log, "_write", blocked_write)
+    ids = [mapping_service.create_mapping(_mapping(column_id))["id"] for column_id in (1, 2)]
+    try:
+        # The writes returned while the segment is still waiting to be written
+        assert not list(audit_workspace.glob("*.seg"))
+        assert len(audit_service.get_audit_entries()) == 2
+    finally:
+        unblocked.set()
+    
+    stats = audit_service.maintain(force=True)
+    assert (stats["entries"], stats["buffered_entries"]) == (2, 0)
+    assert sorted(e["mapping_id"] for e in audit_service.get_audit_entries()) == ids
+    
+    for mapping_id in ids:
+        mapping_service.delete_mapping(mapping_id)
@@ -0,0 +1,93 @@
+"""
+Unit tests for the catalog service.
+"""
+import sqlite3
+
+import pytest
+from backend.cache import dummy_data
+from backend.service import catalog_service, mapping_service
+
+SOURCE_SCHEMA = """
+CREATE TABLE customer (customer_id INTEGER, customer_name VARCHAR, email VARCHAR);
+CREATE TABLE product (product_id INTEGER, product_name VARCHAR, price DECIMAL);
+CREATE TABLE "order" (order_id INTEGER, customer_id INTEGER, order_date DATE);
+CREATE TABLE invoice (invoice_id INTEGER, amount DECIMAL);
+"""
+
+@pytest.fixture
+def source_catalog():
+    """Restore the source catalog after each test."""
+    tables = [dict(row) for row in dummy_data.get_reference_rows("source_tables")]
+    columns = [dict(row) for row in dummy_data.get_reference_rows("source_columns")]
+    yield
+    with dummy_data.write_transaction():
+        dummy_data.reference_caches["source_tables"][:] = tables
+        dummy_data.reference_caches["source_columns"][:] = columns
+        dummy_data.mark_catalog_changed()
+
+def _create_database(path, script):
+    connection = sqlite3.connect(path)
+    connection.executescript(script)
+    connection.close()
+
+def test_introspect_sqlite(tmp_path):
+    """Test reading all tables and normalized column types in one pass."""
+    path = str(tmp_path / "source.db")
+    _create_database(path, "CREATE TABLE t (a integer, b varchar( 20 ));")
+    assert catalog_service.introspect_sqlite(path) == {"t": [("a", "INTEGER"), ("b", "VARCHAR(20)")]}
+
+def test_ingest_applies_only_changes(tmp_path, source_catalog):
+    """Test that ingestion adds, drops and retypes only what changed."""
+    path = str(tmp_path / "source.db")
+    _create_database(path, SOURCE_SCHEMA)
+    column_ids = {(c["table_id"], c["name"]): c["id"] for c in mapping_service.get_source_columns()}
+
+    result = catalog_service.ingest_sqlite_catalog("source", path)
+    assert result["tables_scanned"] == 4
+    assert (result["tables_added"], result["tables_changed"], result["tables_dropped"]) == (1, 0, 0)
+    assert (result["columns_added"], result["columns_dropped"], result["columns_retyped"]) == (2, 0, 0)
+    invoice = next(t for t in mapping_service.get_source_tables() if t["name"] == "invoice")
+    assert {c["name"] for c in mapping_service.get_source_columns(invoice["id"])} == {"invoice_id", "amount"}
+
+    # An unchanged database changes nothing
+    catalog_version = dummy_data.catalog_version
+    result = catalog_service.ingest_sqlite_catalog("source", path)
+    assert result["tables_added"] + result["tables_changed"] + result["tables_dropped"] == 0
+    assert result["catalog_version"] == catalog_version
+
+    orphaned = set(dummy_data.hash_indexes["source_column_id"].get(column_ids[(1, "email")]))
+    orphaned |= set(dummy_data.hash_indexes["source_column_id"].get(column_ids[(2, "product_id")]))
+    orphaned |= set(dummy_data.hash_indexes["source_column_id"].get(column_ids[(2, "product_name")]))
+    orphaned |= set(dummy_data.hash_indexes["source_column_id"].get(column_ids[(2, "price")]))
+    _create_database(path, """
+        ALTER TABLE customer DROP COLUMN email;
+        DROP TABLE "order";
+        CREATE TABLE "order" (order_id INTEGER, customer_id INTEGER, order_date TIMESTAMP);
+        DROP TABLE product;
+    """)
+    result = catalog_service.ingest_sqlite_catalog("source", path)
+    assert result["catalog_version"] == catalog_version + 1
+    assert (result["tables_added"], result["tables_changed"], result["tables_dropped"]) == (0, 2, 1)
+    assert (result["columns_added"], result["columns_dropped"], result["columns_retyped"]) == (0, 4, 1)
+    assert result["orphaned_mapping_ids"] == sorted(orphaned)
+
+    columns = {(c["table_id"], c["name"]): c for c in mapping_service.get_source_columns()}
+    assert {t["name"] for t in mapping_service.get_source_tables()} == {"customer", "order", "invoice"}
+    assert columns[(3, "order_date")]["id"] == column_ids[(3, "order_date")]
+    assert columns[(3, "order_date")]["data_type"] == "TIMESTAMP"
+    assert columns[(1, "customer_id")]["id"] == column_ids[(1, "customer_id")]
+    assert (1, "email") not in columns
+
+def test_ingest_rejects_invalid_side(tmp_path):
+    """Test that only the source and target sides can be ingested."""
+    path = str(tmp_path / "source.db")
+    _create_database(path, SOURCE_SCHEMA)
+    with pytest.raises(ValueError):
+        catalog_service.ingest_sqlite_catalog("middle", path)
+
+def test_resolve_catalog_database_rejects_paths():
+    """Test that databases can only be named by file name."""
+    with pytest.raises(ValueError):
+        catalog_service.resolve_catalog_database("../secret.db")
+    with pytest.raises(FileNotFoundError):
+        catalog_service.resolve_catalog_database("missing.db")
@@ -0,0 +1,54 @@
+"""
+Unit tests for the type compatibility service.
+"""
+import pytest
+from backend.service import compatibility_service, mapping_service
+
+def test_canonical_type():
+    """Test normalizing declared types to canonical types."""
+    assert compatibility_service.canonical_type("varchar(255)") == "VARCHAR"
+    assert compatibility_service.canonical_type("TEXT") == "VARCHAR"
+    assert compatibility_service.canonical_type("Double Precision") == "FLOAT"
+    assert compatibility_service.canonical_type("NUMERIC(10, 2)") == "DECIMAL"
+    assert compatibility_service.canonical_type("GEOMETRY") == compatibility_service.UNKNOWN_TYPE
+    assert compatibility_service.canonical_type(None) == compatibility_service.UNKNOWN_TYPE
+
+def test_compatibility_level():
+    """Test scoring type pairs against the compatibility matrix."""
+    assert compatibility_service.compatibility_level("DATE", "DATE") == "exact"
+    assert compatibility_service.compatibility_level("INTEGER", "DECIMAL") == "safe"
+    assert compatibility_service.compatibility_level("DECIMAL", "INTEGER") == "lossy"
+    assert compatibility_service.compatibility_level("DATE", "INTEGER") == "incompatible"
+    assert compatibility_service.compatibility_level("UNKNOWN", "INTEGER") == "unknown"
+
+def test_type_compatibility_report():
+    """Test counting the type pairs of all mappings and of one release."""
+    before = compatibility_service.get_type_compatibility_report()
+    before_release = compatibility_service.get_type_compatibility_report(release_id=2)
+    created = mapping_service.create_mappings([
+        # DATE -> INTEGER
+        {"source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 8, "release_id": 2},
+        # DECIMAL -> INTEGER
+        {"source_table_id": 2, "source_column_id": 6, "target_table_id": 3, "target_column_id": 7, "release_id": 2},
+        # INTEGER -> DECIMAL
+        {"source_table_id": 1, "source_column_id": 1, "target_table_id": 2, "target_column_id": 6, "release_id": 2},
+    ])
+    try:
+        report = compatibility_service.get_type_compatibility_report()
+        assert report["total"] == before["total"] + 3
+        assert report["levels"]["incompatible"] == before["levels"]["incompatible"] + 1
+        assert report["levels"]["lossy"] == before["levels"]["lossy"] + 1
+        assert report["levels"]["safe"] == before["levels"]["safe"] + 1
+        assert {created[0]["id"], created[1]["id"]} <= set(report["flagged_mapping_ids"])
+        assert created[2]["id"] not in report["flagged_mapping_ids"]
+
+        release_report = compatibility_service.get_type_compatibility_report(release_id=2)
+        assert release_report["total"] == before_release["total"] + 3
+        assert release_report["flagged_total"] == before_release["flagged_total"] + 2
+
+        limited = compatibility_service.get_type_compatibility_report(flagged_limit=1)
+        assert len(limited["flagged_mapping_ids"]) == 1
+        assert limited["flagged_total"] == report["flagged_total"]
+    finally:
+        for mapping in created:
+            mapping_service.delete_mapping(mapping["id"])
@@ -0,0 +1,86 @@
+"""
+Unit tests for the mapping change event service.
+"""
+import asyncio
+import pytest
+from backend.service import event_service, mapping_service
+
+def _new_mapping(column_id, release_id=2):
+    """Build mapping data for a test mapping between same-numbered product/order columns."""
+    return {
+        "source_table_id": 2 if column_id <= 6 else 3,
+        "source_column_id": column_id,
+        "target_table_id": 2 if column_id <= 6 else 3,
+        "target_column_id": column_id,
+        "release_id": release_id,
+        "status": "Draft",
+    }
+
+def test_subscription_coalesces_bursts():
+    """Test that a burst of edits is delivered as one batch."""
+    async def scenario():
+        subscription = event_service.subscribe(release_id=2)
+        try:
+            created = mapping_service.create_mapping(_new_mapping(5))
+            for i in range(5):
+                mapping_service.update_mapping(created["id"], {"description": f"Edit {i}"})
+            deleted = mapping_service.create_mapping(_new_mapping(6))
+            mapping_service.delete_mapping(deleted["id"])
+            
+            # Mappings outside the subscribed release are filtered out
+            other = mapping_service.create_mapping(_new_mapping(5, release_id=1))
+            
+            batch = await subscription.next_batch(timeout=1.0)
+            assert batch["type"] == "changes"
+            assert [m["id"] for m in batch["upserts"]] == [created["id"]]
+            assert batch["upserts"][0]["description"] == "Edit 4"
+            assert batch["deleted_ids"] == [deleted["id"]]
+            
+            # Nothing else is pending
+            assert await subscription.next_batch(timeout=0.1) is None
+            
+            mapping_service.delete_mapping(created["id"])
+            mapping_service.delete_mapping(other["id"])
+        finally:
+            event_service.unsubscribe(subscription)
+    
+    asyncio.run(scenario())
+    assert event_service.get_subscriber_count() == 0
+
+def test_mapping_leaving_filter_is_removed():
+    """Test that a mapping moved out of the subscribed release is sent as a removal."""
+    created = mapping_service.create_mapping(_new_mapping(5))
+    
+    async def scenario():
+        subscription = event_service.subscribe(release_id=2)
+        try:
+            mapping_service.update_mapping(created["id"], {"release_id": 3})
+            
+            batch = await subscription.next_batch(timeout=1.0)
+            assert batch["upserts"] == []
+            assert batch["deleted_ids"] == [created["id"]]
+        finally:
+            event_service.unsubscribe(subscription)
+    
+    try:
+        asyncio.run(scenario())
+    finally:
+        mapping_service.delete_mapping(created["id"])
+
+def test_slow_subscriber_gets_resync():
+    """Test that a subscriber with too many pending changes is asked to resync."""
+    async def scenario():
+        subscription = event_service.subscribe(max_pending=2)
+        try:
+            created = [mapping_service.create_mapping(_new_mapping(column_id)) for column_id in (5, 6, 7)]
+            
+            batch = await subscription.next_batch(timeout=1.0)
+            assert batch["type"] == "resync"
+            assert batch["version"] == mapping_service.get_data_versions()["mappings"]
+            
+            for mapping in created:
+                mapping_service.delete_mapping(mapping["id"])
+        finally:
+            event_service.unsubscribe(subscription)
+    
+    asyncio.run(scenario())
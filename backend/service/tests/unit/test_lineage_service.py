@@ -0,0 +1,97 @@
+"""
+Unit tests for the lineage service.
+"""
+import sys
+import threading
+
+import pytest
+from backend.cache import dummy_data
+from backend.service import lineage_service, mapping_service
+
+@pytest.fixture
+def layered_catalog():
+    """Add dim_customer as a source table so that lineage continues past the first layer."""
+    table = {"id": 100, "name": "dim_customer", "description": "Customer dimension as a source"}
+    column = {"id": 100, "table_id": 100, "name": "customer_key", "data_type": "INTEGER", "description": ""}
+    dummy_data.source_tables_cache.append(table)
+    dummy_data.source_columns_cache.append(column)
+    dummy_data.mark_catalog_changed()
+    
+    # dim_customer.customer_key -> fact_order.customer_key
+    mapping = mapping_service.create_mapping({
+        "source_table_id": 100,
+        "source_column_id": 100,
+        "target_table_id": 3,
+        "target_column_id": 8,
+        "status": "Draft",
+    })
+    yield mapping
+    
+    mapping_service.delete_mapping(mapping["id"])
+    dummy_data.source_tables_cache.remove(table)
+    dummy_data.source_columns_cache.remove(column)
+    dummy_data.mark_catalog_changed()
+
+def test_downstream_lineage_crosses_layers(layered_catalog):
+    """Test following customer.customer_id through dim_customer into fact_order."""
+    lineage = lineage_service.get_lineage("source", 1, "downstream", 5)
+    nodes = {(n["side"], n["column_id"]): n for n in lineage["nodes"]}
+    
+    assert nodes[("target", 1)]["depth"] == 1
+    assert nodes[("source", 100)]["depth"] == 1
+    assert nodes[("target", 8)]["depth"] == 2
+    assert nodes[("target", 8)]["table_name"] == "fact_order"
+    assert any(e["kind"] == "same_column" and e["to_column_id"] == 100 for e in lineage["edges"])
+    assert lineage["truncated"] is False
+    
+    # A depth limit stops the traversal after the first layer
+    lineage = lineage_service.get_lineage("source", 1, "downstream", 1)
+    assert ("target", 8) not in {(n["side"], n["column_id"]) for n in lineage["nodes"]}
+    assert lineage["truncated"] is True
+
+def test_upstream_lineage_follows_writes(layered_catalog):
+    """Test that upstream lineage reflects mapping updates and deletes."""
+    lineage = lineage_service.get_lineage("target", 8, "upstream", 5)
+    nodes = {(n["side"], n["column_id"]) for n in lineage["nodes"]}
+    assert ("source", 100) in nodes
+    assert ("source", 1) in nodes
+    
+    # Repointing the mapping removes the old edge
+    mapping_service.update_mapping(layered_catalog["id"], {"target_column_id": 9})
+    lineage = lineage_service.get_lineage("target", 8, "upstream", 5)
+    assert ("source", 100) not in {(n["side"], n["column_id"]) for n in lineage["nodes"]}
+    mapping_service.update_mapping(layered_catalog["id"], {"target_column_id": 8})
+
+def test_lineage_during_concurrent_writes():
+    """Test that traversals are not disturbed by writes changing the graph on other threads."""
+    lineage_service.get_lineage("source", 1, "downstream", 5)
+    stop = threading.Event()
+    # Switch threads often, so that writes land in the middle of traversals
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    
+    def write():
+        # Add and remove edges from source column 1, so its adjacency keeps changing size
+        while not stop.is_set():
+            added = [
+                dummy_data.add_mapping({"source_column_id": 1, "target_column_id": 1000 + i, "status": "Draft"})
+                for i in range(200)
+            ]
+            for mapping in added:
+                dummy_data.delete_mapping(mapping["id"])
+    
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(2000):
+            assert lineage_service.get_lineage("source", 1, "downstream", 5) is not None
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(switch_interval)
+
+def test_lineage_invalid_arguments():
+    """Test lineage requests for unknown columns and directions."""
+    assert lineage_service.get_lineage("source", 9999, "downstream", 5) is None
+    with pytest.raises(ValueError):
+        lineage_service.get_lineage("source", 1, "sideways", 5)
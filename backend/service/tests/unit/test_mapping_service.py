@@ -52,7 +52,7 @@ def test_create_mapping():
         "source_column_id": 3,
         "target_table_id": 1,
         "target_column_id": 3,
-        "release_id": 3,
+        "release_id": 2,
         "jira_ticket": "STTM-401",
         "status": "Draft",
         "description": "Map customer email to customer email",
@@ -307,4 +307,409 @@ def test_get_enriched_mappings():
         
         # Check release name if release_id is present
         if "release_id" in mapping and mapping["release_id"] is not None:
-            assert "release_name" in mapping 
\ No newline at end of file
+            assert "release_name" in mapping 
+def test_get_mappings_page_sorted():
+    """Test getting a sorted page of mappings."""
+    # Sort by target table name, descending
+    mappings = mapping_service.get_mappings_page(sort="-target_table_name")
+    names = [m["target_table_name"] for m in mappings]
+    assert names == sorted(names, reverse=True)
+    
+    # Check that pagination walks the same order
+    first_page = mapping_service.get_mappings_page(sort="-target_table_name", limit=2)
+    second_page = mapping_service.get_mappings_page(sort="-target_table_name", offset=2, limit=2)
+    assert [m["id"] for m in first_page + second_page] == [m["id"] for m in mappings[:4]]
+    
+    # Test filtering while sorting
+    release_mappings = mapping_service.get_mappings_page(release_id=1, sort="source_column_name")
+    assert all(m["release_id"] == 1 for m in release_mappings)
+    
+    # Test sorting by an unsupported field
+    with pytest.raises(ValueError):
+        mapping_service.get_mappings_page(sort="jira_ticket")
+
+def test_sort_index_follows_updates():
+    """Test that sort indexes are maintained on update and delete."""
+    created_mapping = mapping_service.create_mapping({
+        "source_table_id": 1,
+        "source_column_id": 1,
+        "target_table_id": 1,
+        "target_column_id": 1,
+        "status": "Draft",
+    })
+    
+    # The most recently updated mapping comes first
+    mapping_service.update_mapping(created_mapping["id"], {"description": "Touched"})
+    latest = mapping_service.get_mappings_page(sort="-updated_at", limit=1)
+    assert latest[0]["id"] == created_mapping["id"]
+    
+    # Deleted mappings drop out of the index
+    mapping_service.delete_mapping(created_mapping["id"])
+    ids = [m["id"] for m in mapping_service.get_mappings_page(sort="-updated_at")]
+    assert created_mapping["id"] not in ids
+
+def test_change_log_compaction():
+    """Test that compacting the change log keeps delta sync answers intact."""
+    version = mapping_service.get_data_versions()["mappings"]
+    created_mapping = mapping_service.create_mapping({
+        "source_table_id": 1,
+        "source_column_id": 2,
+        "target_table_id": 1,
+        "target_column_id": 2,
+    })
+    for i in range(3):
+        mapping_service.update_mapping(created_mapping["id"], {"description": f"Edit {i}"})
+    
+    dummy_data.compact_change_log()
+    
+    changes = mapping_service.get_mapping_changes(version)
+    assert [m["id"] for m in changes["upserts"]] == [created_mapping["id"]]
+    assert changes["upserts"][0]["description"] == "Edit 2"
+    assert len([e for e in dummy_data.change_log if e[1] == created_mapping["id"]]) == 1
+    
+    mapping_service.delete_mapping(created_mapping["id"])
+
+def test_mapping_changes_since_future_version():
+    """Test that a version newer than the current one gets all mappings."""
+    version = mapping_service.get_data_versions()["mappings"]
+    
+    changes = mapping_service.get_mapping_changes(version + 999)
+    assert changes["since"] is None
+    assert changes["version"] == version
+    assert len(changes["upserts"]) == len(dummy_data.get_all_mappings())
+    assert changes["deleted_ids"] == []
+    
+    assert mapping_service.get_mapping_changes(version)["since"] == version
+
+def test_get_column_impact_follows_writes():
+    """Test that column impact is kept current by the reverse indexes."""
+    created_mapping = mapping_service.create_mapping({
+        "source_table_id": 3,
+        "source_column_id": 9,
+        "target_table_id": 3,
+        "target_column_id": 9,
+        "release_id": 3,
+        "jira_ticket": "STTM-901",
+    })
+    impact = mapping_service.get_column_impact("source", [9])["impacts"][0]
+    assert created_mapping["id"] in impact["mapping_ids"]
+    assert "STTM-901" in impact["jira_tickets"]
+    
+    # Repointing the mapping moves it to the other column's impact
+    mapping_service.update_mapping(created_mapping["id"], {"source_column_id": 7})
+    assert created_mapping["id"] not in mapping_service.get_column_impact("source", [9])["impacts"][0]["mapping_ids"]
+    assert created_mapping["id"] in mapping_service.get_column_impact("source", [7])["impacts"][0]["mapping_ids"]
+    
+    mapping_service.delete_mapping(created_mapping["id"])
+    assert created_mapping["id"] not in mapping_service.get_column_impact("source", [7])["impacts"][0]["mapping_ids"]
+    
+    with pytest.raises(ValueError):
+        mapping_service.get_column_impact("middle", [1])
+
+def test_create_mapping_duplicate_and_conflict():
+    """Test that duplicate and conflicting mappings within a release are rejected."""
+    mapping_data = {
+        "source_table_id": 2,
+        "source_column_id": 6,
+        "target_table_id": 2,
+        "target_column_id": 6,
+        "release_id": 1,
+    }
+    created_mapping = mapping_service.create_mapping(dict(mapping_data))
+    
+    # The same pair in the same release is a duplicate
+    with pytest.raises(mapping_service.MappingConflictError) as excinfo:
+        mapping_service.create_mapping(dict(mapping_data))
+    assert excinfo.value.errors[0]["code"] == "duplicate"
+    assert excinfo.value.errors[0]["mapping_ids"] == [created_mapping["id"]]
+    
+    # A different source feeding the same target in the same release is a conflict
+    with pytest.raises(mapping_service.MappingConflictError) as excinfo:
+        mapping_service.create_mapping({**mapping_data, "source_column_id": 5})
+    assert excinfo.value.errors[0]["code"] == "conflict"
+    
+    # The same pair in another release is fine
+    other_release = mapping_service.create_mapping({**mapping_data, "release_id": 2})
+    
+    # Updates are checked too, excluding the mapping being updated
+    mapping_service.update_mapping(created_mapping["id"], {"description": "No key change"})
+    with pytest.raises(mapping_service.MappingConflictError):
+        mapping_service.update_mapping(other_release["id"], {"release_id": 1})
+    
+    mapping_service.delete_mapping(created_mapping["id"])
+    mapping_service.delete_mapping(other_release["id"])
+
+def test_create_mappings_bulk():
+    """Test creating many mappings with per-row validation."""
+    rows = [
+        {"source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 7, "release_id": 1},
+        {"source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 9, "release_id": 1},
+    ]
+    
+    # Duplicates within the batch and missing fields are reported per row, and nothing is written
+    initial_count = len(mapping_service.get_all_mappings())
+    with pytest.raises(mapping_service.MappingValidationError) as excinfo:
+        mapping_service.create_mappings(rows + [dict(rows[0]), {"source_table_id": 3}])
+    assert [(e["index"], e["code"]) for e in excinfo.value.errors] == [(2, "duplicate"), (3, "missing_field")]
+    assert len(mapping_service.get_all_mappings()) == initial_count
+    
+    # The batch is one write under one mappings version
+    version = mapping_service.get_data_versions()["mappings"]
+    created = mapping_service.create_mappings(rows)
+    assert [m["target_column_id"] for m in created] == [7, 9]
+    assert all(m["status"] == "Draft" for m in created)
+    assert mapping_service.get_data_versions()["mappings"] == version + 1
+    assert sorted(m["id"] for m in mapping_service.get_mapping_changes(version)["upserts"]) == [m["id"] for m in created]
+    draft_ids = {m["id"] for m in mapping_service.get_mappings_by_status("Draft")}
+    assert {m["id"] for m in created} <= draft_ids
+    
+    for mapping in created:
+        mapping_service.delete_mapping(mapping["id"])
+
+def test_create_mapping_invalid_references():
+    """Test that mappings with invalid foreign keys are rejected."""
+    mapping_data = {
+        "source_table_id": 1,
+        "source_column_id": 4,  # Belongs to source table 2
+        "target_table_id": 1,
+        "target_column_id": 999,
+        "release_id": 99,
+    }
+    with pytest.raises(mapping_service.MappingValidationError) as excinfo:
+        mapping_service.create_mapping(mapping_data)
+    assert not isinstance(excinfo.value, mapping_service.MappingConflictError)
+    assert {e["field"] for e in excinfo.value.errors} == {"source_column_id", "target_column_id", "release_id"}
+    
+    # Patches are validated against the merged mapping
+    first_mapping = mapping_service.get_all_mappings()[0]
+    with pytest.raises(mapping_service.MappingValidationError):
+        mapping_service.update_mapping(first_mapping["id"], {"source_table_id": 2})
+    
+    # Bulk batches report reference errors per row
+    with pytest.raises(mapping_service.MappingValidationError) as excinfo:
+        mapping_service.create_mappings([
+            {"source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 7},
+            {**mapping_data, "release_id": None},
+        ])
+    assert {e["index"] for e in excinfo.value.errors} == {1}
+
+def test_promote_release():
+    """Test promoting all pre-release mappings of a release at once."""
+    release = {"id": 50, "name": "R5.0", "description": "Promotion test", "status": "In Progress"}
+    dummy_data.releases_cache.append(release)
+    dummy_data.mark_catalog_changed()
+    
+    created = mapping_service.create_mappings([
+        {"source_table_id": 1, "source_column_id": 1, "target_table_id": 1, "target_column_id": 1,
+         "release_id": 50, "status": "Draft"},
+        {"source_table_id": 1, "source_column_id": 2, "target_table_id": 1, "target_column_id": 2,
+         "release_id": 50, "status": "In Progress"},
+        {"source_table_id": 1, "source_column_id": 3, "target_table_id": 1, "target_column_id": 3,
+         "release_id": 50, "status": "Rejected"},
+    ])
+    version = mapping_service.get_data_versions()["mappings"]
+    
+    result = mapping_service.promote_release(50)
+    assert result["promoted_ids"] == [created[0]["id"], created[1]["id"]]
+    assert result["release"]["status"] == "Released"
+    # The release row is replaced, not modified under readers holding the old one
+    assert release["status"] == "In Progress"
+    assert result["release"] in mapping_service.get_releases()
+    
+    # One version covers the whole promotion, and the status index follows it
+    assert result["version"] == version + 1
+    released_ids = {m["id"] for m in mapping_service.get_mappings_by_status("Released")}
+    assert {created[0]["id"], created[1]["id"]} <= released_ids
+    assert mapping_service.get_mapping(created[2]["id"])["status"] == "Rejected"
+    changes = mapping_service.get_mapping_changes(version)
+    assert sorted(m["id"] for m in changes["upserts"]) == result["promoted_ids"]
+    
+    assert mapping_service.promote_release(9999) is None
+    
+    for mapping in created:
+        mapping_service.delete_mapping(mapping["id"])
+    dummy_data.releases_cache.remove(result["release"])
+    dummy_data.mark_catalog_changed()
+
+def test_snapshots_are_immutable_and_stable():
+    """Test that readers get shared, read-only snapshots that writes never change."""
+    snapshot = mapping_service.get_all_mappings()
+    assert mapping_service.get_all_mappings() is snapshot
+    with pytest.raises(TypeError):
+        snapshot.append({})
+    with pytest.raises(TypeError):
+        mapping_service.get_source_tables()[0] = {}
+    
+    created = mapping_service.create_mapping({
+        "source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 9,
+        "release_id": 1,
+    })
+    assert created not in snapshot
+    assert created in mapping_service.get_all_mappings()
+    
+    # An iteration in progress keeps seeing the mappings as of its start
+    pages = dummy_data.iter_sorted_mappings("id")
+    first = next(pages)
+    mapping_service.update_mapping(created["id"], {"description": "Changed while iterating"})
+    mapping_service.delete_mapping(created["id"])
+    rest = list(pages)
+    assert [first, *rest][-1] == created
+    assert len(rest) + 1 == len(snapshot) + 1
+
+def test_snapshots_survive_writes_across_chunks():
+    """Test that snapshots spanning many copy-on-write chunks and sort blocks keep their rows after writes."""
+    with dummy_data.write_transaction():
+        created = dummy_data.add_mappings([
+            {"source_table_id": 1, "source_column_id": 1, "target_table_id": 1, "target_column_id": 1,
+             "release_id": 1, "status": "Draft"}
+            for _ in range(600)
+        ])
+    created_ids = [mapping["id"] for mapping in created]
+    before = list(dummy_data.iter_sorted_mappings("id"))
+    pages = dummy_data.iter_sorted_mappings("id", descending=True)
+    assert next(pages) == created[-1]
+
+    for mapping_id in created_ids[::50]:
+        dummy_data.update_mapping(mapping_id, {"description": "Changed while iterating"})
+    for mapping_id in created_ids[1::2]:
+        dummy_data.delete_mapping(mapping_id)
+
+    assert [created[-1], *pages] == before[::-1]
+    assert dummy_data.get_mapping(created_ids[0])["description"] == "Changed while iterating"
+    assert created[0].get("description") != "Changed while iterating"
+    after = [m["id"] for m in dummy_data.iter_sorted_mappings("id")]
+    assert after == [m["id"] for m in before if m["id"] not in set(created_ids[1::2])]
+    for mapping_id in created_ids[::2]:
+        dummy_data.delete_mapping(mapping_id)
+
+def _recount_stats(release_id=None):
+    """Compute the mapping stats of a release (or all releases) by scanning every mapping."""
+    mappings = [m for m in mapping_service.get_all_mappings() if release_id is None or m["release_id"] == release_id]
+    tables = {}
+    for mapping in mappings:
+        columns, statuses = tables.setdefault(mapping["target_table_id"], (set(), {}))
+        columns.add(mapping["target_column_id"])
+        statuses[mapping["status"]] = statuses.get(mapping["status"], 0) + 1
+    return {table_id: (len(columns), statuses) for table_id, (columns, statuses) in tables.items()}
+
+def test_mapping_stats_follow_writes():
+    """Test that the maintained coverage and status counters match a full recount after writes."""
+    def assert_stats_match():
+        for release_id in (None, 1, 2):
+            stats = mapping_service.get_mapping_stats(release_id)
+            expected = _recount_stats(release_id)
+            for table in stats["tables"]:
+                mapped_columns, statuses = expected.get(table["target_table_id"], (0, {}))
+                assert table["mapped_columns"] == mapped_columns
+                assert table["status_counts"] == statuses
+            assert stats["mapping_count"] == sum(sum(s.values()) for _, s in expected.values())
+    
+    assert_stats_match()
+    before = mapping_service.get_mapping_stats()
+    first = mapping_service.create_mapping({
+        "source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 9,
+        "release_id": 1, "status": "In Progress",
+    })
+    second = mapping_service.create_mapping({
+        "source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 9,
+        "release_id": 2,
+    })
+    assert_stats_match()
+    stats = mapping_service.get_mapping_stats()
+    fact_order = next(t for t in stats["tables"] if t["target_table_id"] == 3)
+    fact_order_before = next(t for t in before["tables"] if t["target_table_id"] == 3)
+    # Two mappings of one column count as one mapped column
+    assert fact_order["mapped_columns"] == fact_order_before["mapped_columns"] + 1
+    assert stats["mapping_count"] == before["mapping_count"] + 2
+    
+    mapping_service.update_mapping(first["id"], {"status": "Released"})
+    mapping_service.update_mapping(second["id"], {"target_table_id": 2, "target_column_id": 5})
+    assert_stats_match()
+    mapping_service.delete_mapping(first["id"])
+    mapping_service.delete_mapping(second["id"])
+    assert_stats_match()
+    after = mapping_service.get_mapping_stats()
+    assert after["tables"] == before["tables"]
+    assert after["releases"] == before["releases"]
+
+def test_get_mappings_by_ids():
+    """Test getting enriched mappings by ID, with the missing IDs listed."""
+    all_ids = [m["id"] for m in mapping_service.get_all_mappings()]
+    batch = mapping_service.get_mappings_by_ids([all_ids[1], 99999, all_ids[0], all_ids[1]])
+    assert [m["id"] for m in batch["mappings"]] == [all_ids[1], all_ids[0]]
+    assert batch["mappings"][0]["source_table_name"] is not None
+    assert batch["missing_ids"] == [99999]
+
+def test_patch_mappings():
+    """Test setting fields on many mappings as one validated write."""
+    rows = [
+        {"source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 7, "release_id": 1},
+        {"source_table_id": 3, "source_column_id": 9, "target_table_id": 3, "target_column_id": 9, "release_id": 1},
+    ]
+    created = mapping_service.create_mappings(rows)
+    ids = [m["id"] for m in created]
+    mapping_service.update_mapping(ids[1], {"status": "Approved"})
+    
+    # One version per patch; mappings that already have the values and unknown IDs are reported
+    version = mapping_service.get_data_versions()["mappings"]
+    result = mapping_service.patch_mappings({"status": "Approved"}, mapping_ids=ids + [99999])
+    assert result["updated_ids"] == [ids[0]]
+    assert result["unchanged_ids"] == [ids[1]]
+    assert result["missing_ids"] == [99999]
+    assert result["version"] == version + 1
+    assert mapping_service.get_mapping(ids[0])["status"] == "Approved"
+    
+    # Key changes are validated across the whole range, and nothing is written on error
+    with pytest.raises(mapping_service.MappingConflictError) as excinfo:
+        mapping_service.patch_mappings({"target_column_id": 9}, mapping_ids=ids)
+    assert excinfo.value.errors[0]["mapping_id"] == ids[0]
+    assert mapping_service.get_mapping(ids[0])["target_column_id"] == 7
+    
+    # Mappings can be selected by filter instead
+    result = mapping_service.patch_mappings(
+        {"description": "Filled"}, filters={"release_id": 1, "source_table_id": 3, "target_table_id": 3}
+    )
+    assert set(ids) <= set(result["updated_ids"])
+    
+    with pytest.raises(ValueError):
+        mapping_service.patch_mappings({"status": "Draft"}, mapping_ids=ids, filters={"release_id": 1})
+    with pytest.raises(ValueError):
+        mapping_service.patch_mappings({}, mapping_ids=ids)
+    
+    # A filter without any condition would select every mapping
+    version = mapping_service.get_data_versions()["mappings"]
+    for filters in ({}, {"release_id": None, "status": None}):
+        with pytest.raises(ValueError):
+            mapping_service.patch_mappings({"status": "Draft"}, filters=filters)
+    assert mapping_service.get_data_versions()["mappings"] == version
+    
+    for mapping_id in ids:
+        mapping_service.delete_mapping(mapping_id)
+
+def test_update_mapping_versions():
+    """Test that updates increment the mapping version and stale writes are rejected."""
+    created = mapping_service.create_mapping({
+        "source_table_id": 3, "source_column_id": 7, "target_table_id": 3, "target_column_id": 7, "release_id": 1,
+    })
+    assert created["version"] == 1
+    
+    updated = mapping_service.update_mapping(created["id"], {"status": "In Progress"}, expected_version=1)
+    assert updated["version"] == 2
+    
+    # A second writer still on version 1 gets the current row back, and nothing is written
+    with pytest.raises(mapping_service.MappingVersionConflictError) as excinfo:
+        mapping_service.update_mapping(created["id"], {"status": "Draft"}, expected_version=1)
+    assert excinfo.value.errors[0]["mapping"]["status"] == "In Progress"
+    assert mapping_service.get_mapping(created["id"])["version"] == 2
+    
+    # Range patches check the listed versions and bump each updated mapping
+    with pytest.raises(mapping_service.MappingVersionConflictError):
+        mapping_service.patch_mappings(
+            {"status": "Approved"}, mapping_ids=[created["id"]], expected_versions={created["id"]: 1}
+        )
+    mapping_service.patch_mappings(
+        {"status": "Approved"}, mapping_ids=[created["id"]], expected_versions={created["id"]: 2}
+    )
+    assert mapping_service.get_mapping(created["id"])["version"] == 3
+    
+    mapping_service.delete_mapping(created["id"])
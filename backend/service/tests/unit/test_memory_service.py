@@ -0,0 +1,49 @@
+"""
+Unit tests for the memory accounting service.
+"""
+import sys
+import pytest
+from backend.cache.memory import approximate_size
+from backend.service import mapping_service, memory_service
+
+def test_approximate_size():
+    """Test that sampled sizes are close to exact ones and shared objects are counted once."""
+    rows = {i: {"id": i, "name": f"column_{i}"} for i in range(5000)}
+    exact = approximate_size(rows, sample_size=len(rows))
+    assert abs(approximate_size(rows) - exact) < exact * 0.05
+    
+    seen = set()
+    approximate_size(rows, seen, sample_size=len(rows))
+    row_list = list(rows.values())
+    assert approximate_size(row_list, seen, sample_size=len(rows)) == sys.getsizeof(row_list)
+    
+    entries = [("a", 1)]
+    assert approximate_size(entries, shared_leaves=True) == sys.getsizeof(entries) + sys.getsizeof(entries[0])
+
+def test_get_memory_report():
+    """Test that the report covers the catalog, the workspaces and the caches."""
+    report = memory_service.get_memory_report()
+    assert report["tracemalloc"] is None
+    assert report["catalog"]["sections"]["releases"]["entries"] == len(mapping_service.get_releases())
+    
+    workspace = next(w for w in report["workspaces"] if w["name"] == "default")
+    count = len(mapping_service.get_all_mappings())
+    assert workspace["mappings"]["entries"] == count
+    assert workspace["mappings"]["bytes"] > 0
+    assert all(index["entries"] == count for index in workspace["sort_indexes"].values())
+    assert set(report["caches"]) == {"lineage_graphs", "catalog_introspection", "audit_log"}
+    assert report["total_bytes"] >= report["catalog"]["total_bytes"] + workspace["total_bytes"]
+
+def test_tracemalloc_report():
+    """Test starting tracemalloc, listing the top allocation sites and stopping it."""
+    with pytest.raises(ValueError):
+        memory_service.set_tracemalloc(True, frames=0)
+    assert memory_service.set_tracemalloc(True)["tracing"] is True
+    try:
+        retained = [bytearray(1000) for _ in range(100)]
+        sites = memory_service.get_memory_report(top=5)["tracemalloc"]["top"]
+        assert 0 < len(sites) <= 5
+        assert any("test_memory_service.py" in site["location"] for site in sites)
+    finally:
+        assert memory_service.set_tracemalloc(False)["tracing"] is False
+    assert memory_service.get_tracemalloc_report(5) == {"tracing": False, "current_bytes": 0, "peak_bytes": 0, "top": []}
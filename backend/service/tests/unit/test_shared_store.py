@@ -0,0 +1,135 @@
+"""
+Unit tests for sharing mappings between worker processes.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from backend.cache import dummy_data
+from backend.cache import workspace as workspace_module
+from backend.cache.shared_store import SharedStore
+from backend.service import mapping_service
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+
+def _new_mapping(column_id):
+    """Build mapping data for a product column mapped to its same-numbered target column."""
+    return {
+        "source_table_id": 2,
+        "source_column_id": column_id,
+        "target_table_id": 2,
+        "target_column_id": column_id,
+        "release_id": 3,
+        "status": "Draft",
+    }
+
+@pytest.fixture
+def shared_db(tmp_path):
+    """Share the dummy data cache through a temporary SQLite file for one test."""
+    path = str(tmp_path / "shared.db")
+    dummy_data.configure_shared_store(path)
+    created_ids = []
+    yield path, created_ids
+    for mapping_id in created_ids:
+        mapping_service.delete_mapping(mapping_id)
+    dummy_data.configure_shared_store(None)
+
+def _run_other_worker(path, script):
+    """Run a script in a separate process that shares the store."""
+    env = {**os.environ, "STTM_SHARED_DB": path}
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+def test_writes_are_shared_between_processes(shared_db):
+    """Test that a worker sees another worker's writes after syncing."""
+    path, created_ids = shared_db
+    created = mapping_service.create_mapping(_new_mapping(5))
+    created_ids.append(created["id"])
+    version = mapping_service.get_data_versions()["mappings"]
+
+    output = _run_other_worker(path, f"""
+        from backend.service import mapping_service
+        mapping_service.update_mapping({created["id"]}, {{"description": "Edited elsewhere"}})
+        print(mapping_service.create_mapping({_new_mapping(6)!r})["id"])
+    """)
+    other_id = int(output.split()[-1])
+    created_ids.append(other_id)
+
+    assert other_id > created["id"]
+    assert mapping_service.sync_shared_state() is True
+    assert mapping_service.get_mapping(created["id"])["description"] == "Edited elsewhere"
+    assert mapping_service.get_mapping(other_id)["source_column_id"] == 6
+    assert [m["id"] for m in mapping_service.get_mappings_by_release(3)][-2:] == [created["id"], other_id]
+
+    changes = mapping_service.get_mapping_changes(version)
+    assert changes["version"] == version + 2
+    assert {m["id"] for m in changes["upserts"]} == {created["id"], other_id}
+
+    # The other worker's mapping now counts for duplicate checks here
+    with pytest.raises(mapping_service.MappingConflictError):
+        mapping_service.create_mapping(_new_mapping(6))
+
+    assert mapping_service.sync_shared_state() is False
+
+def test_rolled_back_write_is_undone(shared_db):
+    """Test that local writes are dropped when their shared transaction fails."""
+    path, created_ids = shared_db
+    version = mapping_service.get_data_versions()["mappings"]
+    release_mapping_ids = set(dummy_data.hash_indexes["release_id"].get(3))
+
+    with pytest.raises(RuntimeError):
+        with dummy_data.write_transaction():
+            mapping = dummy_data.add_mapping(_new_mapping(5))
+            raise RuntimeError("Failed after writing")
+
+    assert mapping_service.get_mapping(mapping["id"]) is None
+    assert dummy_data.hash_indexes["release_id"].get(3) == release_mapping_ids
+    assert SharedStore(path).read_rows([mapping["id"]]) == {}
+    # Versions never go backwards, so version-keyed caches cannot serve the rolled back write
+    assert mapping_service.get_data_versions()["mappings"] == version + 2
+    assert mapping_service.get_mapping_changes(version)["deleted_ids"] == [mapping["id"]]
+
+def test_writes_continue_past_change_compaction(shared_db, monkeypatch):
+    """Test that compacting the shared change table inside a write keeps writes working."""
+    path, created_ids = shared_db
+    monkeypatch.setattr(workspace_module, "SHARED_CHANGE_RETENTION", 10)
+    created = mapping_service.create_mapping(_new_mapping(5))
+    created_ids.append(created["id"])
+    store = SharedStore(path)
+
+    # Compaction runs every 1000 shared versions
+    while store.version() <= 1000:
+        mapping_service.update_mapping(created["id"], {"description": f"Edit {store.version()}"})
+
+    assert store.oldest_change_version() > 1
+    updated = mapping_service.update_mapping(created["id"], {"description": "After compaction"})
+    assert SharedStore(path).read_rows([created["id"]])[created["id"]]["description"] == updated["description"]
+
+def test_reference_data_is_shared_between_processes(shared_db):
+    """Test that a release promoted by another worker is seen here under the same catalog version."""
+    path, created_ids = shared_db
+    release = dummy_data.reference_lookups["releases"][3]
+
+    output = _run_other_worker(path, """
+        from backend.cache import dummy_data
+        from backend.service import mapping_service
+        mapping_service.promote_release(3, from_statuses=[])
+        print(dummy_data.catalog_version)
+    """)
+    other_catalog_version = int(output.split()[-1])
+
+    try:
+        assert mapping_service.sync_shared_state() is True
+        assert dummy_data.catalog_version == other_catalog_version
+        assert dummy_data.reference_lookups["releases"][3]["status"] == "Released"
+        assert mapping_service.get_catalog(other_catalog_version - 1)["sections"]["releases"] is not None
+        assert mapping_service.get_catalog(other_catalog_version)["sections"]["releases"] is None
+    finally:
+        dummy_data.replace_reference_row("releases", release)
+    assert SharedStore(path[:-len(".db")] + "-catalog.db").read_reference_sections()[1]["releases"][1][2] == release
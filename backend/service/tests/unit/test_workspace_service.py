@@ -0,0 +1,51 @@
+"""
+Unit tests for the workspace service.
+"""
+import pytest
+from backend.service import lineage_service, mapping_service, workspace_service
+
+def _mapping(column_id):
+    return {
+        "source_table_id": 1,
+        "source_column_id": column_id,
+        "target_table_id": 1,
+        "target_column_id": column_id,
+        "release_id": 1,
+        "status": "Draft",
+    }
+
+def test_create_workspace():
+    """Test creating workspaces and rejecting duplicate or invalid names."""
+    workspace = workspace_service.create_workspace("service-create")
+    assert workspace == {"name": "service-create", "mapping_count": 0, "mappings_version": 0}
+    assert workspace in workspace_service.get_workspaces()
+    
+    with pytest.raises(workspace_service.WorkspaceExistsError):
+        workspace_service.create_workspace("service-create")
+    with pytest.raises(ValueError):
+        workspace_service.create_workspace("bad name")
+    with pytest.raises(workspace_service.WorkspaceNotFoundError):
+        with workspace_service.use_workspace("service-missing"):
+            pass
+
+def test_workspaces_are_isolated():
+    """Test that each workspace has its own mappings, ID space and version."""
+    workspace_service.create_workspace("service-isolated")
+    default_mappings = mapping_service.get_all_mappings()
+    default_versions = mapping_service.get_data_versions()
+    
+    with workspace_service.use_workspace("service-isolated"):
+        assert mapping_service.current_workspace() == "service-isolated"
+        assert mapping_service.get_all_mappings() == []
+        # The same columns as existing default mappings do not conflict here
+        created = mapping_service.create_mappings([_mapping(1), _mapping(2)])
+        assert [m["id"] for m in created] == [1, 2]
+        assert mapping_service.get_data_versions()["mappings"] == 1
+        assert mapping_service.get_mapping_stats()["mapping_count"] == 2
+        lineage = lineage_service.get_lineage("source", 1, "downstream", 1)
+        assert [edge["mapping_count"] for edge in lineage["edges"]] == [1]
+    
+    assert mapping_service.current_workspace() == workspace_service.DEFAULT_WORKSPACE
+    assert mapping_service.get_all_mappings() is default_mappings
+    assert mapping_service.get_data_versions() == default_versions
+    assert mapping_service.get_mapping(created[1]["id"]) != created[1]
@@ -0,0 +1,90 @@
+"""
+Workspace service module for the STTM application.
+This module partitions mappings into workspaces, one per team or project.
+
+Each workspace has its own mappings, ID space and data version, so one team's
+writes never invalidate the caches of another. Tables, columns and releases
+are shared by all workspaces.
+"""
+from contextlib import contextmanager
+from typing import Dict, List
+
+from backend.cache import dummy_data
+from backend.service import mapping_service
+
+# Workspace of requests that do not name one
+DEFAULT_WORKSPACE = dummy_data.DEFAULT_WORKSPACE
+
+class WorkspaceNotFoundError(LookupError):
+    """Raised when a request names a workspace that does not exist."""
+    pass
+
+class WorkspaceExistsError(Exception):
+    """Raised when creating a workspace that already exists."""
+    pass
+
+@contextmanager
+def use_workspace(name: str):
+    """
+    Make mapping reads and writes act on a workspace within this context.
+
+    Args:
+        name (str): The workspace name.
+
+    Raises:
+        WorkspaceNotFoundError: If the workspace does not exist.
+    """
+    if mapping_service.USE_DUMMY_DATA:
+        try:
+            dummy_data.workspace(name)
+        except LookupError:
+            raise WorkspaceNotFoundError(f"Workspace {name} not found")
+        with dummy_data.use_workspace(name):
+            yield
+    else:
+        # TODO: Implement ORM-based workspaces
+        raise NotImplementedError("ORM-based workspaces not implemented yet")
+
+def _summary(name: str) -> Dict:
+    workspace = dummy_data.workspace(name)
+    return {
+        "name": name,
+        "mapping_count": len(workspace.mappings_cache),
+        "mappings_version": workspace.mappings_version,
+    }
+
+def get_workspaces() -> List[Dict]:
+    """
+    Get all workspaces.
+
+    Returns:
+        List[Dict]: The name, mapping count and mappings version of each workspace.
+    """
+    if mapping_service.USE_DUMMY_DATA:
+        return [_summary(name) for name in dummy_data.list_workspace_names()]
+    else:
+        # TODO: Implement ORM-based retrieval
+        raise NotImplementedError("ORM-based retrieval not implemented yet")
+
+def create_workspace(name: str) -> Dict:
+    """
+    Create an empty workspace.
+
+    Args:
+        name (str): The workspace name: a letter or digit followed by up to 63
+            letters, digits, '-' or '_'.
+
+    Returns:
+        Dict: The name, mapping count and mappings version of the workspace.
+
+    Raises:
+        ValueError: If the name is invalid.
+        WorkspaceExistsError: If the workspace already exists.
+    """
+    if mapping_service.USE_DUMMY_DATA:
+        if not dummy_data.create_workspace(name):
+            raise WorkspaceExistsError(f"Workspace {name} already exists")
+        return _summary(name)
+    else:
+        # TODO: Implement ORM-based creation
+        raise NotImplementedError("ORM-based creation not implemented yet")
@@ -107,7 +107,7 @@ export default function MappingsPage() {
   const handleSubmitForm = (data: any) => {
     if (selectedMapping) {
       updateMappingMutation.mutate(
-        { id: selectedMapping.id, mapping: data },
+        { id: selectedMapping.id, mapping: data, version: selectedMapping.version },
         {
           onSuccess: () => {
             setFormOpen(false);
@@ -164,7 +164,8 @@ export default function MappingsPage() {
           status: updatedMapping.status,
           jira_ticket: updatedMapping.jira_ticket,
           description: updatedMapping.description
-        }
+        },
+        version: updatedMapping.version
       },
       {
         onSuccess: () => {
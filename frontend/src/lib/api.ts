@@ -15,6 +15,7 @@ export interface Mapping {
   jira_ticket?: string;
   status: string;
   description: string;
+  version: number;
   created_at: string;
   updated_at: string;
 }
@@ -59,6 +60,27 @@ export interface MappingCreate {
   description?: string;
 }
 
+export interface MappingChanges {
+  version: number;
+  since: number | null;
+  upserts: EnrichedMapping[];
+  deleted_ids: number[];
+}
+
+export interface CatalogSections {
+  source_tables: Table[] | null;
+  source_columns: Column[] | null;
+  target_tables: Table[] | null;
+  target_columns: Column[] | null;
+  releases: Release[] | null;
+}
+
+export interface Catalog {
+  version: number;
+  since: number | null;
+  sections: CatalogSections;
+}
+
 export interface MappingUpdate {
   source_table_id?: number;
   source_column_id?: number;
@@ -68,6 +90,7 @@ export interface MappingUpdate {
   jira_ticket?: string;
   status?: string;
   description?: string;
+  version?: number;
 }
 
 // API client
@@ -86,7 +109,8 @@ class ApiClient {
     
     if (!response.ok) {
       const error = await response.json().catch(() => ({}));
-      throw new Error(error.detail || `API error: ${response.status}`);
+      // Validation and version conflicts have a list of errors as their detail
+      throw new Error(typeof error.detail === 'string' ? error.detail : `API error: ${response.status}`);
     }
     
     // For DELETE requests with 204 No Content
@@ -121,6 +145,10 @@ class ApiClient {
     return this.request<EnrichedMapping[]>('/mappings/enriched');
   }
   
+  async getMappingChanges(since: number): Promise<MappingChanges> {
+    return this.request<MappingChanges>(`/mappings/changes?since=${since}`);
+  }
+  
   async getMapping(id: number): Promise<Mapping> {
     return this.request<Mapping>(`/mappings/${id}`);
   }
@@ -132,9 +160,11 @@ class ApiClient {
     });
   }
   
-  async updateMapping(id: number, mapping: MappingUpdate): Promise<Mapping> {
+  async updateMapping(id: number, mapping: MappingUpdate, version: number): Promise<Mapping> {
+    // The update fails with 409 if the mapping has changed since the given version
     return this.request<Mapping>(`/mappings/${id}`, {
       method: 'PUT',
+      headers: { 'If-Match': `"${version}"` },
       body: JSON.stringify(mapping),
     });
   }
@@ -179,6 +209,15 @@ class ApiClient {
   async getReleases(): Promise<Release[]> {
     return this.request<Release[]>('/releases/');
   }
+  
+  // Catalog (all reference data in one request)
+  async getCatalog(): Promise<Catalog> {
+    return this.request<Catalog>('/catalog/');
+  }
+  
+  async getCatalogChanges(since: number): Promise<Catalog> {
+    return this.request<Catalog>(`/catalog/changes?since=${since}`);
+  }
 }
 
 // Export a singleton instance
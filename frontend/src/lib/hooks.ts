@@ -42,7 +42,8 @@ export function useUpdateMapping() {
   const queryClient = useQueryClient();
   
   return useMutation({
-    mutationFn: ({ id, mapping }: { id: number; mapping: MappingUpdate }) => api.updateMapping(id, mapping),
+    mutationFn: ({ id, mapping, version }: { id: number; mapping: MappingUpdate; version: number }) =>
+      api.updateMapping(id, mapping, version),
     onSuccess: (data, variables) => {
       queryClient.invalidateQueries({ queryKey: ['mappings'] });
       queryClient.invalidateQueries({ queryKey: ['mapping', variables.id] });